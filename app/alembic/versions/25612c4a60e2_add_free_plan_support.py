@@ -8,6 +8,7 @@ Create Date: 2025-08-28 21:34:31.878780
 from typing import Sequence, Union
 
 from alembic import op
+import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '25612c4a60e2'
@@ -15,6 +16,29 @@ down_revision: Union[str, Sequence[str], None] = 'e19160229bb6'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Rows updated per statement when backfilling existing users
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _backfill_users(column: str, value: str) -> None:
+    """Set NULL values of a users column in primary key ranges.
+
+    Each batch is its own short statement (run inside an autocommit block) so
+    row locks and WAL are bounded instead of held by one table-wide UPDATE.
+    """
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT max(id) FROM users")).scalar() or 0
+    update = sa.text(
+        f"UPDATE users SET {column} = :value "
+        f"WHERE {column} IS NULL AND id > :start AND id <= :end"
+    )
+
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(
+            update,
+            {"value": value, "start": start, "end": start + BACKFILL_BATCH_SIZE},
+        )
+
 
 def upgrade() -> None:
     """Upgrade schema to support free plan defaults."""
@@ -25,8 +49,9 @@ def upgrade() -> None:
                    server_default="'active'")
     
     # Update existing users without subscription_tier to free plan
-    op.execute("UPDATE users SET subscription_tier = 'free' WHERE subscription_tier IS NULL")
-    op.execute("UPDATE users SET subscription_status = 'active' WHERE subscription_status IS NULL")
+    with op.get_context().autocommit_block():
+        _backfill_users('subscription_tier', 'free')
+        _backfill_users('subscription_status', 'active')
 
 
 def downgrade() -> None:
@@ -0,0 +1,52 @@
+"""add_daily_package_stats_materialized_view
+
+Precompute per-day event and session counts so dashboard time series don't
+have to scan and group raw analytics_events on every request. The view is
+refreshed periodically by the scheduler.
+
+Revision ID: 3c7f0a9d2b61
+Revises: e24ae68f6704
+Create Date: 2025-11-24 18:12:44.301952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7f0a9d2b61'
+down_revision: Union[str, Sequence[str], None] = 'e24ae68f6704'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create mv_daily_package_stats materialized view."""
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_daily_package_stats AS
+        SELECT
+            api_key,
+            package_name,
+            date(event_timestamp) AS day,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS unique_sessions,
+            count(DISTINCT user_identifier) AS unique_users
+        FROM analytics_events
+        GROUP BY api_key, package_name, date(event_timestamp)
+        """
+    )
+
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index(
+        'idx_mv_daily_package_stats_key_day',
+        'mv_daily_package_stats',
+        ['api_key', 'package_name', 'day'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Drop mv_daily_package_stats materialized view."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_daily_package_stats")
@@ -0,0 +1,54 @@
+"""add_keyset_pagination_indexes
+
+The backoffice lists page newest-first on (created_at, id), or
+(received_at, id) for analytics events. A B-tree on the same columns can
+be scanned backwards to serve each page without sorting the table.
+
+Revision ID: 4f9a6c3e1d52
+Revises: b8d41f6e2c07
+Create Date: 2025-11-28 14:02:37.918245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f9a6c3e1d52'
+down_revision: Union[str, Sequence[str], None] = 'b8d41f6e2c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KEYSET_INDEXES = (
+    ('idx_users_created_at_id', 'users', ['created_at', 'id']),
+    ('idx_api_keys_created_at_id', 'api_keys', ['created_at', 'id']),
+    ('idx_analytics_received_at_id', 'analytics_events', ['received_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Create keyset pagination indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in KEYSET_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop keyset pagination indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in KEYSET_INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
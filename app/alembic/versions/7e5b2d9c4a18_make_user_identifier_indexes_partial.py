@@ -0,0 +1,71 @@
+"""make_user_identifier_indexes_partial
+
+Most events carry only one of installation_id / fingerprint_hash, so the
+full indexes on these sparse columns mostly index NULLs and add write
+amplification on every ingested event. Rebuild them as partial indexes
+WHERE col IS NOT NULL, concurrently and without a window where no index
+exists.
+
+Revision ID: 7e5b2d9c4a18
+Revises: 3c7f0a9d2b61
+Create Date: 2025-11-26 10:41:08.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e5b2d9c4a18'
+down_revision: Union[str, Sequence[str], None] = '3c7f0a9d2b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# index name -> (columns, column that must be NOT NULL)
+PARTIAL_INDEXES = {
+    'idx_analytics_fingerprint': (['fingerprint_hash'], 'fingerprint_hash'),
+    'idx_analytics_installation_id': (['installation_id'], 'installation_id'),
+    'idx_analytics_user_identifier_date': (
+        ['api_key', 'user_identifier', 'event_timestamp'],
+        'user_identifier',
+    ),
+}
+
+
+def _rebuild_index(index_name: str, columns: list[str], where=None) -> None:
+    """Build a replacement index under a temporary name, then swap it in."""
+    tmp_name = f'{index_name}_new'
+    op.create_index(
+        tmp_name,
+        'analytics_events',
+        columns,
+        unique=False,
+        if_not_exists=True,
+        postgresql_concurrently=True,
+        postgresql_where=where,
+    )
+    op.drop_index(
+        index_name,
+        table_name='analytics_events',
+        if_exists=True,
+        postgresql_concurrently=True,
+    )
+    op.execute(f'ALTER INDEX {tmp_name} RENAME TO {index_name}')
+
+
+def upgrade() -> None:
+    """Replace sparse user identifier indexes with partial indexes."""
+    with op.get_context().autocommit_block():
+        for index_name, (columns, not_null_column) in PARTIAL_INDEXES.items():
+            _rebuild_index(
+                index_name, columns, where=sa.text(f'{not_null_column} IS NOT NULL')
+            )
+
+
+def downgrade() -> None:
+    """Restore full user identifier indexes."""
+    with op.get_context().autocommit_block():
+        for index_name, (columns, _) in PARTIAL_INDEXES.items():
+            _rebuild_index(index_name, columns)
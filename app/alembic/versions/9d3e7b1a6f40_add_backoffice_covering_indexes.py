@@ -0,0 +1,72 @@
+"""add_backoffice_covering_indexes
+
+Backoffice statistics count active, verified users by signup time, and the
+API key list and counts read package_name and user_id alongside created_at.
+Add a partial index for the former and rebuild the API key keyset index
+with INCLUDE columns so those reads can be index-only scans.
+
+Revision ID: 9d3e7b1a6f40
+Revises: 4f9a6c3e1d52
+Create Date: 2025-11-29 11:17:45.203816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3e7b1a6f40'
+down_revision: Union[str, Sequence[str], None] = '4f9a6c3e1d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_api_keys_keyset_index(include=None) -> None:
+    """Build a replacement keyset index under a temporary name, then swap it in."""
+    index_name = 'idx_api_keys_created_at_id'
+    tmp_name = f'{index_name}_new'
+    op.create_index(
+        tmp_name,
+        'api_keys',
+        ['created_at', 'id'],
+        unique=False,
+        if_not_exists=True,
+        postgresql_concurrently=True,
+        postgresql_include=include or [],
+    )
+    op.drop_index(
+        index_name,
+        table_name='api_keys',
+        if_exists=True,
+        postgresql_concurrently=True,
+    )
+    op.execute(f'ALTER INDEX {tmp_name} RENAME TO {index_name}')
+
+
+def upgrade() -> None:
+    """Create partial active-user index and covering API key index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_users_active_verified',
+            'users',
+            ['created_at'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('is_active AND is_verified'),
+        )
+        _rebuild_api_keys_keyset_index(include=['package_name', 'user_id'])
+
+
+def downgrade() -> None:
+    """Drop partial active-user index and restore plain API key index."""
+    with op.get_context().autocommit_block():
+        _rebuild_api_keys_keyset_index()
+        op.drop_index(
+            'idx_users_active_verified',
+            table_name='users',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -38,40 +38,60 @@ def upgrade() -> None:
         sa.Column('user_identifier', sa.String(length=100), nullable=True)
     )
 
-    # Create indexes for efficient unique user queries
-    op.create_index(
-        'idx_analytics_user_identifier',
-        'analytics_events',
-        ['user_identifier'],
-        unique=False
-    )
-    op.create_index(
-        'idx_analytics_user_identifier_date',
-        'analytics_events',
-        ['api_key', 'user_identifier', 'event_timestamp'],
-        unique=False
-    )
-    op.create_index(
-        'idx_analytics_installation_id',
-        'analytics_events',
-        ['installation_id'],
-        unique=False
-    )
-    op.create_index(
-        'idx_analytics_fingerprint',
-        'analytics_events',
-        ['fingerprint_hash'],
-        unique=False
-    )
+    # Create indexes for efficient unique user queries. analytics_events is
+    # the hot ingest table, so build them CONCURRENTLY outside the migration
+    # transaction to avoid blocking writes while the indexes are built.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_analytics_user_identifier',
+            'analytics_events',
+            ['user_identifier'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_analytics_user_identifier_date',
+            'analytics_events',
+            ['api_key', 'user_identifier', 'event_timestamp'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_analytics_installation_id',
+            'analytics_events',
+            ['installation_id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_analytics_fingerprint',
+            'analytics_events',
+            ['fingerprint_hash'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
 
 
 def downgrade() -> None:
     """Remove user identifier fields from analytics_events table."""
     # Drop indexes first
-    op.drop_index('idx_analytics_fingerprint', table_name='analytics_events')
-    op.drop_index('idx_analytics_installation_id', table_name='analytics_events')
-    op.drop_index('idx_analytics_user_identifier_date', table_name='analytics_events')
-    op.drop_index('idx_analytics_user_identifier', table_name='analytics_events')
+    with op.get_context().autocommit_block():
+        for index_name in (
+            'idx_analytics_fingerprint',
+            'idx_analytics_installation_id',
+            'idx_analytics_user_identifier_date',
+            'idx_analytics_user_identifier',
+        ):
+            op.drop_index(
+                index_name,
+                table_name='analytics_events',
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
 
     # Drop columns
     op.drop_column('analytics_events', 'user_identifier')
@@ -0,0 +1,56 @@
+"""add_daily_dimension_stats_materialized_view
+
+The Python version, OS and package version distributions still grouped raw
+analytics_events on every dashboard request. Precompute per-day event and
+session counts for each (Python minor version, OS, package version)
+combination so the distributions sum a few rows per day instead. Like
+mv_daily_package_stats, sessions are counted per day, and the view is
+refreshed by the scheduler.
+
+Revision ID: a7d3e9b5c142
+Revises: f4a9c2d7b318
+Create Date: 2025-12-09 09:27:13.518406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9b5c142'
+down_revision: Union[str, Sequence[str], None] = 'f4a9c2d7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create mv_daily_dimension_stats materialized view."""
+    op.execute(
+        r"""
+        CREATE MATERIALIZED VIEW mv_daily_dimension_stats AS
+        SELECT
+            api_key,
+            timezone('UTC', event_timestamp)::date AS day,
+            regexp_replace(python_version, '^(\d+\.\d+).*$', '\1') AS python_version,
+            os_type,
+            package_version,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS unique_sessions
+        FROM analytics_events
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index(
+        'idx_mv_daily_dimension_stats_key_day',
+        'mv_daily_dimension_stats',
+        ['api_key', 'day', 'python_version', 'os_type', 'package_version'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Drop mv_daily_dimension_stats materialized view."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_daily_dimension_stats")
@@ -0,0 +1,47 @@
+"""add_brin_index_on_analytics_event_time
+
+analytics_events is append-only and physically ordered by arrival time, so
+a BRIN index on the time columns serves dashboard time-range scans at a
+fraction of a B-tree's size and insert cost.
+
+Revision ID: b8d41f6e2c07
+Revises: 7e5b2d9c4a18
+Create Date: 2025-11-27 09:23:51.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d41f6e2c07'
+down_revision: Union[str, Sequence[str], None] = '7e5b2d9c4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create BRIN index on event_timestamp and received_at."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_analytics_time_brin',
+            'analytics_events',
+            ['event_timestamp', 'received_at'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 64},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop BRIN index on event_timestamp and received_at."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_analytics_time_brin',
+            table_name='analytics_events',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
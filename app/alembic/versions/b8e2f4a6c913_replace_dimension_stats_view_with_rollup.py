@@ -0,0 +1,89 @@
+"""replace_dimension_stats_view_with_rollup
+
+mv_daily_dimension_stats was recomputed over all of analytics_events on every
+refresh, so its cost grew with total history. Replace it with the
+daily_dimension_stats table: history is backfilled once here, and the
+scheduled refresh only rebuilds the (API key, day) pairs that received events
+since yesterday.
+
+Revision ID: b8e2f4a6c913
+Revises: a7d3e9b5c142
+Create Date: 2025-12-11 14:52:08.613204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6c913'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e9b5c142'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace mv_daily_dimension_stats with a backfilled daily_dimension_stats table."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_daily_dimension_stats")
+
+    op.create_table(
+        'daily_dimension_stats',
+        sa.Column('api_key', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('python_version', sa.String(), nullable=False),
+        sa.Column('os_type', sa.String(), nullable=False),
+        sa.Column('package_version', sa.String(), nullable=False),
+        sa.Column('total_events', sa.Integer(), nullable=False),
+        sa.Column('unique_sessions', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            'api_key', 'day', 'python_version', 'os_type', 'package_version'
+        ),
+    )
+
+    op.execute(
+        r"""
+        INSERT INTO daily_dimension_stats (
+            api_key, day, python_version, os_type, package_version,
+            total_events, unique_sessions
+        )
+        SELECT
+            api_key,
+            timezone('UTC', event_timestamp)::date,
+            regexp_replace(python_version, '^(\d+\.\d+).*$', '\1'),
+            os_type,
+            package_version,
+            count(*),
+            count(DISTINCT session_id)
+        FROM analytics_events
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade() -> None:
+    """Restore mv_daily_dimension_stats."""
+    op.drop_table('daily_dimension_stats')
+
+    op.execute(
+        r"""
+        CREATE MATERIALIZED VIEW mv_daily_dimension_stats AS
+        SELECT
+            api_key,
+            timezone('UTC', event_timestamp)::date AS day,
+            regexp_replace(python_version, '^(\d+\.\d+).*$', '\1') AS python_version,
+            os_type,
+            package_version,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS unique_sessions
+        FROM analytics_events
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+    op.create_index(
+        'idx_mv_daily_dimension_stats_key_day',
+        'mv_daily_dimension_stats',
+        ['api_key', 'day', 'python_version', 'os_type', 'package_version'],
+        unique=True
+    )
@@ -0,0 +1,92 @@
+"""replace_daily_package_stats_view_with_rollup
+
+mv_daily_package_stats bucketed events with date(event_timestamp), which
+follows the session time zone, and was recomputed over all of
+analytics_events on every refresh. Replace it with the daily_package_stats
+table keyed by UTC day: history is backfilled once here, and the scheduled
+refresh only rebuilds the (API key, day) pairs that received events since
+yesterday.
+
+Revision ID: c3f9a1d7e2b4
+Revises: b8e2f4a6c913
+Create Date: 2025-12-15 10:21:37.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1d7e2b4'
+down_revision: Union[str, Sequence[str], None] = 'b8e2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace mv_daily_package_stats with a backfilled daily_package_stats table."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_daily_package_stats")
+
+    op.create_table(
+        'daily_package_stats',
+        sa.Column('api_key', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('package_name', sa.String(), nullable=False),
+        sa.Column('total_events', sa.Integer(), nullable=False),
+        sa.Column('unique_sessions', sa.Integer(), nullable=False),
+        sa.Column('unique_users', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('api_key', 'day', 'package_name'),
+    )
+
+    op.execute(
+        """
+        INSERT INTO daily_package_stats (
+            api_key, day, package_name,
+            total_events, unique_sessions, unique_users
+        )
+        SELECT
+            api_key,
+            timezone('UTC', event_timestamp)::date,
+            package_name,
+            count(*),
+            count(DISTINCT session_id),
+            count(DISTINCT user_identifier)
+        FROM analytics_events
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Restore mv_daily_package_stats."""
+    op.drop_table('daily_package_stats')
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_daily_package_stats AS
+        SELECT
+            api_key,
+            package_name,
+            date(event_timestamp) AS day,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS unique_sessions,
+            count(DISTINCT user_identifier) AS unique_users
+        FROM analytics_events
+        GROUP BY api_key, package_name, date(event_timestamp)
+        """
+    )
+    op.create_index(
+        'idx_mv_daily_package_stats_key_day',
+        'mv_daily_package_stats',
+        ['api_key', 'package_name', 'day'],
+        unique=True
+    )
+    op.create_index(
+        'idx_mv_daily_package_stats_key_day_covering',
+        'mv_daily_package_stats',
+        ['api_key', 'day'],
+        unique=False,
+        postgresql_include=['package_name', 'total_events', 'unique_sessions'],
+    )
@@ -0,0 +1,77 @@
+"""add_daily_stats_rollup
+
+Backoffice time-window statistics (events today / this week / this month)
+rescanned analytics_events on every refresh. Keep a per-day rollup of new
+users, API keys and events so closed days are summed from at most a month
+of rows. History is backfilled once here, with zero rows for quiet days;
+the refresh_daily_stats job keeps recent days current.
+
+Revision ID: c5a1e8f3b927
+Revises: 9d3e7b1a6f40
+Create Date: 2025-12-01 16:08:22.471930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1e8f3b927'
+down_revision: Union[str, Sequence[str], None] = '9d3e7b1a6f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create and backfill daily_stats."""
+    op.create_table(
+        'daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('new_users', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('new_api_keys', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('new_events', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint('day'),
+    )
+
+    op.execute(
+        """
+        WITH activity AS (
+            SELECT (created_at AT TIME ZONE 'UTC')::date AS day,
+                   count(*) AS new_users, 0 AS new_api_keys, 0 AS new_events
+            FROM users WHERE created_at IS NOT NULL GROUP BY 1
+            UNION ALL
+            SELECT (created_at AT TIME ZONE 'UTC')::date, 0, count(*), 0
+            FROM api_keys WHERE created_at IS NOT NULL GROUP BY 1
+            UNION ALL
+            SELECT (received_at AT TIME ZONE 'UTC')::date, 0, 0, count(*)
+            FROM analytics_events GROUP BY 1
+        ),
+        days AS (
+            SELECT generate_series(
+                min(day), (now() AT TIME ZONE 'UTC')::date, interval '1 day'
+            )::date AS day
+            FROM activity
+        )
+        INSERT INTO daily_stats (day, new_users, new_api_keys, new_events)
+        SELECT days.day,
+               coalesce(sum(activity.new_users), 0),
+               coalesce(sum(activity.new_api_keys), 0),
+               coalesce(sum(activity.new_events), 0)
+        FROM days
+        LEFT JOIN activity ON activity.day = days.day
+        GROUP BY days.day
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop daily_stats."""
+    op.drop_table('daily_stats')
@@ -0,0 +1,61 @@
+"""add_package_overview_materialized_view
+
+The dashboard overview aggregated 30 days of raw analytics_events per API key
+on every request. Precompute the default 30-day window per API key so the
+overview becomes an indexed lookup. The view records the window it was
+built for; readers fall back to the live query once it is stale. It is
+refreshed by the scheduler together with mv_daily_package_stats.
+
+Revision ID: d2f7a4c8e613
+Revises: c5a1e8f3b927
+Create Date: 2025-12-02 10:41:57.903214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a4c8e613'
+down_revision: Union[str, Sequence[str], None] = 'c5a1e8f3b927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create mv_package_overview_30d materialized view."""
+    op.execute(
+        r"""
+        CREATE MATERIALIZED VIEW mv_package_overview_30d AS
+        WITH bounds AS (
+            SELECT (now() AT TIME ZONE 'utc')::date - 30 AS window_start
+        )
+        SELECT
+            api_key,
+            min(bounds.window_start) AS window_start,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS total_sessions,
+            count(DISTINCT date(event_timestamp)) AS active_days,
+            count(DISTINCT user_identifier) AS unique_users,
+            count(DISTINCT regexp_replace(python_version, '^(\d+\.\d+).*$', '\1'))
+                AS python_versions_count,
+            count(DISTINCT os_type) AS operating_systems_count
+        FROM analytics_events, bounds
+        WHERE event_timestamp >= bounds.window_start::timestamp AT TIME ZONE 'utc'
+        GROUP BY api_key
+        """
+    )
+
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index(
+        'idx_mv_package_overview_30d_api_key',
+        'mv_package_overview_30d',
+        ['api_key'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Drop mv_package_overview_30d materialized view."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_package_overview_30d")
@@ -21,11 +21,14 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Add is_active and description to api_keys, create badges table."""
-    # Add is_active column (default True)
-    op.add_column('api_keys', sa.Column('is_active', sa.Boolean(), nullable=False, server_default='true'))
-
-    # Add description column (optional)
-    op.add_column('api_keys', sa.Column('description', sa.Text(), nullable=True))
+    # Add is_active (default True) and optional description in a single
+    # ALTER TABLE so api_keys is only locked once. The constant default keeps
+    # this a catalog-only change on PostgreSQL 11+.
+    op.execute(
+        "ALTER TABLE api_keys "
+        "ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT true, "
+        "ADD COLUMN IF NOT EXISTS description TEXT"
+    )
 
     # Create badges table
     op.create_table(
@@ -55,5 +58,8 @@ def downgrade() -> None:
     op.drop_table('badges')
 
     # Drop api_keys columns
-    op.drop_column('api_keys', 'description')
-    op.drop_column('api_keys', 'is_active')
+    op.execute(
+        "ALTER TABLE api_keys "
+        "DROP COLUMN IF EXISTS description, "
+        "DROP COLUMN IF EXISTS is_active"
+    )
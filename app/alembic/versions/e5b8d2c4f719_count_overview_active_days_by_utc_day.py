@@ -0,0 +1,65 @@
+"""count_overview_active_days_by_utc_day
+
+mv_package_overview_30d counted active days with date(event_timestamp),
+which follows the session time zone. Recreate it so active_days counts
+distinct UTC days, like the daily rollups and the 30-day window itself.
+
+Revision ID: e5b8d2c4f719
+Revises: c3f9a1d7e2b4
+Create Date: 2025-12-15 11:08:54.219637
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d2c4f719'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a1d7e2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_package_overview(event_day: str) -> None:
+    """Recreate mv_package_overview_30d, bucketing active days with ``event_day``."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_package_overview_30d")
+    op.execute(
+        rf"""
+        CREATE MATERIALIZED VIEW mv_package_overview_30d AS
+        WITH bounds AS (
+            SELECT (now() AT TIME ZONE 'utc')::date - 30 AS window_start
+        )
+        SELECT
+            api_key,
+            min(bounds.window_start) AS window_start,
+            count(*) AS total_events,
+            count(DISTINCT session_id) AS total_sessions,
+            count(DISTINCT {event_day}) AS active_days,
+            count(DISTINCT user_identifier) AS unique_users,
+            count(DISTINCT regexp_replace(python_version, '^(\d+\.\d+).*$', '\1'))
+                AS python_versions_count,
+            count(DISTINCT os_type) AS operating_systems_count
+        FROM analytics_events, bounds
+        WHERE event_timestamp >= bounds.window_start::timestamp AT TIME ZONE 'utc'
+        GROUP BY api_key
+        """
+    )
+
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index(
+        'idx_mv_package_overview_30d_api_key',
+        'mv_package_overview_30d',
+        ['api_key'],
+        unique=True
+    )
+
+
+def upgrade() -> None:
+    """Count mv_package_overview_30d active days by UTC day."""
+    _recreate_package_overview("timezone('UTC', event_timestamp)::date")
+
+
+def downgrade() -> None:
+    """Restore the session time zone active_days count."""
+    _recreate_package_overview("date(event_timestamp)")
@@ -0,0 +1,75 @@
+"""add_dashboard_covering_indexes
+
+Dashboard queries filter by api_key and a time range, then group by a low
+cardinality column and count events and sessions. Rebuild the
+analytics_events (api_key, event_timestamp) index with the grouped columns
+and session_id as INCLUDE columns, and give mv_daily_package_stats a
+matching (api_key, day) index carrying its sums, so these aggregates can be
+answered from index-only scans.
+
+Revision ID: e8b3c6d14a27
+Revises: d2f7a4c8e613
+Create Date: 2025-12-03 09:26:14.582731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c6d14a27'
+down_revision: Union[str, Sequence[str], None] = 'd2f7a4c8e613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ANALYTICS_DIMENSION_COLUMNS = ['session_id', 'python_version', 'os_type', 'package_version']
+
+
+def _rebuild_analytics_api_key_date_index(include=None) -> None:
+    """Build a replacement (api_key, event_timestamp) index, then swap it in."""
+    index_name = 'idx_analytics_api_key_date'
+    tmp_name = f'{index_name}_new'
+    op.create_index(
+        tmp_name,
+        'analytics_events',
+        ['api_key', 'event_timestamp'],
+        unique=False,
+        if_not_exists=True,
+        postgresql_concurrently=True,
+        postgresql_include=include or [],
+    )
+    op.drop_index(
+        index_name,
+        table_name='analytics_events',
+        if_exists=True,
+        postgresql_concurrently=True,
+    )
+    op.execute(f'ALTER INDEX {tmp_name} RENAME TO {index_name}')
+
+
+def upgrade() -> None:
+    """Create covering indexes for dashboard aggregates."""
+    with op.get_context().autocommit_block():
+        _rebuild_analytics_api_key_date_index(include=ANALYTICS_DIMENSION_COLUMNS)
+        op.create_index(
+            'idx_mv_daily_package_stats_key_day_covering',
+            'mv_daily_package_stats',
+            ['api_key', 'day'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_include=['package_name', 'total_events', 'unique_sessions'],
+        )
+
+
+def downgrade() -> None:
+    """Drop dashboard covering indexes and restore the plain analytics index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_mv_daily_package_stats_key_day_covering',
+            table_name='mv_daily_package_stats',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        _rebuild_analytics_api_key_date_index()
@@ -0,0 +1,48 @@
+"""add_utc_event_day_index
+
+Daily dashboard series group analytics events by their UTC calendar day.
+Index that expression next to api_key so the per-day groupings read the day
+from the index instead of converting every row's timestamp, with session_id
+and user_identifier included for the distinct counts.
+
+Revision ID: f4a9c2d7b318
+Revises: e8b3c6d14a27
+Create Date: 2025-12-05 10:12:37.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2d7b318'
+down_revision: Union[str, Sequence[str], None] = 'e8b3c6d14a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create index on (api_key, UTC day of event_timestamp)."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_analytics_api_key_utc_day',
+            'analytics_events',
+            ['api_key', sa.text("CAST(timezone('UTC', event_timestamp) AS DATE)")],
+            unique=False,
+            if_not_exists=True,
+            postgresql_include=['session_id', 'user_identifier'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop index on (api_key, UTC day of event_timestamp)."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_analytics_api_key_utc_day',
+            table_name='analytics_events',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -1,21 +1,71 @@
 import logging
 from datetime import datetime, timezone
-from uuid import UUID
+from typing import Optional
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.api_auth import authenticate_analytics_request, validate_package_match
+from src.core.api_auth import (
+    AuthenticatedAPIKey,
+    authenticate_analytics_request,
+    validate_package_match,
+)
+from src.core.cache import TTLCache
+from src.core.config import settings
 from src.core.database import get_db
+from src.core.ingest_queue import ingest_queue
 from src.core.rate_limiter import check_rate_limit
 from src.core.dependencies import requires_active_subscription_for_api_key
-from src.models.analytics_event import AnalyticsEvent
-from src.models.api_key import APIKey
+from src.repositories.analytics_event_repository import AnalyticsEventRepository
 from src.schemas.analytics import AnalyticsEventBatch, AnalyticsEventCreate
 
-router = APIRouter(prefix="/api", tags=["analytics"])
+router = APIRouter(
+    prefix="/api", tags=["analytics"], default_response_class=ORJSONResponse
+)
 logger = logging.getLogger(__name__)
 
+_health_cache: TTLCache[dict] = TTLCache(ttl_seconds=1, maxsize=1)
+
+# Event fields stored exactly as received
+EVENT_COLUMNS = (
+    "session_id",
+    "package_name",
+    "package_version",
+    "python_version",
+    "python_implementation",
+    "os_type",
+    "os_version",
+    "os_release",
+    "architecture",
+    "installation_method",
+    "virtual_env",
+    "virtual_env_type",
+    "cpu_count",
+    "total_memory_gb",
+    "entry_point",
+    "extra_data",
+    "event_timestamp",
+    "fingerprint_hash",
+    "user_identifier",
+)
+
+
+def _build_event_row(
+    event_data: AnalyticsEventCreate,
+    api_key: AuthenticatedAPIKey,
+    installation_id: Optional[UUID],
+    received_at: datetime,
+) -> dict:
+    """Build a plain analytics_events row for a Core insert."""
+    row = {column: getattr(event_data, column) for column in EVENT_COLUMNS}
+    row["id"] = uuid4()
+    row["api_key"] = api_key.key
+    row["installation_id"] = installation_id
+    row["received_at"] = received_at
+    return row
+
 
 @router.post(
     "/analytics",
@@ -47,7 +97,7 @@ async def create_analytics_event(
     response: Response,
     event_data: AnalyticsEventCreate,
     db: AsyncSession = Depends(get_db),
-    api_key: APIKey = Depends(authenticate_analytics_request),
+    api_key: AuthenticatedAPIKey = Depends(authenticate_analytics_request),
 ):
     """
     Submit a single analytics event for package usage tracking.
@@ -150,37 +200,19 @@ async def create_analytics_event(
             try:
                 installation_id_uuid = UUID(event_data.installation_id)
             except (ValueError, AttributeError):
-                logger.warning(f"Invalid installation_id format: {event_data.installation_id}")
+                logger.warning("Invalid installation_id format: %s", event_data.installation_id)
 
-        # Create analytics event
-        analytics_event = AnalyticsEvent(
-            api_key=api_key.key,
-            session_id=UUID(event_data.session_id),
-            package_name=event_data.package_name,
-            package_version=event_data.package_version,
-            python_version=event_data.python_version,
-            python_implementation=event_data.python_implementation,
-            os_type=event_data.os_type,
-            os_version=event_data.os_version,
-            os_release=event_data.os_release,
-            architecture=event_data.architecture,
-            installation_method=event_data.installation_method,
-            virtual_env=event_data.virtual_env,
-            virtual_env_type=event_data.virtual_env_type,
-            cpu_count=event_data.cpu_count,
-            total_memory_gb=event_data.total_memory_gb,
-            entry_point=event_data.entry_point,
-            extra_data=event_data.extra_data,
-            event_timestamp=event_data.event_timestamp,
-            # Unique user tracking fields
-            installation_id=installation_id_uuid,
-            fingerprint_hash=event_data.fingerprint_hash,
-            user_identifier=event_data.user_identifier,
-        )
+        # Generate id and received_at locally so no refresh is needed after commit
+        received_at = datetime.now(timezone.utc)
+        row = _build_event_row(event_data, api_key, installation_id_uuid, received_at)
+        event_id = row["id"]
 
-        db.add(analytics_event)
-        await db.commit()
-        await db.refresh(analytics_event)
+        if settings.ANALYTICS_ASYNC_INGEST:
+            # Persisted by the ingest queue writers
+            await ingest_queue.put([row])
+        else:
+            await AnalyticsEventRepository(db).bulk_insert_events([row])
+            await db.commit()
 
         # Add rate limit headers to response
         if hasattr(request.state, "rate_limit_info"):
@@ -190,15 +222,17 @@ async def create_analytics_event(
             response.headers["X-RateLimit-Reset"] = str(info["reset"])
 
         logger.info(
-            f"Analytics event created for package '{event_data.package_name}' "
-            f"version '{event_data.package_version}' "
-            f"Python {event_data.python_version} on {event_data.os_type}"
+            "Analytics event created for package '%s' version '%s' Python %s on %s",
+            event_data.package_name,
+            event_data.package_version,
+            event_data.python_version,
+            event_data.os_type,
         )
 
         return {
             "success": True,
-            "event_id": str(analytics_event.id),
-            "received_at": analytics_event.received_at.isoformat(),
+            "event_id": str(event_id),
+            "received_at": received_at,
             "message": "Analytics event recorded successfully",
         }
 
@@ -206,7 +240,7 @@ async def create_analytics_event(
         # Re-raise HTTP exceptions (auth, rate limit, validation errors)
         raise
     except Exception as e:
-        logger.error(f"Error creating analytics event: {e}")
+        logger.error("Error creating analytics event: %s", e)
         await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to record analytics event")
 
@@ -217,7 +251,7 @@ async def create_analytics_events_batch(
     response: Response,
     batch_data: AnalyticsEventBatch,
     db: AsyncSession = Depends(get_db),
-    api_key: APIKey = Depends(authenticate_analytics_request),
+    api_key: AuthenticatedAPIKey = Depends(authenticate_analytics_request),
 ):
     """
     Create multiple analytics events in a single request.
@@ -248,11 +282,21 @@ async def create_analytics_events_batch(
 
         created_events = []
         failed_events = []
+        rows = []
+        received_at = datetime.now(timezone.utc)
+
+        # Validate each distinct package name once for the whole batch
+        package_errors = {}
+        for package_name in {event.package_name for event in batch_data.events}:
+            try:
+                await validate_package_match(api_key, package_name)
+            except HTTPException as e:
+                package_errors[package_name] = e
 
         for i, event_data in enumerate(batch_data.events):
             try:
-                # Validate that API key matches the package in each event
-                await validate_package_match(api_key, event_data.package_name)
+                if event_data.package_name in package_errors:
+                    raise package_errors[event_data.package_name]
 
                 # Parse user identifiers
                 installation_id_uuid = None
@@ -260,50 +304,29 @@ async def create_analytics_events_batch(
                     try:
                         installation_id_uuid = UUID(event_data.installation_id)
                     except (ValueError, AttributeError):
-                        logger.warning(f"Invalid installation_id format in batch event {i}: {event_data.installation_id}")
-
-                # Create analytics event
-                analytics_event = AnalyticsEvent(
-                    api_key=api_key.key,
-                    session_id=UUID(event_data.session_id),
-                    package_name=event_data.package_name,
-                    package_version=event_data.package_version,
-                    python_version=event_data.python_version,
-                    python_implementation=event_data.python_implementation,
-                    os_type=event_data.os_type,
-                    os_version=event_data.os_version,
-                    os_release=event_data.os_release,
-                    architecture=event_data.architecture,
-                    installation_method=event_data.installation_method,
-                    virtual_env=event_data.virtual_env,
-                    virtual_env_type=event_data.virtual_env_type,
-                    cpu_count=event_data.cpu_count,
-                    total_memory_gb=event_data.total_memory_gb,
-                    entry_point=event_data.entry_point,
-                    extra_data=event_data.extra_data,
-                    event_timestamp=event_data.event_timestamp,
-                    # Unique user tracking fields
-                    installation_id=installation_id_uuid,
-                    fingerprint_hash=event_data.fingerprint_hash,
-                    user_identifier=event_data.user_identifier,
-                )
+                        logger.warning("Invalid installation_id format in batch event %s: %s", i, event_data.installation_id)
 
-                db.add(analytics_event)
+                row = _build_event_row(
+                    event_data, api_key, installation_id_uuid, received_at
+                )
+                rows.append(row)
+                event_id = row["id"]
                 created_events.append(
                     {
                         "index": i,
-                        "session_id": event_data.session_id,
+                        "event_id": str(event_id),
+                        "session_id": str(event_data.session_id),
                         "package_name": event_data.package_name,
                     }
                 )
 
             except Exception as e:
-                logger.warning(f"Failed to process event {i}: {e}")
+                logger.warning("Failed to process event %s: %s", i, e)
                 failed_events.append(
                     {
                         "index": i,
                         "error": str(e),
-                        "session_id": event_data.session_id
+                        "session_id": str(event_data.session_id)
                         if hasattr(event_data, "session_id")
                         else None,
                     }
@@ -320,8 +343,13 @@ async def create_analytics_events_batch(
                 },
             )
 
-        # Commit successful events
-        await db.commit()
+        if settings.ANALYTICS_ASYNC_INGEST:
+            # Persisted by the ingest queue writers
+            await ingest_queue.put(rows)
+        else:
+            # Insert all valid events in a single round-trip
+            await AnalyticsEventRepository(db).bulk_insert_events(rows)
+            await db.commit()
 
         # Add rate limit headers to response
         if hasattr(request.state, "rate_limit_info"):
@@ -331,8 +359,10 @@ async def create_analytics_events_batch(
             response.headers["X-RateLimit-Reset"] = str(info["reset"])
 
         logger.info(
-            f"Batch analytics: {len(created_events)} events created, "
-            f"{len(failed_events)} events failed for package '{api_key.package_name}'"
+            "Batch analytics: %s events created, %s events failed for package '%s'",
+            len(created_events),
+            len(failed_events),
+            api_key.package_name,
         )
 
         return {
@@ -348,7 +378,7 @@ async def create_analytics_events_batch(
         # Re-raise HTTP exceptions (auth, rate limit, validation errors)
         raise
     except Exception as e:
-        logger.error(f"Error creating analytics batch: {e}")
+        logger.error("Error creating analytics batch: %s", e)
         await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to process analytics batch")
 
@@ -359,8 +389,13 @@ async def analytics_health_check():
     Health check endpoint for analytics API.
     No authentication required.
     """
-    return {
-        "status": "healthy",
-        "service": "analytics",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    # Load balancers poll this at high rates; reuse the response for a second
+    health = _health_cache.get("analytics")
+    if health is None:
+        health = {
+            "status": "healthy",
+            "service": "analytics",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        _health_cache.set("analytics", health)
+    return health
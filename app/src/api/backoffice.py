@@ -1,78 +1,128 @@
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta, timezone
+from sqlalchemy import Select, select, func, tuple_
+from datetime import datetime
+from typing import Any, Callable, Optional, Tuple
+from uuid import UUID
 
-from src.core.database import get_db
+from src.core.database import get_read_db
 from src.core.auth import require_admin
 from src.core.templates import templates
 from src.models.user import User
 from src.models.api_key import APIKey
 from src.models.analytics_event import AnalyticsEvent
+from src.services.backoffice_stats import (
+    dashboard_stats,
+    event_stats,
+    get_backoffice_stats,
+    refresh_backoffice_stats,
+)
 
 router = APIRouter(prefix="/backoffice", tags=["backoffice"])
 
+BACKOFFICE_PAGE_SIZE = 50
+BACKOFFICE_MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(timestamp: datetime, row_id: Any) -> str:
+    """Build a keyset cursor from the last row's sort timestamp and id."""
+    return f"{timestamp.isoformat()}|{row_id}"
+
+
+def _decode_cursor(cursor: str, parse_id: Callable[[str], Any]) -> Tuple[datetime, Any]:
+    """Split a keyset cursor into its timestamp and id."""
+    try:
+        timestamp, row_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), parse_id(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _keyset_page(
+    query: Select,
+    timestamp_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    parse_id: Callable[[str], Any] = int,
+) -> Select:
+    """
+    Restrict a query to one page, newest first, starting after the cursor.
+
+    Rows are ordered by (timestamp, id) so ties on the timestamp still page
+    deterministically. One extra row is fetched to detect a next page.
+    """
+    if cursor:
+        timestamp, row_id = _decode_cursor(cursor, parse_id)
+        query = query.where(
+            tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id)
+        )
+    return query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+# Columns rendered by the list pages; selected as plain rows to skip ORM hydration
+USER_LIST_COLUMNS = (
+    User.id,
+    User.email,
+    User.is_active,
+    User.is_verified,
+    User.is_admin,
+    User.created_at,
+    User.updated_at,
+)
+
+API_KEY_LIST_COLUMNS = (
+    APIKey.id,
+    APIKey.key,
+    APIKey.package_name,
+    APIKey.created_at,
+    APIKey.updated_at,
+    User.email.label("user_email"),
+    User.is_admin.label("user_is_admin"),
+)
+
+EVENT_LIST_COLUMNS = (
+    AnalyticsEvent.id,
+    AnalyticsEvent.package_name,
+    AnalyticsEvent.package_version,
+    AnalyticsEvent.python_version,
+    AnalyticsEvent.os_type,
+    AnalyticsEvent.architecture,
+    AnalyticsEvent.api_key,
+    AnalyticsEvent.received_at,
+    AnalyticsEvent.event_timestamp,
+)
+
 
 @router.get("/", response_class=HTMLResponse)
 async def backoffice_dashboard(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    exact: bool = Query(False, description="Count every row instead of estimating"),
+    db: AsyncSession = Depends(get_read_db),
     admin_user_id: int = Depends(require_admin),
 ):
     """Admin dashboard with overview statistics."""
 
-    # Get basic statistics
-    total_users = await db.scalar(select(func.count(User.id)))
-    active_users = await db.scalar(
-        select(func.count(User.id)).where(User.is_active, User.is_verified)
-    )
-    total_api_keys = await db.scalar(select(func.count(APIKey.id)))
-    unique_packages = await db.scalar(
-        select(func.count(func.distinct(APIKey.package_name)))
-    )
-    total_events = await db.scalar(select(func.count(AnalyticsEvent.id)))
-
-    # Get week statistics
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    new_users_this_week = await db.scalar(
-        select(func.count(User.id)).where(User.created_at >= week_ago)
-    )
-    new_keys_this_week = await db.scalar(
-        select(func.count(APIKey.id)).where(APIKey.created_at >= week_ago)
-    )
-    new_events_this_week = await db.scalar(
-        select(func.count(AnalyticsEvent.id)).where(
-            AnalyticsEvent.received_at >= week_ago
-        )
-    )
+    if exact:
+        stats = await dashboard_stats(db, exact=True)
+    else:
+        stats = await get_backoffice_stats("dashboard", db)
 
     # Get recent users (last 5)
     recent_users_result = await db.execute(
-        select(User).order_by(User.created_at.desc()).limit(5)
+        select(*USER_LIST_COLUMNS).order_by(User.created_at.desc()).limit(5)
     )
-    recent_users = recent_users_result.scalars().all()
+    recent_users = recent_users_result.all()
 
-    # Get recent API keys (last 5) with user information
+    # Get recent API keys (last 5) with their owner's email
     recent_keys_result = await db.execute(
-        select(APIKey)
-        .options(selectinload(APIKey.user))
+        select(*API_KEY_LIST_COLUMNS)
+        .outerjoin(User, APIKey.user_id == User.id)
         .order_by(APIKey.created_at.desc())
         .limit(5)
     )
-    recent_api_keys = recent_keys_result.scalars().all()
-
-    stats = {
-        "total_users": total_users or 0,
-        "active_users": active_users or 0,
-        "total_api_keys": total_api_keys or 0,
-        "unique_packages": unique_packages or 0,
-        "total_events": total_events or 0,
-        "new_users_this_week": new_users_this_week or 0,
-        "new_keys_this_week": new_keys_this_week or 0,
-        "new_events_this_week": new_events_this_week or 0,
-    }
+    recent_api_keys = recent_keys_result.all()
 
     return templates.TemplateResponse(
         "backoffice/dashboard.html",
@@ -88,43 +138,43 @@ async def backoffice_dashboard(
 @router.get("/users", response_class=HTMLResponse)
 async def backoffice_users(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(BACKOFFICE_PAGE_SIZE, ge=1, le=BACKOFFICE_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     admin_user_id: int = Depends(require_admin),
 ):
-    """List all users with statistics."""
+    """List users a page at a time with statistics."""
 
-    # Get user statistics
-    total_users = await db.scalar(select(func.count(User.id)))
-    active_users = await db.scalar(
-        select(func.count(User.id)).where(User.is_active, User.is_verified)
-    )
-    verified_users = await db.scalar(
-        select(func.count(User.id)).where(User.is_verified)
-    )
-    admin_users = await db.scalar(select(func.count(User.id)).where(User.is_admin))
+    stats = await get_backoffice_stats("users", db)
 
-    # Get all users with their API key counts
+    # Get a page of users with their API key counts
     users_result = await db.execute(
-        select(User, func.count(APIKey.id).label("api_key_count"))
-        .outerjoin(APIKey)
-        .group_by(User.id)
-        .order_by(User.created_at.desc())
+        _keyset_page(
+            select(*USER_LIST_COLUMNS, func.count(APIKey.id).label("api_key_count"))
+            .outerjoin(APIKey)
+            .group_by(User.id),
+            User.created_at,
+            User.id,
+            cursor,
+            limit,
+        )
     )
+    users = users_result.all()
 
-    users_with_counts = []
-    for user, api_key_count in users_result:
-        user.api_key_count = api_key_count
-        users_with_counts.append(user)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = _encode_cursor(users[-1].created_at, users[-1].id)
 
     return templates.TemplateResponse(
         "backoffice/users.html",
         {
             "request": request,
-            "users": users_with_counts,
-            "total_users": total_users or 0,
-            "active_users": active_users or 0,
-            "verified_users": verified_users or 0,
-            "admin_users": admin_users or 0,
+            "users": users,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "limit": limit,
+            **stats,
         },
     )
 
@@ -132,45 +182,41 @@ async def backoffice_users(
 @router.get("/api-keys", response_class=HTMLResponse)
 async def backoffice_api_keys(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(BACKOFFICE_PAGE_SIZE, ge=1, le=BACKOFFICE_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     admin_user_id: int = Depends(require_admin),
 ):
-    """List all API keys with statistics."""
-
-    # Get API key statistics
-    total_keys = await db.scalar(select(func.count(APIKey.id)))
-    unique_packages = await db.scalar(
-        select(func.count(func.distinct(APIKey.package_name)))
-    )
+    """List API keys a page at a time with statistics."""
 
-    # Get time-based statistics
-    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-
-    keys_this_month = await db.scalar(
-        select(func.count(APIKey.id)).where(APIKey.created_at >= month_ago)
-    )
-    keys_this_week = await db.scalar(
-        select(func.count(APIKey.id)).where(APIKey.created_at >= week_ago)
-    )
+    stats = await get_backoffice_stats("api_keys", db)
 
-    # Get all API keys with user information (eager load the user relationship)
+    # Get a page of API keys with their owner's email
     api_keys_result = await db.execute(
-        select(APIKey)
-        .options(selectinload(APIKey.user))
-        .order_by(APIKey.created_at.desc())
+        _keyset_page(
+            select(*API_KEY_LIST_COLUMNS).outerjoin(User, APIKey.user_id == User.id),
+            APIKey.created_at,
+            APIKey.id,
+            cursor,
+            limit,
+        )
     )
-    api_keys = api_keys_result.scalars().all()
+    api_keys = api_keys_result.all()
+
+    next_cursor = None
+    if len(api_keys) > limit:
+        api_keys = api_keys[:limit]
+        next_cursor = _encode_cursor(api_keys[-1].created_at, api_keys[-1].id)
 
     return templates.TemplateResponse(
         "backoffice/api-keys.html",
         {
             "request": request,
             "api_keys": api_keys,
-            "total_keys": total_keys or 0,
-            "unique_packages": unique_packages or 0,
-            "keys_this_month": keys_this_month or 0,
-            "keys_this_week": keys_this_week or 0,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "limit": limit,
+            **stats,
         },
     )
 
@@ -178,60 +224,52 @@ async def backoffice_api_keys(
 @router.get("/events", response_class=HTMLResponse)
 async def backoffice_events(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(BACKOFFICE_PAGE_SIZE, ge=1, le=BACKOFFICE_MAX_PAGE_SIZE),
+    exact: bool = Query(False, description="Count every row instead of estimating"),
+    db: AsyncSession = Depends(get_read_db),
     admin_user_id: int = Depends(require_admin),
 ):
-    """List all analytics events with statistics."""
+    """List analytics events a page at a time with statistics."""
 
-    # Get event statistics
-    total_events = await db.scalar(select(func.count(AnalyticsEvent.id)))
-    # Analytics events don't have a processed state - they're raw event data
-    processed_events = 0
-    pending_events = 0
-
-    # Get time-based statistics
-    today = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    if exact:
+        stats = await event_stats(db, exact=True)
+    else:
+        stats = await get_backoffice_stats("events", db)
 
-    events_today = await db.scalar(
-        select(func.count(AnalyticsEvent.id)).where(AnalyticsEvent.received_at >= today)
-    )
-    events_this_week = await db.scalar(
-        select(func.count(AnalyticsEvent.id)).where(
-            AnalyticsEvent.received_at >= week_ago
-        )
-    )
-    events_this_month = await db.scalar(
-        select(func.count(AnalyticsEvent.id)).where(
-            AnalyticsEvent.received_at >= month_ago
+    # Get a page of events, most recently received first
+    events_result = await db.execute(
+        _keyset_page(
+            select(*EVENT_LIST_COLUMNS),
+            AnalyticsEvent.received_at,
+            AnalyticsEvent.id,
+            cursor,
+            limit,
+            parse_id=UUID,
         )
     )
+    events = events_result.all()
 
-    # Get unique packages from events
-    unique_packages_from_events = await db.scalar(
-        select(func.count(func.distinct(AnalyticsEvent.package_name)))
-    )
-
-    # Get all events with pagination (limit to last 100 for performance)
-    events_result = await db.execute(
-        select(AnalyticsEvent).order_by(AnalyticsEvent.received_at.desc()).limit(100)
-    )
-    events = events_result.scalars().all()
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = _encode_cursor(events[-1].received_at, events[-1].id)
 
     return templates.TemplateResponse(
         "backoffice/events.html",
         {
             "request": request,
             "events": events,
-            "total_events": total_events or 0,
-            "processed_events": processed_events or 0,
-            "pending_events": pending_events or 0,
-            "events_today": events_today or 0,
-            "events_this_week": events_this_week or 0,
-            "events_this_month": events_this_month or 0,
-            "unique_packages_from_events": unique_packages_from_events or 0,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "limit": limit,
+            **stats,
         },
     )
+
+
+@router.post("/refresh-stats")
+async def backoffice_refresh_stats(admin_user_id: int = Depends(require_admin)):
+    """Recompute cached statistics now, e.g. after manual database changes."""
+    await refresh_backoffice_stats()
+    return RedirectResponse(url="/backoffice", status_code=303)
@@ -1,9 +1,14 @@
+import functools
 import logging
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
 
 from src.core.auth import get_current_user_id
-from src.core.service_dependencies import get_api_key_service
+from src.core.cache import SingleFlight, TTLCache
+from src.core.config import settings
+from src.core.service_dependencies import get_api_key_service, get_read_api_key_service
 from src.schemas.badge import BadgePublicResponse, BadgeUpdate
 from src.services.api_key_service import APIKeyService
 
@@ -11,49 +16,92 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/badge", tags=["badge"])
 
-
-def generate_badge_svg(package_name: str, unique_users: int) -> str:
-    """Generate SVG badge for unique users count."""
-    # Calculate text widths (approximate)
-    label = "unique users"
-    value = str(unique_users)
-
-    # Approximate character width in pixels
-    char_width = 6.5
-    label_width = len(label) * char_width + 10
-    value_width = len(value) * char_width + 10
-    total_width = label_width + value_width
-
-    # SVG template
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="{int(total_width)}" height="20" role="img" aria-label="{label}: {value}">
-    <title>{label}: {value}</title>
+# Rendered SVGs by badge UUID; badges are embedded in READMEs and polled often
+badge_svg_cache: TTLCache[bytes] = TTLCache(
+    ttl_seconds=settings.BADGE_CACHE_TTL_SECONDS
+)
+# Concurrent lookups of the same badge share a single database round-trip
+_badge_lookups: SingleFlight[Optional[dict]] = SingleFlight()
+
+BADGE_CACHE_CONTROL = (
+    f"public, max-age={settings.BADGE_CACHE_TTL_SECONDS}, stale-while-revalidate=60"
+)
+
+
+# The label never changes, so everything derived from it is computed once
+BADGE_LABEL = "unique users"
+BADGE_CHAR_WIDTH = 6.5  # Approximate character width in pixels
+_LABEL_WIDTH = len(BADGE_LABEL) * BADGE_CHAR_WIDTH + 10
+_LABEL_TEXT_LENGTH = int((len(BADGE_LABEL) * BADGE_CHAR_WIDTH) * 10)
+_LABEL_X = int(_LABEL_WIDTH / 2 * 10)
+
+# SVG template split at its value-dependent interpolation points
+_SVG_SEGMENTS = tuple(
+    segment.encode()
+    for segment in (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="',
+        f'" height="20" role="img" aria-label="{BADGE_LABEL}: ',
+        f'">\n    <title>{BADGE_LABEL}: ',
+        """</title>
     <linearGradient id="s" x2="0" y2="100%">
         <stop offset="0" stop-color="#bbb" stop-opacity=".1"/>
         <stop offset="1" stop-opacity=".1"/>
     </linearGradient>
     <clipPath id="r">
-        <rect width="{int(total_width)}" height="20" rx="3" fill="#fff"/>
+        <rect width=\"""",
+        f"""" height="20" rx="3" fill="#fff"/>
     </clipPath>
     <g clip-path="url(#r)">
-        <rect width="{int(label_width)}" height="20" fill="#555"/>
-        <rect x="{int(label_width)}" width="{int(value_width)}" height="20" fill="#4c1"/>
-        <rect width="{int(total_width)}" height="20" fill="url(#s)"/>
+        <rect width="{int(_LABEL_WIDTH)}" height="20" fill="#555"/>
+        <rect x="{int(_LABEL_WIDTH)}" width=\"""",
+        """" height="20" fill="#4c1"/>
+        <rect width=\"""",
+        f"""" height="20" fill="url(#s)"/>
     </g>
     <g fill="#fff" text-anchor="middle" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" text-rendering="geometricPrecision" font-size="110">
-        <text aria-hidden="true" x="{int(label_width/2*10)}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" textLength="{int((len(label) * char_width)*10)}">{label}</text>
-        <text x="{int(label_width/2*10)}" y="140" transform="scale(.1)" fill="#fff" textLength="{int((len(label) * char_width)*10)}">{label}</text>
-        <text aria-hidden="true" x="{int((label_width + value_width/2)*10)}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" textLength="{int((len(value) * char_width)*10)}">{value}</text>
-        <text x="{int((label_width + value_width/2)*10)}" y="140" transform="scale(.1)" fill="#fff" textLength="{int((len(value) * char_width)*10)}">{value}</text>
+        <text aria-hidden="true" x="{_LABEL_X}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" textLength="{_LABEL_TEXT_LENGTH}">{BADGE_LABEL}</text>
+        <text x="{_LABEL_X}" y="140" transform="scale(.1)" fill="#fff" textLength="{_LABEL_TEXT_LENGTH}">{BADGE_LABEL}</text>
+        <text aria-hidden="true" x=\"""",
+        '" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" textLength="',
+        '">',
+        """</text>
+        <text x=\"""",
+        '" y="140" transform="scale(.1)" fill="#fff" textLength="',
+        '">',
+        """</text>
     </g>
-</svg>'''
+</svg>""",
+    )
+)
+
+
+def generate_badge_svg(package_name: str, unique_users: int) -> bytes:
+    """Generate SVG badge for unique users count."""
+    # The label is fixed, so the rendered badge depends only on the count
+    return _render_badge(unique_users)
 
-    return svg
+
+@functools.lru_cache(maxsize=1024)
+def _render_badge(unique_users: int) -> bytes:
+    value = b"%d" % unique_users
+    value_width = len(value) * BADGE_CHAR_WIDTH + 10
+    total_width = b"%d" % (_LABEL_WIDTH + value_width)
+    value_x = b"%d" % ((_LABEL_WIDTH + value_width / 2) * 10)
+    value_text_length = b"%d" % ((len(value) * BADGE_CHAR_WIDTH) * 10)
+
+    seg = _SVG_SEGMENTS
+    return b"".join((
+        seg[0], total_width, seg[1], value, seg[2], value, seg[3], total_width,
+        seg[4], b"%d" % value_width, seg[5], total_width, seg[6], value_x,
+        seg[7], value_text_length, seg[8], value, seg[9], value_x,
+        seg[10], value_text_length, seg[11], value, seg[12],
+    ))
 
 
 @router.get("/{badge_uuid}.svg", response_class=Response)
 async def get_badge_svg(
     badge_uuid: str,
-    api_key_service: APIKeyService = Depends(get_api_key_service)
+    api_key_service: APIKeyService = Depends(get_read_api_key_service)
 ):
     """
     Get badge SVG for a specific badge UUID.
@@ -62,43 +110,58 @@ async def get_badge_svg(
     Usage:
     - Embed in README: ![Users](https://klyne.app/badge/{badge_uuid}.svg)
     """
-    logger.debug(f"Badge request for UUID {badge_uuid}")
-
-    # Get badge data (returns None if not public or invalid UUID)
-    badge_data = await api_key_service.get_badge_data_by_uuid(badge_uuid)
-
-    if not badge_data:
-        logger.debug(f"Badge not found or not public for UUID {badge_uuid}")
-        # Return a "badge not public" SVG instead of 404
-        svg = generate_badge_svg("unique users", 0)
-        return Response(content=svg, media_type="image/svg+xml")
+    logger.debug("Badge request for UUID %s", badge_uuid)
 
-    # Generate and return SVG
-    svg = generate_badge_svg(badge_data["package_name"], badge_data["unique_users"])
+    svg = badge_svg_cache.get(badge_uuid)
+    if svg is None:
+        svg = await _render_badge_svg(badge_uuid, api_key_service)
+        badge_svg_cache.set(badge_uuid, svg)
 
-    # Add cache headers (cache for 1 hour)
+    # Let browsers and CDNs absorb repeat requests
     return Response(
         content=svg,
         media_type="image/svg+xml",
         headers={
-            "Cache-Control": "public, max-age=3600",
+            "Cache-Control": BADGE_CACHE_CONTROL,
             "Content-Type": "image/svg+xml; charset=utf-8"
         }
     )
 
 
+async def _get_badge_data(
+    badge_uuid: str, api_key_service: APIKeyService
+) -> Optional[dict]:
+    """Look up public badge data, sharing the query between concurrent requests."""
+    return await _badge_lookups.do(
+        badge_uuid, lambda: api_key_service.get_badge_data_by_uuid(badge_uuid)
+    )
+
+
+async def _render_badge_svg(badge_uuid: str, api_key_service: APIKeyService) -> bytes:
+    """Look up badge data and render its SVG."""
+    # Get badge data (returns None if not public or invalid UUID)
+    badge_data = await _get_badge_data(badge_uuid, api_key_service)
+
+    if not badge_data:
+        logger.debug("Badge not found or not public for UUID %s", badge_uuid)
+        # Return a "badge not public" SVG instead of 404
+        return generate_badge_svg("unique users", 0)
+
+    return generate_badge_svg(badge_data["package_name"], badge_data["unique_users"])
+
+
 @router.get("/{badge_uuid}/data")
 async def get_badge_data(
     badge_uuid: str,
-    api_key_service: APIKeyService = Depends(get_api_key_service)
+    api_key_service: APIKeyService = Depends(get_read_api_key_service)
 ) -> BadgePublicResponse:
     """
     Get badge data as JSON for a specific badge UUID.
     This is a public endpoint that only works if the badge is marked as public.
     """
-    logger.debug(f"Badge data request for UUID {badge_uuid}")
+    logger.debug("Badge data request for UUID %s", badge_uuid)
 
-    badge_data = await api_key_service.get_badge_data_by_uuid(badge_uuid)
+    badge_data = await _get_badge_data(badge_uuid, api_key_service)
 
     if not badge_data:
         raise HTTPException(status_code=404, detail="Badge not found or not public")
@@ -127,6 +190,12 @@ async def update_badge_visibility(
         user_id, api_key_id, update.is_public
     )
 
-    logger.info(f"Updated badge visibility for API key {api_key_id} to {update.is_public}")
+    # Serve the new visibility immediately rather than after the cache expires
+    if result.get("badge_uuid"):
+        badge_svg_cache.invalidate(result["badge_uuid"])
+
+    logger.info(
+        "Updated badge visibility for API key %s to %s", api_key_id, update.is_public
+    )
 
     return result
@@ -2,15 +2,30 @@
 Refactored Dashboard API endpoints using the new architecture with services and repositories.
 """
 
+import asyncio
+import functools
+import hashlib
+import inspect
+import re
+import time
 from datetime import date
-from typing import Optional, List, Annotated
+from itertools import islice
+from typing import Optional, List, Annotated, Set, Tuple
 from enum import Enum
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
 import logging
+import pydantic_core
 
 from src.core.auth import require_authentication
+from src.core.cache import SingleFlight
+from src.core.config import settings
 from src.core.service_dependencies import get_analytics_service
-from src.services.analytics_service import AnalyticsService
+from src.services.analytics_service import (
+    AnalyticsService,
+    dashboard_cache,
+    dashboard_cache_generation,
+    dashboard_cache_key,
+)
 from src.schemas.dashboard import (
     PackageOverview,
     TimeSeriesData,
@@ -36,8 +51,95 @@ class AggregationPeriod(str, Enum):
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 logger = logging.getLogger(__name__)
 
+_EVENT_TYPE_RE = re.compile(r'[a-zA-Z0-9_\-\.]+')
+# The whole comma-separated list, with optional whitespace around each event
+# type; the Query pattern alone would accept whitespace inside an event type
+_EVENT_TYPES_LIST_RE = re.compile(
+    r'\s*(?:[a-zA-Z0-9_\-\.]+\s*)?(?:,\s*(?:[a-zA-Z0-9_\-\.]+\s*)?)*'
+)
+_MAX_EVENT_TYPES = 50
+
+
+# Background refreshes of stale dashboard responses, at most one per cache key
+_revalidations: SingleFlight[None] = SingleFlight()
+_revalidation_tasks: Set[asyncio.Task] = set()
+
+
+def cached_json_response(func):
+    """Serve an endpoint's result as JSON encoded once and cached per user and parameters.
+
+    Returning a Response skips FastAPI's response-model validation and
+    re-encoding; the return annotation still documents the schema. Responses
+    carry an ETag of the body, so polling clients that send it back in
+    If-None-Match get an empty 304 while the data is unchanged.
+
+    Once an entry is older than DASHBOARD_CACHE_TTL_SECONDS it is still served,
+    and refreshed in the background on a session of its own.
+    """
+
+    async def encode(key, /, **kwargs) -> Tuple[str, bytes]:
+        user_id = key[0]
+        generation = dashboard_cache_generation(user_id)
+        body = pydantic_core.to_json(await func(**kwargs))
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        # Don't cache a body computed from data the user has since changed
+        if dashboard_cache_generation(user_id) == generation:
+            fresh_until = time.monotonic() + settings.DASHBOARD_CACHE_TTL_SECONDS
+            dashboard_cache.set(key, (fresh_until, etag, body))
+        return etag, body
+
+    async def revalidate(key, analytics_service: AnalyticsService, params: dict) -> None:
+        try:
+            async with analytics_service.on_own_session() as service:
+                await encode(key, analytics_service=service, **params)
+        except Exception:
+            logger.exception("Failed to refresh cached %s response", func.__name__)
+
+    def schedule_revalidation(key, kwargs: dict) -> None:
+        params = dict(kwargs)
+        analytics_service = params.pop("analytics_service")
+        task = asyncio.create_task(
+            _revalidations.do(key, lambda: revalidate(key, analytics_service, params))
+        )
+        _revalidation_tasks.add(task)
+        task.add_done_callback(_revalidation_tasks.discard)
+
+    @functools.wraps(func)
+    async def wrapper(request: Request, **kwargs):
+        key = dashboard_cache_key(func.__name__, **kwargs)
+        entry = dashboard_cache.get(key)
+        if entry is not None and time.monotonic() >= entry[0]:
+            if kwargs["analytics_service"].session_factory is None:
+                entry = None
+            else:
+                schedule_revalidation(key, kwargs)
+
+        if entry is None:
+            etag, body = await encode(key, **kwargs)
+        else:
+            _, etag, body = entry
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    # FastAPI reads the endpoint's signature; expose the request alongside it
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(
+        parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ]
+    )
+
+    return wrapper
+
 
 @router.get("/overview")
+@cached_json_response
 async def get_dashboard_overview(
     package_name: Optional[str] = Query(None, description="Filter by package name"),
     user_id: int = Depends(require_authentication),
@@ -46,11 +148,12 @@ async def get_dashboard_overview(
     """
     Get overview statistics for all user's packages or a specific package.
     """
-    logger.info(f"Getting dashboard overview for user {user_id}, package filter: {package_name}")
+    logger.info("Getting dashboard overview for user %s, package filter: %s", user_id, package_name)
     return await analytics_service.get_package_overview(user_id, package_name)
 
 
 @router.get("/timeseries")
+@cached_json_response
 async def get_timeseries_data(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -63,7 +166,7 @@ async def get_timeseries_data(
     Get time-series data for package usage over time.
     Supports daily, weekly, and monthly aggregation.
     """
-    logger.info(f"Getting timeseries data for user {user_id}, package: {package_name}, aggregation: {aggregation}")
+    logger.info("Getting timeseries data for user %s, package: %s, aggregation: %s", user_id, package_name, aggregation)
     return await analytics_service.get_timeseries_data(
         user_id=user_id,
         package_name=package_name,
@@ -74,68 +177,84 @@ async def get_timeseries_data(
 
 
 @router.get("/python-versions")
+@cached_json_response
 async def get_python_version_distribution(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    include_sessions: bool = Query(True, description="Also count sessions, which costs more than events"),
+    top_k: int = Query(20, ge=1, le=100, description="Values beyond the most used top_k are summed into an \"Other\" row"),
     user_id: int = Depends(require_authentication),
     analytics_service: AnalyticsService = Depends(get_analytics_service),
 ) -> List[PythonVersionDistribution]:
     """
     Get Python version distribution for packages.
     """
-    logger.info(f"Getting Python version distribution for user {user_id}")
+    logger.info("Getting Python version distribution for user %s", user_id)
     return await analytics_service.get_python_version_distribution(
         user_id=user_id,
         package_name=package_name,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        include_sessions=include_sessions,
+        top_k=top_k,
     )
 
 
 @router.get("/operating-systems")
+@cached_json_response
 async def get_os_distribution(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    include_sessions: bool = Query(True, description="Also count sessions, which costs more than events"),
+    top_k: int = Query(20, ge=1, le=100, description="Values beyond the most used top_k are summed into an \"Other\" row"),
     user_id: int = Depends(require_authentication),
     analytics_service: AnalyticsService = Depends(get_analytics_service),
 ) -> List[OSDistribution]:
     """
     Get operating system distribution for packages.
     """
-    logger.info(f"Getting OS distribution for user {user_id}")
+    logger.info("Getting OS distribution for user %s", user_id)
     return await analytics_service.get_os_distribution(
         user_id=user_id,
         package_name=package_name,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        include_sessions=include_sessions,
+        top_k=top_k,
     )
 
 
 @router.get("/package-versions")
+@cached_json_response
 async def get_package_version_adoption(
     package_name: str = Query(..., description="Package name to analyze"),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    include_sessions: bool = Query(True, description="Also count sessions, which costs more than events"),
+    top_k: int = Query(20, ge=1, le=100, description="Values beyond the most used top_k are summed into an \"Other\" row"),
     user_id: int = Depends(require_authentication),
     analytics_service: AnalyticsService = Depends(get_analytics_service),
 ) -> List[PackageVersionAdoption]:
     """
     Get package version adoption statistics.
     """
-    logger.info(f"Getting package version adoption for user {user_id}, package: {package_name}")
+    logger.info("Getting package version adoption for user %s, package: %s", user_id, package_name)
     return await analytics_service.get_package_version_adoption(
         user_id=user_id,
         package_name=package_name,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        include_sessions=include_sessions,
+        top_k=top_k,
     )
 
 
 # Unique User Tracking Endpoints
 
 @router.get("/unique-users")
+@cached_json_response
 async def get_unique_users_overview(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -146,7 +265,7 @@ async def get_unique_users_overview(
     """
     Get overview of unique users with DAU/WAU/MAU metrics.
     """
-    logger.info(f"Getting unique users overview for user {user_id}, package: {package_name}")
+    logger.info("Getting unique users overview for user %s, package: %s", user_id, package_name)
     return await analytics_service.get_unique_users_overview(
         user_id=user_id,
         package_name=package_name,
@@ -156,6 +275,7 @@ async def get_unique_users_overview(
 
 
 @router.get("/active-users")
+@cached_json_response
 async def get_active_users_timeseries(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -166,7 +286,7 @@ async def get_active_users_timeseries(
     """
     Get time series data for active users (DAU/WAU/MAU over time).
     """
-    logger.info(f"Getting active users timeseries for user {user_id}")
+    logger.info("Getting active users timeseries for user %s", user_id)
     return await analytics_service.get_active_users_timeseries(
         user_id=user_id,
         package_name=package_name,
@@ -176,6 +296,7 @@ async def get_active_users_timeseries(
 
 
 @router.get("/user-retention")
+@cached_json_response
 async def get_user_retention_metrics(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -186,7 +307,7 @@ async def get_user_retention_metrics(
     """
     Get user retention and engagement metrics.
     """
-    logger.info(f"Getting user retention metrics for user {user_id}")
+    logger.info("Getting user retention metrics for user %s", user_id)
     return await analytics_service.get_user_retention_metrics(
         user_id=user_id,
         package_name=package_name,
@@ -196,6 +317,7 @@ async def get_user_retention_metrics(
 
 
 @router.get("/unique-users/by-os")
+@cached_json_response
 async def get_unique_users_by_os(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -206,7 +328,7 @@ async def get_unique_users_by_os(
     """
     Get unique users broken down by operating system.
     """
-    logger.info(f"Getting unique users by OS for user {user_id}")
+    logger.info("Getting unique users by OS for user %s", user_id)
     return await analytics_service.get_unique_users_by_os(
         user_id=user_id,
         package_name=package_name,
@@ -216,6 +338,7 @@ async def get_unique_users_by_os(
 
 
 @router.get("/unique-users/by-python-version")
+@cached_json_response
 async def get_unique_users_by_python_version(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -226,7 +349,7 @@ async def get_unique_users_by_python_version(
     """
     Get unique users broken down by Python version.
     """
-    logger.info(f"Getting unique users by Python version for user {user_id}")
+    logger.info("Getting unique users by Python version for user %s", user_id)
     return await analytics_service.get_unique_users_by_python_version(
         user_id=user_id,
         package_name=package_name,
@@ -236,6 +359,7 @@ async def get_unique_users_by_python_version(
 
 
 @router.get("/custom-events/types")
+@cached_json_response
 async def get_custom_event_types(
     package_name: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
@@ -247,7 +371,7 @@ async def get_custom_event_types(
     Get all custom event types tracked for the user's packages.
     Returns event names with their total counts.
     """
-    logger.info(f"Getting custom event types for user {user_id}")
+    logger.info("Getting custom event types for user %s", user_id)
     return await analytics_service.get_custom_event_types_for_user(
         user_id=user_id,
         package_name=package_name,
@@ -257,6 +381,7 @@ async def get_custom_event_types(
 
 
 @router.get("/custom-events/timeseries")
+@cached_json_response
 async def get_custom_events_timeseries(
     event_types: Annotated[str, Query(
         ...,
@@ -276,29 +401,32 @@ async def get_custom_events_timeseries(
     Event types must contain only alphanumeric characters, underscores, hyphens, and dots.
     Supports aggregation by day, week, or month.
     """
-    logger.info(f"Getting custom events timeseries for user {user_id}, events: {event_types}, aggregation: {aggregation}")
-
-    # Parse and validate comma-separated event types
-    import re
-    event_pattern = re.compile(r'^[a-zA-Z0-9_\-\.]+$')
-    event_types_list = []
-
-    for e in event_types.split(","):
-        e_stripped = e.strip()
-        if e_stripped:
-            if not event_pattern.match(e_stripped):
-                from fastapi import HTTPException
-                raise HTTPException(
-                    status_code=422,
-                    detail=f"Invalid event type: '{e_stripped}'. Must contain only alphanumeric characters, underscores, hyphens, and dots."
-                )
-            if len(e_stripped) > 200:
-                from fastapi import HTTPException
-                raise HTTPException(
-                    status_code=422,
-                    detail=f"Event type too long: '{e_stripped}'. Maximum 200 characters allowed."
-                )
-            event_types_list.append(e_stripped)
+    logger.info("Getting custom events timeseries for user %s, events: %s, aggregation: %s", user_id, event_types, aggregation)
+
+    # Parse and validate comma-separated event types, stopping once there are
+    # more than allowed; empty entries from stray commas don't count
+    event_types_list = list(islice(
+        (t for t in (e.strip() for e in event_types.split(",")) if t),
+        _MAX_EVENT_TYPES + 1,
+    ))
+    if len(event_types_list) > _MAX_EVENT_TYPES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many event types. Maximum {_MAX_EVENT_TYPES} allowed."
+        )
+
+    too_long = next((t for t in event_types_list if len(t) > 200), None)
+    if too_long is not None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Event type too long: '{too_long}'. Maximum 200 characters allowed."
+        )
+    if not _EVENT_TYPES_LIST_RE.fullmatch(event_types):
+        invalid = next(t for t in event_types_list if not _EVENT_TYPE_RE.fullmatch(t))
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid event type: '{invalid}'. Must contain only alphanumeric characters, underscores, hyphens, and dots."
+        )
 
     return await analytics_service.get_custom_events_timeseries_for_user(
         user_id=user_id,
@@ -311,6 +439,7 @@ async def get_custom_events_timeseries(
 
 
 @router.get("/custom-events/{event_type}/details")
+@cached_json_response
 async def get_custom_event_details(
     event_type: Annotated[str, Path(
         ...,
@@ -332,7 +461,7 @@ async def get_custom_event_details(
     Event type must contain only alphanumeric characters, underscores, hyphens, and dots.
     Maximum length: 200 characters.
     """
-    logger.info(f"Getting details for custom event '{event_type}' for user {user_id}")
+    logger.info("Getting details for custom event '%s' for user %s", event_type, user_id)
     return await analytics_service.get_custom_event_details_for_user(
         user_id=user_id,
         event_type=event_type,
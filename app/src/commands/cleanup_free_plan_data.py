@@ -4,16 +4,19 @@ This job runs daily and removes analytics events older than the retention period
 for users on the free plan.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any
 
-from sqlalchemy import select, delete, text
+from sqlalchemy import select, delete, func, text
 
 from src.core.config import settings
 from src.core.database import AsyncSessionLocal
 from src.models.analytics_event import AnalyticsEvent
 from src.models.api_key import APIKey
+from src.models.daily_dimension_stats import DailyDimensionStats
+from src.models.daily_package_stats import DailyPackageStats
 from src.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -42,14 +45,15 @@ async def cleanup_free_plan_analytics_data(db=None) -> Dict[str, Any]:
     async def _cleanup(session):
         nonlocal total_deleted, users_affected, errors
         try:
-            # Get all API keys for free plan users
-            free_plan_api_keys_query = select(APIKey.key).join(User).where(
-                User.subscription_tier == 'free'
+            # Free plan keys stay in the database; only their count is needed
+            free_plan_api_keys = (
+                select(APIKey.key).join(User).where(User.subscription_tier == 'free')
+            )
+            free_plan_api_keys_count = await session.scalar(
+                select(func.count()).select_from(free_plan_api_keys.subquery())
             )
-            free_plan_api_keys_result = await session.execute(free_plan_api_keys_query)
-            free_plan_api_keys = [row.key for row in free_plan_api_keys_result.fetchall()]
 
-            if not free_plan_api_keys:
+            if not free_plan_api_keys_count:
                 logger.info("No free plan users found, skipping cleanup")
                 return {
                     "success": True,
@@ -59,18 +63,46 @@ async def cleanup_free_plan_analytics_data(db=None) -> Dict[str, Any]:
                     "errors": []
                 }
 
-            logger.info(f"Found {len(free_plan_api_keys)} free plan API keys to clean up")
-
-            # Delete old analytics events for free plan users
-            delete_query = delete(AnalyticsEvent).where(
-                AnalyticsEvent.api_key.in_(free_plan_api_keys),
-                AnalyticsEvent.event_timestamp < cutoff_date
+            logger.info(f"Found {free_plan_api_keys_count} free plan API keys to clean up")
+
+            # Delete old analytics events for free plan users, letting the
+            # database join against api_keys instead of binding every key.
+            # Each batch commits on its own, so locks and WAL stay bounded and
+            # an interrupted run keeps what it already deleted.
+            batch_size = settings.FREE_PLAN_CLEANUP_BATCH_SIZE
+            users_affected = free_plan_api_keys_count
+            batch_ids = (
+                select(AnalyticsEvent.id)
+                .where(
+                    AnalyticsEvent.api_key.in_(free_plan_api_keys),
+                    AnalyticsEvent.event_timestamp < cutoff_date
+                )
+                .limit(batch_size)
+            )
+            delete_query = (
+                delete(AnalyticsEvent)
+                .where(AnalyticsEvent.id.in_(batch_ids))
+                .execution_options(synchronize_session=False)
             )
 
-            result = await session.execute(delete_query)
-            total_deleted = result.rowcount
-            users_affected = len(free_plan_api_keys)
-
+            while True:
+                result = await session.execute(delete_query)
+                await session.commit()
+                total_deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+                # Let other tasks run between batches
+                await asyncio.sleep(0)
+
+            # The rollups are only rebuilt for recent days, so drop the days
+            # whose events are now gone
+            for rollup in (DailyPackageStats, DailyDimensionStats):
+                await session.execute(
+                    delete(rollup).where(
+                        rollup.api_key.in_(free_plan_api_keys),
+                        rollup.day < cutoff_date.date(),
+                    )
+                )
             await session.commit()
 
             logger.info(f"Cleanup completed: deleted {total_deleted} events from {users_affected} free plan users")
@@ -118,30 +150,38 @@ async def get_free_plan_data_stats(db=None) -> Dict[str, Any]:
             # Count events by age for free plan users
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=settings.FREE_PLAN_DATA_RETENTION_DAYS)
 
-            # Get total events for free plan users
-            total_events_query = text("""
-                SELECT COUNT(*) as total_events
-                FROM analytics_events ae
-                JOIN api_keys ak ON ae.api_key = ak.key
-                JOIN users u ON ak.user_id = u.id
-                WHERE u.subscription_tier = 'free'
-            """)
-
-            # Get old events that would be deleted
-            old_events_query = text("""
-                SELECT COUNT(*) as old_events
-                FROM analytics_events ae
-                JOIN api_keys ak ON ae.api_key = ak.key
-                JOIN users u ON ak.user_id = u.id
-                WHERE u.subscription_tier = 'free'
-                AND ae.event_timestamp < :cutoff_date
-            """)
-
-            total_result = await session.execute(total_events_query)
-            old_result = await session.execute(old_events_query, {"cutoff_date": cutoff_date})
-
-            total_events = total_result.fetchone().total_events
-            old_events = old_result.fetchone().old_events
+            dialect_name = session.bind.dialect.name if session.bind else 'postgresql'
+
+            if dialect_name == 'postgresql':
+                # Sum the per-day rollup instead of scanning raw events. It is
+                # as fresh as the last rollup refresh, and counts events as old
+                # by whole UTC days before the cutoff day.
+                events_query = text("""
+                    SELECT
+                        COALESCE(SUM(s.total_events), 0) AS total_events,
+                        COALESCE(
+                            SUM(s.total_events) FILTER (WHERE s.day < timezone('UTC', CAST(:cutoff_date AS timestamptz))::date), 0
+                        ) AS old_events
+                    FROM daily_package_stats s
+                    JOIN api_keys ak ON s.api_key = ak.key
+                    JOIN users u ON ak.user_id = u.id
+                    WHERE u.subscription_tier = 'free'
+                """)
+            else:
+                # Count all and old events for free plan users in one scan
+                events_query = text("""
+                    SELECT
+                        COUNT(*) AS total_events,
+                        COUNT(*) FILTER (WHERE ae.event_timestamp < :cutoff_date) AS old_events
+                    FROM analytics_events ae
+                    JOIN api_keys ak ON ae.api_key = ak.key
+                    JOIN users u ON ak.user_id = u.id
+                    WHERE u.subscription_tier = 'free'
+                """)
+
+            counts = (await session.execute(events_query, {"cutoff_date": cutoff_date})).fetchone()
+            total_events = int(counts.total_events)
+            old_events = int(counts.old_events)
 
             return {
                 "total_events": total_events,
@@ -0,0 +1,34 @@
+"""
+Command to refresh the cached backoffice statistics.
+This job runs every minute so admin pages read platform-wide counts
+from memory instead of aggregating on every request.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+from src.services.backoffice_stats import refresh_backoffice_stats as refresh_stats
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_backoffice_stats() -> Dict[str, Any]:
+    """
+    Recompute the backoffice statistics cache.
+
+    Returns:
+        Dictionary with refresh results
+    """
+    started_at = datetime.now(timezone.utc)
+
+    try:
+        await refresh_stats()
+    except Exception as e:
+        logger.error(f"Failed to refresh backoffice stats: {e}")
+        return {"success": False, "error": str(e)}
+
+    duration = (datetime.now(timezone.utc) - started_at).total_seconds()
+    logger.debug(f"Backoffice stats refreshed in {duration:.2f}s")
+
+    return {"success": True, "duration_seconds": duration}
@@ -0,0 +1,43 @@
+"""
+Command to refresh the precomputed daily package stats.
+This job runs every few minutes. It rebuilds the daily_package_stats and
+daily_dimension_stats rows for days that received events since yesterday,
+which back the dashboard time series and distributions, and refreshes the
+mv_package_overview_30d materialized view behind the package overview.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any
+
+from src.core.database import get_db_session
+from src.repositories.analytics_event_repository import AnalyticsEventRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_daily_package_stats() -> Dict[str, Any]:
+    """
+    Refresh the dashboard rollups and materialized views.
+
+    Returns:
+        Dictionary with refresh results
+    """
+    started_at = datetime.now(timezone.utc)
+    since = started_at.date() - timedelta(days=1)
+
+    try:
+        async with get_db_session() as session:
+            repo = AnalyticsEventRepository(session)
+            rows = await repo.refresh_daily_package_stats(since)
+            rows += await repo.refresh_daily_dimension_stats(since)
+            await repo.refresh_package_overview()
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Failed to refresh daily package stats: {e}")
+        return {"success": False, "error": str(e)}
+
+    duration = (datetime.now(timezone.utc) - started_at).total_seconds()
+    logger.info(f"Daily package stats refreshed ({rows} rollup rows) in {duration:.2f}s")
+
+    return {"success": True, "rows": rows, "duration_seconds": duration}
@@ -0,0 +1,38 @@
+"""
+Command to refresh the daily_stats rollup.
+This job runs every half hour and recomputes yesterday's and today's rows,
+so yesterday is finalized shortly after midnight UTC.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any
+
+from src.core.database import get_db_session
+from src.repositories.daily_stats_repository import DailyStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_daily_stats() -> Dict[str, Any]:
+    """
+    Upsert daily_stats rows for yesterday and today.
+
+    Returns:
+        Dictionary with refresh results
+    """
+    started_at = datetime.now(timezone.utc)
+    since = started_at.date() - timedelta(days=1)
+
+    try:
+        async with get_db_session() as session:
+            days = await DailyStatsRepository(session).refresh_since(since)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Failed to refresh daily stats: {e}")
+        return {"success": False, "error": str(e)}
+
+    duration = (datetime.now(timezone.utc) - started_at).total_seconds()
+    logger.info(f"Daily stats refreshed for {days} days in {duration:.2f}s")
+
+    return {"success": True, "days": days, "duration_seconds": duration}
@@ -1,10 +1,15 @@
+from dataclasses import dataclass
+
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from typing import Optional
 import logging
 
+from src.core.cache import TTLCache
+from src.core.config import settings
 from src.core.database import get_db
 from src.models.api_key import APIKey
 
@@ -14,12 +19,42 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True)
+class AuthenticatedAPIKey:
+    """The API key fields ingest needs, copied out of the request's session.
+
+    Cached across requests, so it must not be an ORM instance: those are
+    expired and detached when the request that loaded them rolls back.
+    """
+
+    key: str
+    package_name: str
+    user_id: int
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, api_key: APIKey) -> "AuthenticatedAPIKey":
+        return cls(
+            key=api_key.key,
+            package_name=api_key.package_name,
+            user_id=api_key.user_id,
+            is_active=api_key.is_active,
+        )
+
+
+# API keys by token value; invalidate entries whenever a key is deactivated,
+# deleted or regenerated.
+api_key_cache: TTLCache[AuthenticatedAPIKey] = TTLCache(
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+)
+
+
 async def get_api_key_from_token(
     credentials: Optional[HTTPAuthorizationCredentials] = Security(security),
     db: AsyncSession = Depends(get_db),
-) -> APIKey:
+) -> AuthenticatedAPIKey:
     """
-    Validate API key from Authorization header and return the APIKey object.
+    Validate API key from Authorization header and return its details.
 
     Expects header: Authorization: Bearer klyne_abc123...
     """
@@ -40,31 +75,43 @@ async def get_api_key_from_token(
             status_code=401, detail="Invalid API key format. Must start with 'klyne_'"
         )
 
-    # Look up API key in database
+    cached_api_key = api_key_cache.get(api_key_value)
+    if cached_api_key is not None:
+        return cached_api_key
+
+    # Look up API key in database, loading its owner in the same query so the
+    # subscription check that follows doesn't need another round-trip
     try:
-        result = await db.execute(select(APIKey).filter(APIKey.key == api_key_value))
+        result = await db.execute(
+            select(APIKey)
+            .options(joinedload(APIKey.user))
+            .filter(APIKey.key == api_key_value)
+        )
         api_key = result.scalar_one_or_none()
 
         if not api_key:
-            logger.warning(f"Invalid API key attempted: {api_key_value[:20]}...")
+            logger.warning("Invalid API key attempted: %s...", api_key_value[:20])
             raise HTTPException(status_code=401, detail="Invalid API key")
 
-        logger.info(f"API key validated for package: {api_key.package_name}")
-        return api_key
+        logger.info("API key validated for package: %s", api_key.package_name)
+        authenticated_key = AuthenticatedAPIKey.from_model(api_key)
+        api_key_cache.set(api_key_value, authenticated_key)
+        return authenticated_key
 
     except Exception as e:
-        logger.error(f"Error validating API key: {e}")
+        logger.error("Error validating API key: %s", e)
         raise HTTPException(status_code=500, detail="Error validating API key")
 
 
-async def validate_package_match(api_key: APIKey, package_name: str) -> None:
+async def validate_package_match(api_key: AuthenticatedAPIKey, package_name: str) -> None:
     """
     Validate that the API key matches the package name in the request.
     """
     if api_key.package_name != package_name:
         logger.warning(
-            f"Package name mismatch. API key for '{api_key.package_name}' "
-            f"used for package '{package_name}'"
+            "Package name mismatch. API key for '%s' used for package '%s'",
+            api_key.package_name,
+            package_name,
         )
         raise HTTPException(
             status_code=403,
@@ -75,8 +122,8 @@ async def validate_package_match(api_key: APIKey, package_name: str) -> None:
 
 # Convenience dependency that combines auth and package validation
 async def authenticate_analytics_request(
-    api_key: APIKey = Depends(get_api_key_from_token),
-) -> APIKey:
+    api_key: AuthenticatedAPIKey = Depends(get_api_key_from_token),
+) -> AuthenticatedAPIKey:
     """
     Authenticate analytics API requests.
     Package validation happens in the endpoint after parsing the request body.
@@ -0,0 +1,95 @@
+"""
+In-process TTL cache for hot, rarely changing lookups.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Size-bounded cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._storage: Dict[Hashable, Tuple[float, V]] = {}
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._storage.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._storage.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Cache a value, evicting the oldest entry when full."""
+        if key not in self._storage and len(self._storage) >= self.maxsize:
+            self.cleanup_expired()
+            if len(self._storage) >= self.maxsize:
+                self._storage.pop(next(iter(self._storage)))
+        self._storage[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._storage.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches the predicate."""
+        for key in [key for key in self._storage if predicate(key)]:
+            del self._storage[key]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._storage.clear()
+
+    def cleanup_expired(self) -> None:
+        """Remove expired entries."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._storage.items() if now >= expires_at]
+        for key in expired:
+            del self._storage[key]
+
+
+class SingleFlight(Generic[V]):
+    """Coalesce concurrent calls for the same key into a single execution."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[V]]) -> V:
+        """Run func for key, or wait for the call already in flight for it."""
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                # Shield so a cancelled waiter does not cancel the shared result
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only the caller that started the call was cancelled (e.g. its
+                # client disconnected); retry instead of failing every waiter
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an error nobody else awaited is not logged
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -1,15 +1,54 @@
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from src.core.config import settings
 
+
+def _connect_args(url: str) -> dict:
+    """Driver connect arguments for ``url``.
+
+    asyncpg gets a larger prepared statement cache than its default of 100, as
+    the dashboard alone issues dozens of distinct statements. A size of 0 is
+    for transaction-pooling PgBouncer: statements are still prepared, so they
+    also get unique names that cannot collide on a shared server connection.
+    """
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    connect_args = {
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DATABASE_STATEMENT_CACHE_SIZE == 0:
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return connect_args
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # Disable SQLAlchemy query logging
+    connect_args=_connect_args(settings.DATABASE_URL),
 )
 
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Read-only queries go to the replica when one is configured
+read_engine = (
+    create_async_engine(
+        settings.DATABASE_READ_URL,
+        echo=False,
+        connect_args=_connect_args(settings.DATABASE_READ_URL),
+    )
+    if settings.DATABASE_READ_URL
+    else engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -26,3 +65,14 @@ async def get_db():
 def get_db_session():
     """Get a database session for use in background tasks."""
     return AsyncSessionLocal()
+
+
+async def get_read_db():
+    """Session for read-only requests, served by the read replica if configured."""
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
+def get_read_db_session():
+    """Get a read-only database session for use in background tasks."""
+    return AsyncReadSessionLocal()
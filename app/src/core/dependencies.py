@@ -1,18 +1,57 @@
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.api_auth import AuthenticatedAPIKey
+from src.core.cache import TTLCache
+from src.core.config import settings
 from src.core.database import get_db
-from src.models.api_key import APIKey
 from src.models.user import User
 
 
+@dataclass(frozen=True)
+class SubscriptionUser:
+    """A user's plan, copied out of the request's session for caching."""
+
+    id: int
+    subscription_tier: Optional[str]
+    subscription_status: Optional[str]
+
+    # Same plan rules as the model
+    is_free_plan = User.is_free_plan
+    has_active_subscription = User.has_active_subscription
+    get_rate_limit_per_hour = User.get_rate_limit_per_hour
+
+    @classmethod
+    def from_model(cls, user: User) -> "SubscriptionUser":
+        return cls(
+            id=user.id,
+            subscription_tier=user.subscription_tier,
+            subscription_status=user.subscription_status,
+        )
+
+
+# Users by id for the analytics subscription check. Kept short so plan
+# changes and deactivations propagate quickly.
+subscription_user_cache: TTLCache[SubscriptionUser] = TTLCache(
+    ttl_seconds=settings.SUBSCRIPTION_CACHE_TTL_SECONDS
+)
+
+
 async def requires_active_subscription_for_api_key(
-    api_key: APIKey, db: AsyncSession = Depends(get_db)
-) -> User:
+    api_key: AuthenticatedAPIKey, db: AsyncSession = Depends(get_db)
+) -> SubscriptionUser:
     """Require API key to be valid and associated with an active subscription (including free plan)."""
-    user = await db.execute(select(User).filter(User.id == api_key.user_id))
-    user = user.scalar_one_or_none()
+    user = subscription_user_cache.get(api_key.user_id)
+    if user is None:
+        # Served from the identity map when the user was loaded with the API key
+        db_user = await db.get(User, api_key.user_id)
+        if db_user:
+            user = SubscriptionUser.from_model(db_user)
+            subscription_user_cache.set(api_key.user_id, user)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
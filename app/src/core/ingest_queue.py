@@ -0,0 +1,105 @@
+"""
+In-process write-behind queue for analytics events.
+
+When enabled, the analytics endpoints enqueue rows and return immediately;
+writer tasks drain the queue and insert rows from many requests together.
+Rows still queued when the process dies are lost, so this is opt-in via
+ANALYTICS_ASYNC_INGEST.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.database import get_db_session
+from src.repositories.analytics_event_repository import AnalyticsEventRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsIngestQueue:
+    """Queue that batches analytics event inserts across requests."""
+
+    def __init__(
+        self,
+        session_factory: Callable = get_db_session,
+        max_batch_size: int = 500,
+        max_wait_seconds: float = 0.05,
+    ):
+        self._session_factory = session_factory
+        self._max_batch_size = max_batch_size
+        self._max_wait_seconds = max_wait_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, workers: int = 1) -> None:
+        """Start writer tasks on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._writer()) for _ in range(workers)
+        ]
+        logger.info("Analytics ingest queue started with %s writers", workers)
+
+    async def stop(self) -> None:
+        """Flush queued rows and stop the writer tasks."""
+        if not self.running or self._queue is None:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Analytics ingest queue stopped")
+
+    async def put(self, rows: List[Dict[str, Any]]) -> None:
+        """Enqueue event rows for insertion."""
+        if self._queue is None:
+            raise RuntimeError("Analytics ingest queue is not running")
+        for row in rows:
+            self._queue.put_nowait(row)
+
+    async def _drain(self) -> List[Dict[str, Any]]:
+        """Wait for a row, then collect more until the batch is full or stale."""
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_wait_seconds
+
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _writer(self) -> None:
+        assert self._queue is not None
+        while True:
+            batch = await self._drain()
+            try:
+                async with self._session_factory() as session:
+                    await AnalyticsEventRepository(session).bulk_insert_events(batch)
+                    await session.commit()
+            except Exception as e:
+                logger.error("Failed to write %s queued analytics events: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# Global ingest queue instance
+ingest_queue = AnalyticsIngestQueue(
+    max_batch_size=settings.ANALYTICS_INGEST_MAX_BATCH_SIZE,
+    max_wait_seconds=settings.ANALYTICS_INGEST_MAX_WAIT_MS / 1000,
+)
@@ -18,9 +18,14 @@ class InMemoryRateLimiter:
         self._storage: Dict[str, Tuple[int, datetime]] = {}
         self._lock = asyncio.Lock()
 
-    async def is_allowed(self, key: str, limit: int, window_seconds: int) -> bool:
+    async def hit(
+        self, key: str, limit: int, window_seconds: int
+    ) -> Tuple[bool, int, datetime]:
         """
-        Check if request is allowed based on rate limit.
+        Count a request against the rate limit and return the resulting usage.
+
+        Counting and usage lookup happen under a single lock acquisition so the
+        request path only touches the limiter once.
 
         Args:
             key: Unique identifier for the rate limit (e.g., API key)
@@ -28,32 +33,37 @@ class InMemoryRateLimiter:
             window_seconds: Time window in seconds
 
         Returns:
-            True if request is allowed, False otherwise
+            Tuple of (allowed, request count in window, window start time)
         """
         async with self._lock:
             now = datetime.now(timezone.utc)
+            count, window_start = self._storage.get(key, (0, now))
 
-            # Get current count and window start
-            if key in self._storage:
-                count, window_start = self._storage[key]
-
-                # Check if we need to reset the window
-                if now - window_start >= timedelta(seconds=window_seconds):
-                    # Reset window
-                    self._storage[key] = (1, now)
-                    return True
-                else:
-                    # Within current window
-                    if count >= limit:
-                        return False
-                    else:
-                        # Increment count
-                        self._storage[key] = (count + 1, window_start)
-                        return True
-            else:
-                # First request for this key
-                self._storage[key] = (1, now)
-                return True
+            # Reset the window if it has expired
+            if now - window_start >= timedelta(seconds=window_seconds):
+                count, window_start = 0, now
+
+            if count >= limit:
+                return False, count, window_start
+
+            count += 1
+            self._storage[key] = (count, window_start)
+            return True, count, window_start
+
+    async def is_allowed(self, key: str, limit: int, window_seconds: int) -> bool:
+        """
+        Check if request is allowed based on rate limit.
+
+        Args:
+            key: Unique identifier for the rate limit (e.g., API key)
+            limit: Maximum number of requests allowed
+            window_seconds: Time window in seconds
+
+        Returns:
+            True if request is allowed, False otherwise
+        """
+        allowed, _, _ = await self.hit(key, limit, window_seconds)
+        return allowed
 
     async def get_current_usage(self, key: str) -> Tuple[int, datetime]:
         """Get current usage for a key."""
@@ -100,14 +110,12 @@ async def check_rate_limit(
     # Use API key as the rate limit key
     rate_limit_key = f"api_key:{api_key}"
 
-    is_allowed = await rate_limiter.is_allowed(
+    is_allowed, count, window_start = await rate_limiter.hit(
         key=rate_limit_key, limit=limit, window_seconds=window_seconds
     )
+    reset_time = window_start + timedelta(seconds=window_seconds)
 
     if not is_allowed:
-        count, window_start = await rate_limiter.get_current_usage(rate_limit_key)
-        reset_time = window_start + timedelta(seconds=window_seconds)
-
         logger.warning(
             f"Rate limit exceeded for API key {api_key[:20]}... "
             f"({count}/{limit} requests)"
@@ -132,10 +140,6 @@ async def check_rate_limit(
             },
         )
 
-    # Add rate limit headers to successful responses
-    count, window_start = await rate_limiter.get_current_usage(rate_limit_key)
-    reset_time = window_start + timedelta(seconds=window_seconds)
-
     # Store rate limit info in request state for response headers
     request.state.rate_limit_info = {
         "limit": limit,
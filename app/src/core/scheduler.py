@@ -4,6 +4,7 @@ Manages scheduled tasks including daily Polar package sync.
 """
 
 import logging
+from datetime import datetime, timezone
 from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -14,6 +15,9 @@ from src.core.config import settings
 from src.commands.sync_polar_packages import sync_all_users_packages
 from src.commands.cleanup_free_plan_data import cleanup_free_plan_analytics_data
 from src.commands.send_welcome_emails import send_welcome_emails
+from src.commands.refresh_daily_package_stats import refresh_daily_package_stats
+from src.commands.refresh_backoffice_stats import refresh_backoffice_stats
+from src.commands.refresh_daily_stats import refresh_daily_stats
 
 logger = logging.getLogger(__name__)
 
@@ -114,6 +118,52 @@ async def setup_scheduler() -> AsyncIOScheduler:
         replace_existing=True
     )
     
+    # Add dashboard aggregates refresh job
+    logger.info(
+        f"Scheduling daily package stats refresh every "
+        f"{settings.DAILY_STATS_REFRESH_MINUTES} minutes"
+    )
+    
+    scheduler.add_job(
+        refresh_daily_package_stats,
+        trigger='interval',
+        minutes=settings.DAILY_STATS_REFRESH_MINUTES,
+        id='refresh_daily_package_stats',
+        name='Refresh Daily Package Stats',
+        replace_existing=True
+    )
+    
+    # Add daily stats rollup job
+    logger.info(
+        f"Scheduling daily stats rollup every "
+        f"{settings.DAILY_STATS_ROLLUP_MINUTES} minutes"
+    )
+    
+    scheduler.add_job(
+        refresh_daily_stats,
+        trigger='interval',
+        minutes=settings.DAILY_STATS_ROLLUP_MINUTES,
+        id='refresh_daily_stats',
+        name='Refresh Daily Stats Rollup',
+        replace_existing=True
+    )
+    
+    # Add backoffice stats refresh job (also runs once at startup)
+    logger.info(
+        f"Scheduling backoffice stats refresh every "
+        f"{settings.BACKOFFICE_STATS_REFRESH_SECONDS} seconds"
+    )
+    
+    scheduler.add_job(
+        refresh_backoffice_stats,
+        trigger='interval',
+        seconds=settings.BACKOFFICE_STATS_REFRESH_SECONDS,
+        next_run_time=datetime.now(timezone.utc),
+        id='refresh_backoffice_stats',
+        name='Refresh Backoffice Stats',
+        replace_existing=True
+    )
+    
     # Start the scheduler
     scheduler.start()
     logger.info("Scheduler started successfully")
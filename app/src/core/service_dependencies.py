@@ -1,7 +1,7 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import get_db
+from src.core.database import get_db, get_read_db, get_read_db_session
 from src.repositories.unit_of_work import SqlAlchemyUnitOfWork
 from src.services.user_service import UserService
 from src.services.analytics_service import AnalyticsService
@@ -22,7 +22,8 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
 async def get_analytics_service(db: AsyncSession = Depends(get_db)) -> AnalyticsService:
     """Dependency to provide AnalyticsService."""
     uow = SqlAlchemyUnitOfWork(db)
-    return AnalyticsService(uow)
+    # Independent dashboard reads fan out over read sessions
+    return AnalyticsService(uow, session_factory=get_read_db_session)
 
 
 async def get_subscription_service(db: AsyncSession = Depends(get_db)) -> SubscriptionService:
@@ -37,6 +38,14 @@ async def get_api_key_service(db: AsyncSession = Depends(get_db)) -> APIKeyServi
     return APIKeyService(uow)
 
 
+async def get_read_api_key_service(
+    db: AsyncSession = Depends(get_read_db),
+) -> APIKeyService:
+    """Dependency to provide APIKeyService for read-only lookups on the read replica."""
+    uow = SqlAlchemyUnitOfWork(db)
+    return APIKeyService(uow)
+
+
 async def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
     """Dependency to provide AuthService."""
     uow = SqlAlchemyUnitOfWork(db)
@@ -2,13 +2,23 @@
 Shared template configuration for the application.
 """
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from src.core.assets import get_asset_url, get_css_url, get_vite_client_url
+from src.core.config import settings
 from src.utils.jinja_debug import setup_debug_environment
 
 
 def create_templates_instance() -> Jinja2Templates:
     """Create a configured Jinja2Templates instance with asset management functions."""
-    templates = Jinja2Templates(directory="src/templates", autoescape=True)
+    env = Environment(
+        loader=FileSystemLoader("src/templates"),
+        autoescape=True,
+        # Templates only change on deploy outside development, so skip the
+        # per-render mtime check and reuse compiled bytecode across workers
+        auto_reload=settings.ENVIRONMENT == "development",
+        bytecode_cache=FileSystemBytecodeCache(),
+    )
+    templates = Jinja2Templates(env=env)
     
     # Add asset management functions to template context
     templates.env.globals['get_asset_url'] = get_asset_url
@@ -145,6 +145,8 @@ async function loadPythonVersionData() {
     if (startDateInput?.value) params.append('start_date', startDateInput.value);
     if (endDateInput?.value) params.append('end_date', endDateInput.value);
     
+    // The charts only plot event counts
+    params.append('include_sessions', 'false');
     const response = await fetch(`/api/dashboard/python-versions?${params}`);
     if (!response.ok) throw new Error('Failed to load Python version data');
     
@@ -162,6 +164,8 @@ async function loadOSData() {
     if (startDateInput?.value) params.append('start_date', startDateInput.value);
     if (endDateInput?.value) params.append('end_date', endDateInput.value);
     
+    // The charts only plot event counts
+    params.append('include_sessions', 'false');
     const response = await fetch(`/api/dashboard/operating-systems?${params}`);
     if (!response.ok) throw new Error('Failed to load OS data');
     
@@ -10,6 +10,7 @@ from fastapi import Depends, FastAPI, Form, HTTPException, Request
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import (
     HTMLResponse,
+    ORJSONResponse,
     PlainTextResponse,
     RedirectResponse,
     Response,
@@ -23,6 +24,7 @@ from src.api.analytics import router as analytics_router
 from src.api.backoffice import router as backoffice_router
 from src.api.badge import router as badge_router
 from src.api.dashboard import router as dashboard_router
+from src.core.api_auth import api_key_cache
 from src.core.auth import (
     create_session,
     generate_verification_token,
@@ -46,6 +48,7 @@ from src.repositories.unit_of_work import SqlAlchemyUnitOfWork
 from src.schemas.checkout import SubscriptionInterval, SubscriptionTier
 from src.schemas.email import EmailCreate
 from src.schemas.user import UserCreate, UserLogin
+from src.services.analytics_service import invalidate_dashboard_cache
 from src.services.auth_service import AuthService
 from src.services.email import EmailService
 from src.services.polar import polar_service
@@ -119,10 +122,25 @@ async def lifespan(app: FastAPI):
         logger.error(f"Scheduler initialization failed: {str(e)}")
         # Don't raise - scheduler is not critical for basic app functionality
 
+    # Start analytics write-behind queue
+    if settings.ANALYTICS_ASYNC_INGEST:
+        from src.core.ingest_queue import ingest_queue
+
+        ingest_queue.start(workers=settings.ANALYTICS_INGEST_WORKERS)
+
     yield
 
     logger.info("Shutting down Klyne application...")
 
+    # Flush queued analytics events before the database goes away
+    if settings.ANALYTICS_ASYNC_INGEST:
+        try:
+            from src.core.ingest_queue import ingest_queue
+
+            await ingest_queue.stop()
+        except Exception as e:
+            logger.error(f"Analytics ingest queue shutdown failed: {str(e)}")
+
     # Shutdown scheduler
     try:
         from src.core.scheduler import shutdown_scheduler
@@ -133,7 +151,11 @@ async def lifespan(app: FastAPI):
 
 
 app = FastAPI(
-    title="Klyne Analytics API", lifespan=lifespan, docs_url=None, redoc_url=None
+    title="Klyne Analytics API",
+    lifespan=lifespan,
+    docs_url=None,
+    redoc_url=None,
+    default_response_class=ORJSONResponse,
 )
 
 # configure logfire only if token exists, not using fake token, and not in test environment
@@ -333,7 +355,6 @@ async def register_user(
 
                 db.add(db_user)
                 await db.commit()
-                await db.refresh(db_user)
 
                 # Create customer in Polar with user ID as external customer ID
                 polar_customer_id = await polar_service.create_customer(
@@ -571,15 +592,8 @@ async def analytics_dashboard(request: Request, db: AsyncSession = Depends(get_d
         logout_user(request)
         return RedirectResponse(url="/login", status_code=302)
 
-    # Get user's API keys with badge relationship eagerly loaded
-    api_keys_result = await db.execute(
-        select(APIKey)
-        .filter(APIKey.user_id == user_id)
-        .options(selectinload(APIKey.badge))
-    )
-    api_keys = api_keys_result.scalars().all()
-
-    # Get package usage information
+    # Get package usage information; the dashboard fetches per-package data
+    # from the API, so API keys are not loaded here
     from src.core.subscription_utils import get_user_package_usage
 
     current_count, limit = await get_user_package_usage(db, user_id)
@@ -595,7 +609,6 @@ async def analytics_dashboard(request: Request, db: AsyncSession = Depends(get_d
         {
             "request": request,
             "user": user,
-            "api_keys": api_keys,
             "package_usage": package_usage,
         },
     )
@@ -903,7 +916,7 @@ async def create_api_key(
 
     db.add(api_key)
     await db.commit()
-    await db.refresh(api_key)
+    invalidate_dashboard_cache(user_id)
 
     # Count total API keys for this user after creation
     api_keys_count_result = await db.execute(
@@ -943,9 +956,11 @@ async def regenerate_api_key(
 
     # Generate new key using the same logic as the original creation
     new_key = APIKey.generate_key()
+    old_key = api_key.key
     api_key.key = new_key
     await db.commit()
-    await db.refresh(api_key)
+    api_key_cache.invalidate(old_key)
+    invalidate_dashboard_cache(user_id)
 
     return {"success": True, "new_key": new_key}
 
@@ -970,6 +985,8 @@ async def delete_api_key(
 
     await db.delete(api_key)
     await db.commit()
+    api_key_cache.invalidate(api_key.key)
+    invalidate_dashboard_cache(user_id)
 
     # Count total API keys for this user after deletion
     api_keys_count_result = await db.execute(
@@ -1007,6 +1024,8 @@ async def delete_api_key_form(
     if api_key:
         await db.delete(api_key)
         await db.commit()
+        api_key_cache.invalidate(api_key.key)
+        invalidate_dashboard_cache(user_id)
 
         # Count total API keys for this user after deletion
         api_keys_count_result = await db.execute(
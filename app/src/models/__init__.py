@@ -6,3 +6,6 @@ from .user import User as User  # noqa: E402
 from .api_key import APIKey as APIKey  # noqa: E402
 from .analytics_event import AnalyticsEvent as AnalyticsEvent  # noqa: E402
 from .email import Email as Email  # noqa: E402
+from .daily_stats import DailyStats as DailyStats  # noqa: E402
+from .daily_dimension_stats import DailyDimensionStats as DailyDimensionStats  # noqa: E402
+from .daily_package_stats import DailyPackageStats as DailyPackageStats  # noqa: E402
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Index, JSON, cast
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 from src.models import Base
 import uuid
+from datetime import datetime, timezone
 
 
 class AnalyticsEvent(Base):
@@ -62,15 +63,31 @@ class AnalyticsEvent(Base):
 
     # Timestamps
     event_timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Set client-side so inserts never need to read it back; the server
+    # default still covers direct SQL writers.
     received_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
     )
 
     # Indexes for common queries
     __table_args__ = (
         # Performance indexes for dashboard queries
         Index("idx_analytics_package_date", "package_name", "event_timestamp"),
-        Index("idx_analytics_api_key_date", "api_key", "event_timestamp"),
+        # Covers the dashboard distribution and overview aggregates
+        Index(
+            "idx_analytics_api_key_date",
+            "api_key",
+            "event_timestamp",
+            postgresql_include=[
+                "session_id",
+                "python_version",
+                "os_type",
+                "package_version",
+            ],
+        ),
         Index("idx_analytics_python_version", "package_name", "python_version"),
         Index("idx_analytics_os_type", "package_name", "os_type"),
         # Composite indexes for aggregation queries
@@ -81,14 +98,42 @@ class AnalyticsEvent(Base):
             "python_version",
             "os_type",
         ),
-        # Unique user tracking indexes (already created in migration)
+        # Unique user tracking indexes (already created in migration).
+        # Partial on the sparse identifier columns to keep ingest writes cheap.
         Index("idx_analytics_user_identifier", "user_identifier"),
         Index(
             "idx_analytics_user_identifier_date",
             "api_key",
             "user_identifier",
             "event_timestamp",
+            postgresql_where=user_identifier.isnot(None),
+        ),
+        Index(
+            "idx_analytics_installation_id",
+            "installation_id",
+            postgresql_where=installation_id.isnot(None),
+        ),
+        Index(
+            "idx_analytics_fingerprint",
+            "fingerprint_hash",
+            postgresql_where=fingerprint_hash.isnot(None),
+        ),
+        # Per-day groupings bucket events by UTC day; timezone() is not
+        # available on SQLite, so the index only exists on PostgreSQL
+        Index(
+            "idx_analytics_api_key_utc_day",
+            "api_key",
+            cast(func.timezone("UTC", event_timestamp), Date),
+            postgresql_include=["session_id", "user_identifier"],
+        ).ddl_if(dialect="postgresql"),
+        # Keyset pagination for the backoffice events list
+        Index("idx_analytics_received_at_id", "received_at", "id"),
+        # Compact BRIN index for time-range scans over append-only rows
+        Index(
+            "idx_analytics_time_brin",
+            "event_timestamp",
+            "received_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 64},
         ),
-        Index("idx_analytics_installation_id", "installation_id"),
-        Index("idx_analytics_fingerprint", "fingerprint_hash"),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.models import Base
@@ -20,6 +20,17 @@ class APIKey(Base):
     user = relationship("User", back_populates="api_keys")
     badge = relationship("Badge", back_populates="api_key", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination for the backoffice API keys list; covers the
+        # columns its statistics read
+        Index(
+            "idx_api_keys_created_at_id",
+            "created_at",
+            "id",
+            postgresql_include=["package_name", "user_id"],
+        ),
+    )
+
     @classmethod
     def generate_key(cls) -> str:
         return f"klyne_{secrets.token_urlsafe(32)}"
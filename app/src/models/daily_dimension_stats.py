@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Date
+from src.models import Base
+
+
+class DailyDimensionStats(Base):
+    """
+    Per-day event and session counts for each Python minor version, OS and
+    package version an API key reported (UTC days, by event timestamp).
+    Days that recently received events are rebuilt by a scheduled job.
+    """
+
+    __tablename__ = "daily_dimension_stats"
+
+    api_key = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    python_version = Column(String, primary_key=True)
+    os_type = Column(String, primary_key=True)
+    package_version = Column(String, primary_key=True)
+    total_events = Column(Integer, nullable=False)
+    unique_sessions = Column(Integer, nullable=False)
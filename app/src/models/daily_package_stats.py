@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Date
+from src.models import Base
+
+
+class DailyPackageStats(Base):
+    """
+    Per-day event, session and user counts for each API key and package
+    (UTC days, by event timestamp).
+    Days that recently received events are rebuilt by a scheduled job.
+    """
+
+    __tablename__ = "daily_package_stats"
+
+    api_key = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    package_name = Column(String, primary_key=True)
+    total_events = Column(Integer, nullable=False)
+    unique_sessions = Column(Integer, nullable=False)
+    unique_users = Column(Integer, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Date, DateTime
+from sqlalchemy.sql import func
+from src.models import Base
+
+
+class DailyStats(Base):
+    """
+    Per-day rollup of new users, API keys and analytics events (UTC days).
+    Closed days are final; recent days are refreshed by a scheduled job.
+    """
+
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    new_users = Column(Integer, nullable=False, default=0)
+    new_api_keys = Column(Integer, nullable=False, default=0)
+    new_events = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, and_
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.models import Base
@@ -27,6 +27,17 @@ class User(Base):
     api_keys = relationship("APIKey", back_populates="user")
     emails = relationship("Email", back_populates="user")
 
+    __table_args__ = (
+        # Keyset pagination for the backoffice users list
+        Index("idx_users_created_at_id", "created_at", "id"),
+        # Active, verified user counts for backoffice statistics
+        Index(
+            "idx_users_active_verified",
+            "created_at",
+            postgresql_where=and_(is_active, is_verified),
+        ),
+    )
+
     @property
     def is_free_plan(self) -> bool:
         """Check if user is on the free plan."""
@@ -1,9 +1,16 @@
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, func, desc, and_, case
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any
+from sqlalchemy import (
+    BigInteger, Date, Numeric, String, any_, bindparam, cast, delete, insert,
+    literal, select, func, desc, and_, case, text, table, column, tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.analytics_event import AnalyticsEvent
+from src.models.daily_dimension_stats import DailyDimensionStats
+from src.models.daily_package_stats import DailyPackageStats
 from src.repositories.base import BaseRepository
 
 # Whitelist of allowed dimension fields for security
@@ -17,9 +24,41 @@ ALLOWED_DIMENSION_FIELDS = {
     'installation_method'
 }
 
+# Per-API-key overview of the default 30-day dashboard window, maintained as a
+# PostgreSQL materialized view (see migration d2f7a4c8e613). Not part of the
+# ORM metadata.
+package_overview_30d = table(
+    'mv_package_overview_30d',
+    column('api_key'),
+    column('window_start'),
+    column('total_events'),
+    column('total_sessions'),
+    column('active_days'),
+    column('unique_users'),
+    column('python_versions_count'),
+    column('operating_systems_count'),
+)
+
+OVERVIEW_STAT_COLUMNS = (
+    "total_events",
+    "total_sessions",
+    "active_days",
+    "unique_users",
+    "python_versions_count",
+    "operating_systems_count",
+)
+
+
+def _last_day_before(end_date: datetime) -> date:
+    """Last calendar day with any instant before the exclusive end_date."""
+    return (end_date - timedelta(microseconds=1)).date()
+
 
 class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
-    """Repository for AnalyticsEvent model operations."""
+    """Repository for AnalyticsEvent model operations.
+
+    Time ranges are half-open: start_date <= event_timestamp < end_date.
+    """
 
     def __init__(self, db: AsyncSession):
         super().__init__(db, AnalyticsEvent)
@@ -61,6 +100,212 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
                 )
             )
 
+    def _event_day(self, timestamp_column):
+        """
+        UTC calendar day of a timestamp column.
+
+        On PostgreSQL this is the expression indexed by
+        idx_analytics_api_key_utc_day, and unlike date() it does not depend on
+        the session time zone.
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name == 'postgresql':
+            return cast(func.timezone('UTC', timestamp_column), Date)
+        return func.date(timestamp_column, type_=Date)
+
+    def _days_before(self, day_column, days: int):
+        """The calendar day ``days`` days before a day column."""
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name == 'postgresql':
+            return day_column - days
+        return func.date(day_column, f"-{days} days", type_=Date)
+
+    def _reads_dimension_rollup(self) -> bool:
+        """Whether distributions are summed from daily_dimension_stats.
+
+        The scheduler keeps the rollup current on PostgreSQL; elsewhere (local
+        SQLite) raw events are aggregated directly.
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        return dialect_name == 'postgresql'
+
+    @staticmethod
+    def _percentage_of_total(count_expr):
+        """Share of a grouped count in the total over all groups, as a percentage
+        rounded to two decimals."""
+        # PostgreSQL only rounds to a number of places on numeric values
+        return func.round(
+            cast(
+                func.coalesce(
+                    count_expr * 100.0 / func.nullif(func.sum(count_expr).over(), 0), 0
+                ),
+                Numeric,
+            ),
+            2,
+        )
+
+    @staticmethod
+    def _distribution_query(dimension, api_key_filter, start_date: datetime, end_date: datetime,
+                            include_sessions: bool = True, top_k: Optional[int] = None):
+        """Events and sessions per value of ``dimension``, with their share of the total.
+
+        Events are first grouped by (dimension, session_id) and the groups then
+        counted per dimension. PostgreSQL can hash and parallelise that, while
+        COUNT(DISTINCT session_id) sorts every group in a single worker.
+        Without ``include_sessions`` events are counted per dimension directly.
+        """
+        in_range = and_(
+            api_key_filter,
+            AnalyticsEvent.event_timestamp >= start_date,
+            AnalyticsEvent.event_timestamp < end_date,
+        )
+
+        if include_sessions:
+            per_session = (
+                select(
+                    dimension,
+                    AnalyticsEvent.session_id,
+                    func.count(AnalyticsEvent.id).label("events"),
+                )
+                .filter(in_range)
+                .group_by(dimension, AnalyticsEvent.session_id)
+                .subquery()
+            )
+            dimension_column = per_session.c[0]
+            counts = (
+                select(
+                    dimension_column,
+                    cast(func.sum(per_session.c.events), BigInteger).label("total_events"),
+                    func.count(per_session.c.session_id).label("total_sessions"),
+                )
+                .group_by(dimension_column)
+            )
+        else:
+            counts = (
+                select(dimension, func.count(AnalyticsEvent.id).label("total_events"))
+                .filter(in_range)
+                .group_by(dimension)
+            )
+
+        return AnalyticsEventRepository._distribution_shares(counts.subquery(), top_k)
+
+    @staticmethod
+    def _precomputed_distribution_query(dimension, api_key_filter,
+                                        start_date: datetime, end_date: datetime,
+                                        include_sessions: bool = True,
+                                        top_k: Optional[int] = None):
+        """Like _distribution_query, but summing daily_dimension_stats rows.
+
+        Sessions are counted per day there, so a session spanning midnight
+        counts once for each day it has events on.
+        """
+        columns = [
+            dimension,
+            cast(func.sum(DailyDimensionStats.total_events), BigInteger).label("total_events"),
+        ]
+        if include_sessions:
+            columns.append(
+                cast(func.sum(DailyDimensionStats.unique_sessions), BigInteger).label("total_sessions")
+            )
+
+        counts = (
+            select(*columns)
+            .filter(
+                and_(
+                    api_key_filter,
+                    DailyDimensionStats.day >= start_date.date(),
+                    DailyDimensionStats.day <= _last_day_before(end_date),
+                )
+            )
+            .group_by(dimension)
+        )
+        return AnalyticsEventRepository._distribution_shares(counts.subquery(), top_k)
+
+    @staticmethod
+    def _distribution_shares(counts, top_k: Optional[int] = None):
+        """Add shares of the total to per-value counts, most used value first.
+
+        ``counts`` has the value as its first column, then total_events and
+        optionally total_sessions. Values beyond the ``top_k`` most used are
+        summed into a single "Other" row, which bounds the response however
+        long the tail of rare values is.
+        """
+        value = counts.c[0]
+        has_sessions = "total_sessions" in counts.c
+
+        if top_k is None:
+            columns = [value, counts.c.total_events]
+            if has_sessions:
+                columns.append(counts.c.total_sessions)
+            columns.append(
+                AnalyticsEventRepository._percentage_of_total(counts.c.total_events).label("event_percentage")
+            )
+            if has_sessions:
+                columns.append(
+                    AnalyticsEventRepository._percentage_of_total(counts.c.total_sessions).label("session_percentage")
+                )
+            return select(*columns).order_by(desc(counts.c.total_events))
+
+        rank = func.row_number().over(order_by=(desc(counts.c.total_events), value))
+        ranked = select(counts, rank.label("rank")).subquery()
+        # The tail is grouped by a flag rather than by the "Other" label, so a
+        # real value spelled "Other" is not merged into it
+        folded = select(
+            ranked,
+            (ranked.c.rank > top_k).label("is_other"),
+            case((ranked.c.rank <= top_k, ranked.c[0])).label("folded_value"),
+        ).subquery()
+        total_events = cast(func.sum(folded.c.total_events), BigInteger)
+        label = case((folded.c.is_other, literal("Other")), else_=folded.c.folded_value)
+
+        columns = [label.label(value.name), total_events.label("total_events")]
+        if has_sessions:
+            total_sessions = cast(func.sum(folded.c.total_sessions), BigInteger)
+            columns.append(total_sessions.label("total_sessions"))
+        columns.append(
+            AnalyticsEventRepository._percentage_of_total(total_events).label("event_percentage")
+        )
+        if has_sessions:
+            columns.append(
+                AnalyticsEventRepository._percentage_of_total(total_sessions).label("session_percentage")
+            )
+        # "Other" takes the rank of its most used value, so it sorts last
+        return (
+            select(*columns)
+            .group_by(folded.c.is_other, folded.c.folded_value)
+            .order_by(func.min(folded.c.rank))
+        )
+
+    @staticmethod
+    def _distribution_rows(result, dimension_key: str, dimension_label: str) -> List[Dict[str, Any]]:
+        """Distribution rows as dicts; session fields are None when not selected."""
+        rows = []
+        for row in result.mappings():
+            session_percentage = row.get("session_percentage")
+            rows.append({
+                dimension_key: row[dimension_label],
+                "total_events": row["total_events"],
+                "total_sessions": row.get("total_sessions"),
+                "event_percentage": float(row["event_percentage"]),
+                "session_percentage": (
+                    float(session_percentage) if session_percentage is not None else None
+                ),
+            })
+        return rows
+
+    def _api_key_filter(self, api_key_column, api_keys: List[str]):
+        """Restrict ``api_key_column`` to ``api_keys``.
+
+        On PostgreSQL the keys are bound as one array parameter, so a single
+        prepared plan serves every key count instead of one per ``IN`` size.
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name == 'postgresql':
+            return api_key_column == any_(
+                bindparam('api_keys', list(api_keys), type_=ARRAY(String), unique=True)
+            )
+        return api_key_column.in_(api_keys)
+
     async def get_by_api_key(self, api_key: str, limit: Optional[int] = None) -> List[AnalyticsEvent]:
         """Get events by API key."""
         query = select(AnalyticsEvent).filter(AnalyticsEvent.api_key == api_key)
@@ -76,12 +321,12 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         stats_query = select(
             func.count(AnalyticsEvent.id).label("total_events"),
             func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
-            func.count(func.distinct(func.date(AnalyticsEvent.event_timestamp))).label("active_days"),
+            func.count(func.distinct(self._event_day(AnalyticsEvent.event_timestamp))).label("active_days"),
         ).filter(
             and_(
                 AnalyticsEvent.api_key == api_key,
                 AnalyticsEvent.event_timestamp >= start_date,
-                AnalyticsEvent.event_timestamp <= end_date,
+                AnalyticsEvent.event_timestamp < end_date,
             )
         )
 
@@ -96,141 +341,277 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
 
     async def get_python_version_distribution(self, api_keys: List[str],
                                             start_date: datetime,
-                                            end_date: datetime) -> List[Dict[str, Any]]:
+                                            end_date: datetime,
+                                            include_sessions: bool = True,
+                                            top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get Python version distribution for given API keys."""
-        # Extract minor version (e.g., "3.14" from "3.14.1")
-        minor_version = self._extract_minor_version(AnalyticsEvent.python_version).label("minor_version")
+        if self._reads_dimension_rollup():
+            # The rollup already stores minor versions
+            python_stats_query = self._precomputed_distribution_query(
+                DailyDimensionStats.python_version.label("minor_version"),
+                self._api_key_filter(DailyDimensionStats.api_key, api_keys),
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
+            )
+        else:
+            # Extract minor version (e.g., "3.14" from "3.14.1")
+            minor_version = self._extract_minor_version(AnalyticsEvent.python_version).label("minor_version")
 
-        python_stats_query = (
-            select(
+            python_stats_query = self._distribution_query(
                 minor_version,
-                func.count(AnalyticsEvent.id).label("total_events"),
-                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
-            )
-            .filter(
-                and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
-                    AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date,
-                )
+                self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
             )
-            .group_by(minor_version)
-            .order_by(desc("total_events"))
-        )
 
         result = await self.db.execute(python_stats_query)
-        return [
-            {
-                "python_version": row.minor_version,
-                "total_events": row.total_events,
-                "total_sessions": row.total_sessions
-            }
-            for row in result.all()
-        ]
+        return self._distribution_rows(result, "python_version", "minor_version")
 
     async def get_os_distribution(self, api_keys: List[str], 
                                  start_date: datetime, 
-                                 end_date: datetime) -> List[Dict[str, Any]]:
+                                 end_date: datetime,
+                                 include_sessions: bool = True,
+                                 top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get OS distribution for given API keys."""
-        os_stats_query = (
-            select(
-                AnalyticsEvent.os_type,
-                func.count(AnalyticsEvent.id).label("total_events"),
-                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
+        if self._reads_dimension_rollup():
+            os_stats_query = self._precomputed_distribution_query(
+                DailyDimensionStats.os_type,
+                self._api_key_filter(DailyDimensionStats.api_key, api_keys),
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
             )
-            .filter(
-                and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
-                    AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date,
-                )
+        else:
+            os_stats_query = self._distribution_query(
+                AnalyticsEvent.os_type,
+                self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
             )
-            .group_by(AnalyticsEvent.os_type)
-            .order_by(desc("total_events"))
-        )
 
         result = await self.db.execute(os_stats_query)
-        return [
-            {
-                "os_type": row.os_type,
-                "total_events": row.total_events,
-                "total_sessions": row.total_sessions
-            }
-            for row in result.all()
-        ]
+        return self._distribution_rows(result, "os_type", "os_type")
 
     async def get_package_version_distribution(self, api_key: str, 
                                              start_date: datetime, 
-                                             end_date: datetime) -> List[Dict[str, Any]]:
+                                             end_date: datetime,
+                                             include_sessions: bool = True,
+                                             top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get package version distribution for a specific API key."""
-        version_stats_query = (
-            select(
+        if self._reads_dimension_rollup():
+            version_stats_query = self._precomputed_distribution_query(
+                DailyDimensionStats.package_version,
+                DailyDimensionStats.api_key == api_key,
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
+            )
+        else:
+            version_stats_query = self._distribution_query(
                 AnalyticsEvent.package_version,
-                func.count(AnalyticsEvent.id).label("total_events"),
-                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
+                AnalyticsEvent.api_key == api_key,
+                start_date,
+                end_date,
+                include_sessions,
+                top_k,
             )
-            .filter(
-                and_(
-                    AnalyticsEvent.api_key == api_key,
-                    AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date,
+
+        result = await self.db.execute(version_stats_query)
+        return self._distribution_rows(result, "package_version", "package_version")
+
+    async def stream_daily_timeseries(self, api_keys: List[str],
+                                      start_date: datetime,
+                                      end_date: datetime) -> AsyncIterator[Dict[str, Any]]:
+        """Stream daily time series rows for given API keys.
+
+        Rows are fetched in batches from a server-side cursor rather than
+        materialized as a list, since date x package ranges can be large.
+        Dates are returned as ISO "YYYY-MM-DD" strings formatted by the database.
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+
+        if dialect_name == 'postgresql':
+            # PostgreSQL: read the precomputed per-day rollup
+            daily_stats_query = (
+                select(
+                    func.to_char(DailyPackageStats.day, 'YYYY-MM-DD').label("date"),
+                    DailyPackageStats.package_name,
+                    func.sum(DailyPackageStats.total_events).label("total_events"),
+                    func.sum(DailyPackageStats.unique_sessions).label("total_sessions"),
+                )
+                .filter(
+                    and_(
+                        self._api_key_filter(DailyPackageStats.api_key, api_keys),
+                        DailyPackageStats.day >= start_date.date(),
+                        DailyPackageStats.day <= _last_day_before(end_date),
+                    )
                 )
+                .group_by(
+                    DailyPackageStats.day,
+                    DailyPackageStats.package_name
+                )
+                .order_by(DailyPackageStats.day)
+            )
+        else:
+            # SQLite: aggregate raw events (date() already yields ISO strings)
+            daily_stats_query = (
+                select(
+                    func.date(AnalyticsEvent.event_timestamp).label("date"),
+                    AnalyticsEvent.package_name,
+                    func.count(AnalyticsEvent.id).label("total_events"),
+                    func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
+                )
+                .filter(
+                    and_(
+                        self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                        AnalyticsEvent.event_timestamp >= start_date,
+                        AnalyticsEvent.event_timestamp < end_date,
+                    )
+                )
+                .group_by(
+                    func.date(AnalyticsEvent.event_timestamp), 
+                    AnalyticsEvent.package_name
+                )
+                .order_by(func.date(AnalyticsEvent.event_timestamp))
             )
-            .group_by(AnalyticsEvent.package_version)
-            .order_by(desc("total_events"))
-        )
 
-        result = await self.db.execute(version_stats_query)
-        return [
-            {
-                "package_version": row.package_version,
-                "total_events": row.total_events,
-                "total_sessions": row.total_sessions
+        result = await self.db.stream(
+            daily_stats_query.execution_options(yield_per=1000)
+        )
+        async for row in result:
+            yield {
+                "date": row.date,
+                "package_name": row.package_name,
+                "total_events": int(row.total_events),
+                "total_sessions": int(row.total_sessions)
             }
-            for row in result.all()
-        ]
 
-    async def get_daily_timeseries(self, api_keys: List[str], 
-                                  start_date: datetime, 
-                                  end_date: datetime) -> List[Dict[str, Any]]:
-        """Get daily time series data for given API keys."""
-        daily_stats_query = (
+    async def refresh_package_overview(self) -> bool:
+        """
+        Refresh the mv_package_overview_30d materialized view.
+
+        Returns:
+            True if the view was refreshed, False on databases without it
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name != 'postgresql':
+            return False
+
+        await self.db.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_package_overview_30d")
+        )
+        return True
+
+    async def _rebuild_touched_days(self, rollup, since: date, dimensions,
+                                    distinct_counts: Dict[str, Any]) -> int:
+        """
+        Replace ``rollup``'s rows for every (API key, UTC day) that received
+        events since the start of ``since``.
+
+        Days are picked by when events were received, so a late event with an
+        older timestamp still updates the day it belongs to. Each picked day is
+        recounted from all of its events, so the cost follows recent traffic
+        rather than total history.
+
+        Args:
+            rollup: Model keyed by api_key, day and the ``dimensions`` labels,
+                with a total_events column
+            dimensions: Labelled event expressions to group each day by
+            distinct_counts: Rollup column -> event column it counts distinct
+                values of
+
+        Returns:
+            Number of rows written
+        """
+        event_day = self._event_day(AnalyticsEvent.event_timestamp)
+        touched_days = (
+            select(AnalyticsEvent.api_key, event_day.label("day"))
+            .where(
+                AnalyticsEvent.received_at
+                >= datetime.combine(since, time.min, tzinfo=timezone.utc)
+            )
+            .distinct()
+            .subquery()
+        )
+
+        await self.db.execute(
+            delete(rollup).where(
+                tuple_(rollup.api_key, rollup.day).in_(
+                    select(touched_days.c.api_key, touched_days.c.day)
+                )
+            )
+        )
+
+        # Group in an outer query so expressions such as the minor version are
+        # not repeated, with their own parameters, in GROUP BY
+        events = (
             select(
-                func.date(AnalyticsEvent.event_timestamp).label("date"),
-                AnalyticsEvent.package_name,
-                func.count(AnalyticsEvent.id).label("total_events"),
-                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
+                AnalyticsEvent.api_key,
+                event_day.label("day"),
+                *dimensions,
+                *(column.label(name) for name, column in distinct_counts.items()),
             )
-            .filter(
+            .join(
+                touched_days,
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
-                    AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date,
-                )
+                    AnalyticsEvent.api_key == touched_days.c.api_key,
+                    event_day == touched_days.c.day,
+                ),
             )
-            .group_by(
-                func.date(AnalyticsEvent.event_timestamp), 
-                AnalyticsEvent.package_name
+            .subquery()
+        )
+        group_columns = [events.c.api_key, events.c.day, *(events.c[d.name] for d in dimensions)]
+        result = await self.db.execute(
+            insert(rollup).from_select(
+                [column.name for column in group_columns]
+                + ["total_events", *distinct_counts],
+                select(
+                    *group_columns,
+                    func.count(),
+                    *(func.count(func.distinct(events.c[name])) for name in distinct_counts),
+                ).group_by(*group_columns),
             )
-            .order_by(func.date(AnalyticsEvent.event_timestamp))
         )
+        return result.rowcount
 
-        result = await self.db.execute(daily_stats_query)
-        return [
+    async def refresh_daily_package_stats(self, since: date) -> int:
+        """Rebuild daily_package_stats for days that received events since ``since``."""
+        return await self._rebuild_touched_days(
+            DailyPackageStats,
+            since,
+            [AnalyticsEvent.package_name],
             {
-                "date": row.date,
-                "package_name": row.package_name,
-                "total_events": row.total_events,
-                "total_sessions": row.total_sessions
-            }
-            for row in result.all()
-        ]
+                "unique_sessions": AnalyticsEvent.session_id,
+                "unique_users": AnalyticsEvent.user_identifier,
+            },
+        )
+
+    async def refresh_daily_dimension_stats(self, since: date) -> int:
+        """Rebuild daily_dimension_stats for days that received events since ``since``."""
+        return await self._rebuild_touched_days(
+            DailyDimensionStats,
+            since,
+            [
+                self._extract_minor_version(AnalyticsEvent.python_version).label("python_version"),
+                AnalyticsEvent.os_type,
+                AnalyticsEvent.package_version,
+            ],
+            {"unique_sessions": AnalyticsEvent.session_id},
+        )
 
     async def get_total_events_count(self, api_keys: List[str]) -> int:
         """Get total events count for given API keys."""
         result = await self.db.execute(
             select(func.count(AnalyticsEvent.id)).filter(
-                AnalyticsEvent.api_key.in_(api_keys)
+                self._api_key_filter(AnalyticsEvent.api_key, api_keys)
             )
         )
         return result.scalar()
@@ -242,9 +623,9 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         result = await self.db.execute(
             select(func.count(AnalyticsEvent.id)).filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date,
+                    AnalyticsEvent.event_timestamp < end_date,
                 )
             )
         )
@@ -278,6 +659,77 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         )
         return result.scalar() or 0
 
+    async def get_overview_stats_by_api_key(self, api_keys: List[str],
+                                            start_date: datetime,
+                                            end_date: datetime) -> Dict[str, Dict[str, int]]:
+        """Get per-API-key overview stats for all given keys in a single grouped query.
+
+        Version and OS counts keep no upper bound, matching the per-key helpers.
+        """
+        ts = AnalyticsEvent.event_timestamp
+        in_range = ts < end_date
+
+        def bounded(value):
+            # NULL outside the range so COUNT ignores the row
+            return case((in_range, value))
+
+        minor_version = self._extract_minor_version(AnalyticsEvent.python_version)
+
+        query = (
+            select(
+                AnalyticsEvent.api_key,
+                func.count(bounded(AnalyticsEvent.id)).label("total_events"),
+                func.count(func.distinct(bounded(AnalyticsEvent.session_id))).label("total_sessions"),
+                func.count(func.distinct(bounded(self._event_day(ts)))).label("active_days"),
+                func.count(func.distinct(bounded(AnalyticsEvent.user_identifier))).label("unique_users"),
+                func.count(func.distinct(minor_version)).label("python_versions_count"),
+                func.count(func.distinct(AnalyticsEvent.os_type)).label("operating_systems_count"),
+            )
+            .filter(
+                and_(
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                    ts >= start_date,
+                )
+            )
+            .group_by(AnalyticsEvent.api_key)
+        )
+
+        result = await self.db.execute(query)
+        return {
+            row.api_key: {name: int(getattr(row, name) or 0) for name in OVERVIEW_STAT_COLUMNS}
+            for row in result
+        }
+
+    async def get_precomputed_overview_stats(
+        self, api_keys: List[str], window_start: date
+    ) -> Optional[Dict[str, Dict[str, int]]]:
+        """Read per-API-key overview stats from mv_package_overview_30d.
+
+        Returns None when the view is unavailable (non-PostgreSQL) or was not
+        built for window_start, so callers can fall back to the live query.
+        """
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name != 'postgresql':
+            return None
+
+        query = select(
+            package_overview_30d.c.api_key,
+            *(package_overview_30d.c[name] for name in OVERVIEW_STAT_COLUMNS),
+        ).filter(
+            and_(
+                self._api_key_filter(package_overview_30d.c.api_key, api_keys),
+                package_overview_30d.c.window_start == window_start,
+            )
+        )
+
+        result = await self.db.execute(query)
+        stats = {
+            row.api_key: {name: int(getattr(row, name) or 0) for name in OVERVIEW_STAT_COLUMNS}
+            for row in result
+        }
+        # No matching rows means the view is stale (or predates these events)
+        return stats or None
+
     async def get_sample_events(self, api_keys: List[str], limit: int = 5) -> List[Dict[str, Any]]:
         """Get sample events for debugging purposes."""
         sample_events_query = (
@@ -286,7 +738,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
                 AnalyticsEvent.received_at,
                 AnalyticsEvent.package_name,
             )
-            .filter(AnalyticsEvent.api_key.in_(api_keys))
+            .filter(self._api_key_filter(AnalyticsEvent.api_key, api_keys))
             .order_by(desc(AnalyticsEvent.received_at))
             .limit(limit)
         )
@@ -316,6 +768,34 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             "event_timestamp": event_timestamp
         })
 
+    async def bulk_insert_events(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert analytics event rows in one round-trip.
+
+        Rows go through a Core insert (no ORM unit of work or identity map).
+        On asyncpg, multi-row inserts are streamed with COPY, which skips SQL
+        parsing and planning entirely.
+        """
+        connection = await self.db.connection()
+        if connection.dialect.driver != 'asyncpg' or len(rows) == 1:
+            await self.db.execute(AnalyticsEvent.__table__.insert(), rows)
+            return
+
+        columns = list(rows[0])
+        records = [
+            tuple(
+                json.dumps(row[column])
+                if column == 'extra_data' and row[column] is not None
+                else row[column]
+                for column in columns
+            )
+            for row in rows
+        ]
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            AnalyticsEvent.__tablename__, records=records, columns=columns
+        )
+
     # Unique User Tracking Methods
 
     async def get_unique_users_count(
@@ -327,7 +807,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         """Get total unique users for given API keys within date range."""
         query = select(func.count(func.distinct(AnalyticsEvent.user_identifier))).filter(
             and_(
-                AnalyticsEvent.api_key.in_(api_keys),
+                self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                 AnalyticsEvent.user_identifier.isnot(None)
             )
         )
@@ -335,7 +815,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         if start_date:
             query = query.filter(AnalyticsEvent.event_timestamp >= start_date)
         if end_date:
-            query = query.filter(AnalyticsEvent.event_timestamp <= end_date)
+            query = query.filter(AnalyticsEvent.event_timestamp < end_date)
 
         result = await self.db.execute(query)
         return result.scalar() or 0
@@ -349,10 +829,10 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         """Get unique active users for a specific time period."""
         query = select(func.count(func.distinct(AnalyticsEvent.user_identifier))).filter(
             and_(
-                AnalyticsEvent.api_key.in_(api_keys),
+                self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                 AnalyticsEvent.user_identifier.isnot(None),
                 AnalyticsEvent.event_timestamp >= period_start,
-                AnalyticsEvent.event_timestamp <= period_end
+                AnalyticsEvent.event_timestamp < period_end
             )
         )
 
@@ -374,7 +854,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.user_identifier.isnot(None)
                 )
             )
@@ -386,7 +866,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         query = select(func.count()).select_from(first_seen_subquery).filter(
             and_(
                 first_seen_subquery.c.first_seen >= period_start,
-                first_seen_subquery.c.first_seen <= period_end
+                first_seen_subquery.c.first_seen < period_end
             )
         )
 
@@ -400,32 +880,156 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         end_date: datetime
     ) -> List[Dict[str, Any]]:
         """Get daily active users time series."""
-        query = (
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+
+        if dialect_name == 'postgresql' and len(api_keys) == 1:
+            # Per-key daily unique users are precomputed, so long ranges read
+            # one narrow row per day instead of scanning raw events. Across
+            # several keys a user may be counted once per key, so those still
+            # aggregate raw events.
+            query = (
+                select(
+                    DailyPackageStats.day.label("date"),
+                    func.sum(DailyPackageStats.unique_users).label("unique_users")
+                )
+                .filter(
+                    and_(
+                        DailyPackageStats.api_key == api_keys[0],
+                        DailyPackageStats.day >= start_date.date(),
+                        DailyPackageStats.day <= _last_day_before(end_date),
+                    )
+                )
+                .group_by(DailyPackageStats.day)
+                .order_by(DailyPackageStats.day)
+            )
+        else:
+            query = (
+                select(
+                    self._event_day(AnalyticsEvent.event_timestamp).label("date"),
+                    func.count(func.distinct(AnalyticsEvent.user_identifier)).label("unique_users")
+                )
+                .filter(
+                    and_(
+                        self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                        AnalyticsEvent.user_identifier.isnot(None),
+                        AnalyticsEvent.event_timestamp >= start_date,
+                        AnalyticsEvent.event_timestamp < end_date
+                    )
+                )
+                .group_by(self._event_day(AnalyticsEvent.event_timestamp))
+                .order_by(self._event_day(AnalyticsEvent.event_timestamp))
+            )
+
+        result = await self.db.execute(query)
+        return [
+            {
+                "date": row.date,
+                "unique_users": row.unique_users
+            }
+            for row in result.all()
+        ]
+
+    async def get_rolling_active_users_timeseries(
+        self,
+        api_keys: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """Get daily, 7-day and 30-day active users for each active day.
+
+        Events are first reduced to distinct (user, day) pairs over the range
+        plus the 29 preceding days. Each day in the range is then joined to
+        the pairs in its trailing 30 days, so all windows come from one scan
+        instead of a query per day and window.
+        """
+        event_day = self._event_day(AnalyticsEvent.event_timestamp)
+        user_days = (
             select(
-                func.date(AnalyticsEvent.event_timestamp).label("date"),
-                func.count(func.distinct(AnalyticsEvent.user_identifier)).label("unique_users")
+                AnalyticsEvent.user_identifier.label("user_identifier"),
+                event_day.label("day"),
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.user_identifier.isnot(None),
-                    AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp >= start_date - timedelta(days=29),
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
-            .group_by(func.date(AnalyticsEvent.event_timestamp))
-            .order_by(func.date(AnalyticsEvent.event_timestamp))
+            .group_by(AnalyticsEvent.user_identifier, event_day)
+            .subquery()
+        )
+        days = (
+            select(user_days.c.day)
+            .filter(user_days.c.day >= start_date.date())
+            .distinct()
+            .subquery()
+        )
+
+        def within(days_back):
+            return user_days.c.day >= self._days_before(days.c.day, days_back)
+
+        def users_where(condition):
+            return func.count(func.distinct(case((condition, user_days.c.user_identifier))))
+
+        query = (
+            select(
+                days.c.day.label("date"),
+                users_where(user_days.c.day == days.c.day).label("daily_active_users"),
+                users_where(within(6)).label("weekly_active_users"),
+                func.count(func.distinct(user_days.c.user_identifier)).label("monthly_active_users"),
+            )
+            .select_from(days)
+            .join(user_days, and_(user_days.c.day <= days.c.day, within(29)))
+            .group_by(days.c.day)
+            .order_by(days.c.day)
         )
 
         result = await self.db.execute(query)
         return [
             {
                 "date": row.date,
-                "unique_users": row.unique_users
+                "daily_active_users": row.daily_active_users,
+                "weekly_active_users": row.weekly_active_users,
+                "monthly_active_users": row.monthly_active_users,
             }
             for row in result.all()
         ]
 
+    async def get_new_users_by_day(
+        self,
+        api_keys: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[date, int]:
+        """Get the number of users first seen on each day of the range."""
+        first_seen_subquery = (
+            select(func.min(AnalyticsEvent.event_timestamp).label("first_seen"))
+            .filter(
+                and_(
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
+                    AnalyticsEvent.user_identifier.isnot(None)
+                )
+            )
+            .group_by(AnalyticsEvent.user_identifier)
+            .subquery()
+        )
+        first_day = self._event_day(first_seen_subquery.c.first_seen)
+
+        query = (
+            select(first_day.label("date"), func.count().label("new_users"))
+            .filter(
+                and_(
+                    first_seen_subquery.c.first_seen >= start_date,
+                    first_seen_subquery.c.first_seen < end_date
+                )
+            )
+            .group_by(first_day)
+        )
+
+        result = await self.db.execute(query)
+        return {row.date: row.new_users for row in result.all()}
+
     async def get_user_retention_stats(
         self,
         api_keys: List[str],
@@ -441,10 +1045,10 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.user_identifier.isnot(None),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
             .group_by(AnalyticsEvent.user_identifier)
@@ -497,14 +1101,17 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             select(
                 dimension_column.label("dimension_name"),
                 func.count(func.distinct(AnalyticsEvent.user_identifier)).label("unique_users"),
-                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions")
+                func.count(func.distinct(AnalyticsEvent.session_id)).label("total_sessions"),
+                self._percentage_of_total(
+                    func.count(func.distinct(AnalyticsEvent.user_identifier))
+                ).label("percentage"),
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.user_identifier.isnot(None),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
             .group_by(dimension_column)
@@ -517,6 +1124,7 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
                 "dimension_name": row.dimension_name,
                 "unique_users": row.unique_users,
                 "total_sessions": row.total_sessions,
+                "percentage": row.percentage,
                 "avg_sessions_per_user": row.total_sessions / row.unique_users if row.unique_users > 0 else 0
             }
             for row in result.all()
@@ -536,11 +1144,11 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.entry_point.isnot(None),
                     AnalyticsEvent.extra_data.isnot(None),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
             .group_by(AnalyticsEvent.entry_point)
@@ -566,24 +1174,24 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
         """
         query = (
             select(
-                func.date(AnalyticsEvent.event_timestamp).label("date"),
+                self._event_day(AnalyticsEvent.event_timestamp).label("date"),
                 AnalyticsEvent.entry_point.label("event_type"),
                 func.count(AnalyticsEvent.id).label("count")
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.entry_point.in_(event_types),
                     AnalyticsEvent.extra_data.isnot(None),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
             .group_by(
-                func.date(AnalyticsEvent.event_timestamp),
+                self._event_day(AnalyticsEvent.event_timestamp),
                 AnalyticsEvent.entry_point
             )
-            .order_by(func.date(AnalyticsEvent.event_timestamp))
+            .order_by(self._event_day(AnalyticsEvent.event_timestamp))
         )
 
         result = await self.db.execute(query)
@@ -612,11 +1220,11 @@ class AnalyticsEventRepository(BaseRepository[AnalyticsEvent]):
             )
             .filter(
                 and_(
-                    AnalyticsEvent.api_key.in_(api_keys),
+                    self._api_key_filter(AnalyticsEvent.api_key, api_keys),
                     AnalyticsEvent.entry_point == event_type,
                     AnalyticsEvent.extra_data.isnot(None),
                     AnalyticsEvent.event_timestamp >= start_date,
-                    AnalyticsEvent.event_timestamp <= end_date
+                    AnalyticsEvent.event_timestamp < end_date
                 )
             )
             .order_by(desc(AnalyticsEvent.event_timestamp))
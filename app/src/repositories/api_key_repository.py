@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import select, and_
+from sqlalchemy import Row, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.api_key import APIKey
@@ -135,12 +135,16 @@ class APIKeyRepository(BaseRepository[APIKey]):
         )
         return result.scalar()
 
-    async def get_user_api_keys_with_filter(self, user_id: int, package_name: Optional[str] = None) -> List[APIKey]:
-        """Get user's API keys with optional package filter."""
-        query = select(APIKey).filter(APIKey.user_id == user_id)
+    async def get_user_api_keys_with_filter(self, user_id: int, package_name: Optional[str] = None) -> List[Row]:
+        """Get (key, package_name) rows for a user's API keys with optional package filter.
+
+        Dashboard queries only need these two columns, so full ORM objects are
+        not loaded.
+        """
+        query = select(APIKey.key, APIKey.package_name).filter(APIKey.user_id == user_id)
 
         if package_name:
             query = query.filter(APIKey.package_name == package_name)
 
         result = await self.db.execute(query)
-        return list(result.scalars().all())
\ No newline at end of file
+        return list(result.all())
\ No newline at end of file
@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.api_key import APIKey
 from src.models.badge import Badge
 from src.repositories.base import BaseRepository
 
@@ -27,6 +28,15 @@ class BadgeRepository(BaseRepository[Badge]):
         )
         return result.scalar_one_or_none()
 
+    async def get_public_api_key_by_uuid(self, badge_uuid: UUID) -> Optional[APIKey]:
+        """Get the API key behind a public badge in a single query."""
+        result = await self.db.execute(
+            select(APIKey)
+            .join(Badge, Badge.api_key_id == APIKey.id)
+            .filter(Badge.badge_uuid == badge_uuid, Badge.is_public.is_(True))
+        )
+        return result.scalar_one_or_none()
+
     async def create_badge(self, api_key_id: int, badge_uuid: UUID, is_public: bool = False) -> Badge:
         """Create a new badge."""
         return await self.create({
@@ -36,8 +36,8 @@ class BaseRepository(Generic[ModelType], ABC):
         """Create a new record."""
         obj = self.model(**obj_data)
         self.db.add(obj)
+        # Server defaults (ids, created_at) come back via RETURNING on flush
         await self.db.flush()
-        await self.db.refresh(obj)
         return obj
 
     async def update(self, id: int, obj_data: Dict[str, Any]) -> Optional[ModelType]:
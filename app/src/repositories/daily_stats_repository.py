@@ -0,0 +1,89 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.analytics_event import AnalyticsEvent
+from src.models.api_key import APIKey
+from src.models.daily_stats import DailyStats
+from src.models.user import User
+from src.repositories.base import BaseRepository
+
+# Rollup column -> timestamp it counts by
+ROLLUP_SOURCES = {
+    "new_users": User.created_at,
+    "new_api_keys": APIKey.created_at,
+    "new_events": AnalyticsEvent.received_at,
+}
+
+
+class DailyStatsRepository(BaseRepository[DailyStats]):
+    """Repository for the daily_stats rollup."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, DailyStats)
+
+    def _utc_day(self, column):
+        """Expression for the UTC calendar day of a timestamp column."""
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        if dialect_name == 'postgresql':
+            return cast(func.timezone('UTC', column), Date)
+        # SQLite stores timestamps as naive UTC strings
+        return func.date(column, type_=Date)
+
+    async def refresh_since(self, since: date) -> int:
+        """
+        Recompute and upsert rollup rows for every day from `since` to today.
+
+        Days without activity get zero rows so readers can tell a quiet day
+        from a day the job has not covered yet.
+
+        Returns:
+            Number of days written
+        """
+        today = datetime.now(timezone.utc).date()
+        start = datetime.combine(since, time.min, tzinfo=timezone.utc)
+
+        counts: Dict[date, Dict[str, int]] = {
+            since + timedelta(days=offset): {}
+            for offset in range((today - since).days + 1)
+        }
+        for field, timestamp_column in ROLLUP_SOURCES.items():
+            day = self._utc_day(timestamp_column)
+            result = await self.db.execute(
+                select(day, func.count())
+                .where(timestamp_column >= start)
+                .group_by(day)
+            )
+            for row_day, count in result:
+                counts.setdefault(row_day, {})[field] = count
+
+        rows = [
+            {"day": day, **{field: values.get(field, 0) for field in ROLLUP_SOURCES}}
+            for day, values in counts.items()
+        ]
+
+        dialect_name = self.db.bind.dialect.name if self.db.bind else 'postgresql'
+        insert = postgresql_insert if dialect_name == 'postgresql' else sqlite_insert
+        stmt = insert(DailyStats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyStats.day],
+            set_={
+                **{field: stmt.excluded[field] for field in ROLLUP_SOURCES},
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+        return len(rows)
+
+    async def get_days(self, since: date, until: date) -> List[DailyStats]:
+        """Get rollup rows for days in [since, until), oldest first."""
+        result = await self.db.execute(
+            select(DailyStats)
+            .where(DailyStats.day >= since, DailyStats.day < until)
+            .order_by(DailyStats.day)
+        )
+        return list(result.scalars().all())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator, model_validator  # type: ignore[deprecated]
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from datetime import datetime
 from typing import Optional, Dict, Any
 from uuid import UUID
@@ -10,7 +10,7 @@ class AnalyticsEventCreate(BaseModel):
     """Schema for creating a new analytics event."""
 
     # Required fields
-    session_id: str = Field(..., description="Unique session identifier")
+    session_id: UUID = Field(..., description="Unique session identifier")
     package_name: str = Field(
         ..., min_length=1, max_length=100, description="Package name"
     )
@@ -71,7 +71,8 @@ class AnalyticsEventCreate(BaseModel):
         None, description="Additional metadata"
     )
 
-    @validator("python_version")  # type: ignore[deprecated]
+    @field_validator("python_version")
+    @classmethod
     def validate_python_version(cls, v):
         """Validate Python version format."""
         if not v:
@@ -82,7 +83,8 @@ class AnalyticsEventCreate(BaseModel):
             raise ValueError("Invalid Python version format")
         return v
 
-    @validator("os_type")  # type: ignore[deprecated]
+    @field_validator("os_type")
+    @classmethod
     def validate_os_type(cls, v):
         """Validate OS type."""
         valid_os_types = ["Linux", "Windows", "Darwin", "FreeBSD", "OpenBSD", "Other"]
@@ -90,17 +92,18 @@ class AnalyticsEventCreate(BaseModel):
             return "Other"  # Default to 'Other' for unknown OS types
         return v
 
-    @validator("session_id")  # type: ignore[deprecated]
+    @field_validator("session_id", mode="before")
+    @classmethod
     def validate_session_id(cls, v):
-        """Validate session ID format."""
+        """Validate session ID format and parse it once into a UUID."""
         if not v:
             raise ValueError("Session ID is required")
-        # Try to parse as UUID to ensure it's a valid format
+        if isinstance(v, UUID):
+            return v
         try:
-            UUID(v)
+            return UUID(str(v))
         except ValueError:
             raise ValueError("Session ID must be a valid UUID")
-        return v
 
     @model_validator(mode='before')
     @classmethod
@@ -191,11 +194,11 @@ class AnalyticsEventCreate(BaseModel):
 
         return values
 
-    class Config:
+    model_config = ConfigDict(
         # Allow extra fields for forward compatibility
-        extra = "allow"
+        extra="allow",
         # Example data for documentation
-        json_schema_extra = {
+        json_schema_extra={
             "example": {
                 "session_id": "550e8400-e29b-41d4-a716-446655440000",
                 "installation_id": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
@@ -221,7 +224,8 @@ class AnalyticsEventCreate(BaseModel):
                     "custom_field": "value",
                 },
             }
-        }
+        },
+    )
 
 
 class AnalyticsEventResponse(BaseModel):
@@ -237,8 +241,7 @@ class AnalyticsEventResponse(BaseModel):
     event_timestamp: datetime
     received_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AnalyticsEventBatch(BaseModel):
@@ -248,8 +251,8 @@ class AnalyticsEventBatch(BaseModel):
         ..., description="List of analytics events"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "events": [
                     {
@@ -263,3 +266,4 @@ class AnalyticsEventBatch(BaseModel):
                 ]
             }
         }
+    )
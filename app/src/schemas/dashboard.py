@@ -39,9 +39,9 @@ class PythonVersionDistribution(BaseModel):
 
     python_version: str
     event_count: int = Field(ge=0)
-    session_count: int = Field(ge=0)
+    session_count: Optional[int] = Field(default=None, ge=0)
     event_percentage: float = Field(ge=0, le=100)
-    session_percentage: float = Field(ge=0, le=100)
+    session_percentage: Optional[float] = Field(default=None, ge=0, le=100)
 
 
 class OSDistribution(BaseModel):
@@ -49,9 +49,9 @@ class OSDistribution(BaseModel):
 
     os_type: str
     event_count: int = Field(ge=0)
-    session_count: int = Field(ge=0)
+    session_count: Optional[int] = Field(default=None, ge=0)
     event_percentage: float = Field(ge=0, le=100)
-    session_percentage: float = Field(ge=0, le=100)
+    session_percentage: Optional[float] = Field(default=None, ge=0, le=100)
 
 
 class PackageVersionAdoption(BaseModel):
@@ -59,9 +59,9 @@ class PackageVersionAdoption(BaseModel):
 
     package_version: str
     event_count: int = Field(ge=0)
-    session_count: int = Field(ge=0)
+    session_count: Optional[int] = Field(default=None, ge=0)
     event_percentage: float = Field(ge=0, le=100)
-    session_percentage: float = Field(ge=0, le=100)
+    session_percentage: Optional[float] = Field(default=None, ge=0, le=100)
     is_latest_version: Optional[bool] = None
 
 
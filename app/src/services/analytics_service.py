@@ -1,9 +1,16 @@
-from datetime import datetime, date, timedelta, timezone as tz
-from typing import Optional, List, Dict, Any
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, date, time, timedelta, timezone as tz
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Tuple
 import logging
 from fastapi import HTTPException
+from pydantic import TypeAdapter
 
-from src.repositories.unit_of_work import AbstractUnitOfWork
+from src.core.cache import SingleFlight, TTLCache
+from src.core.config import settings
+from src.repositories.analytics_event_repository import AnalyticsEventRepository
+from src.repositories.api_key_repository import APIKeyRepository
+from src.repositories.unit_of_work import AbstractUnitOfWork, SqlAlchemyUnitOfWork
 from src.schemas.dashboard import (
     PackageOverview,
     TimeSeriesData,
@@ -21,87 +28,223 @@ from src.schemas.dashboard import (
 
 logger = logging.getLogger(__name__)
 
+# Validate whole response lists in one pydantic-core call
+PACKAGE_OVERVIEW_LIST = TypeAdapter(List[PackageOverview])
+PYTHON_VERSION_DISTRIBUTION_LIST = TypeAdapter(List[PythonVersionDistribution])
+OS_DISTRIBUTION_LIST = TypeAdapter(List[OSDistribution])
+PACKAGE_VERSION_ADOPTION_LIST = TypeAdapter(List[PackageVersionAdoption])
+
+# Dashboard responses keyed by (user_id, endpoint, params); aggregates change
+# slowly, so a short TTL absorbs dashboard refresh storms. Entries are kept
+# for a further stale window so they can be served while being refreshed.
+dashboard_cache: TTLCache[Any] = TTLCache(
+    ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS + settings.DASHBOARD_CACHE_STALE_SECONDS
+)
+
+
+def dashboard_cache_key(endpoint: str, user_id: int, analytics_service=None, **params):
+    """Cache key for a dashboard endpoint call.
+
+    Default date ranges end on the service's "today", so it is part of the key
+    and entries roll over at midnight.
+    """
+    today = analytics_service.today if analytics_service is not None else None
+    return (user_id, endpoint, today, tuple(sorted(params.items())))
+
+
+# (key, package_name) rows of a user's API keys by (user_id, package_name);
+# every dashboard query starts from this list and it rarely changes.
+user_api_keys_cache: TTLCache[List[Any]] = TTLCache(
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+)
+# A dashboard page requests all its panels at once, so a cold cache would
+# otherwise be filled by one identical lookup per panel
+_user_api_key_lookups: SingleFlight[List[Any]] = SingleFlight()
+
+
+# Bumped per user on every invalidation, so a response that was being computed
+# when the cache was invalidated is not stored after it
+_dashboard_cache_generations: Dict[int, int] = {}
+
+
+def dashboard_cache_generation(user_id: int) -> int:
+    """How many times the user's dashboard cache has been invalidated."""
+    return _dashboard_cache_generations.get(user_id, 0)
+
+
+def invalidate_dashboard_cache(user_id: int) -> None:
+    """Drop cached dashboard responses and API key lists for a user, e.g. after API key changes."""
+    _dashboard_cache_generations[user_id] = dashboard_cache_generation(user_id) + 1
+    dashboard_cache.invalidate_where(lambda key: key[0] == user_id)
+    user_api_keys_cache.invalidate_where(lambda key: key[0] == user_id)
+
+
+def _utc_midnight(day: date) -> datetime:
+    """Start of ``day`` in UTC."""
+    return datetime.combine(day, time.min, tz.utc)
+
 
 class AnalyticsService:
     """Service for analytics data processing and aggregation."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        session_factory: Optional[Callable] = None,
+        today: Optional[date] = None,
+    ):
         self.uow = uow
+        # Opens extra sessions so independent reads can run in parallel
+        self.session_factory = session_factory
+        # One snapshot per service, so all of a request's queries agree on the
+        # date even when they straddle midnight
+        self.today = today or date.today()
+
+    @asynccontextmanager
+    async def on_own_session(self) -> AsyncIterator["AnalyticsService"]:
+        """A copy of this service on a new session from the session factory.
+
+        For work that outlives the request whose session this service uses.
+        """
+        async with self.session_factory() as session:
+            yield AnalyticsService(
+                SqlAlchemyUnitOfWork(session),
+                session_factory=self.session_factory,
+                today=self.today,
+            )
+
+    def _resolve_date_range(
+        self,
+        start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> Tuple[date, date, datetime, datetime]:
+        """Fill in the default 30-day range ending today.
+
+        Returns the dates along with the UTC half-open interval covering both:
+        midnight at the start date up to, not including, midnight after the
+        end date. A reversed range is rejected before any query runs.
+        """
+        if not end_date:
+            end_date = self.today
+        if not start_date:
+            start_date = end_date - timedelta(days=30)
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+        start_datetime = _utc_midnight(start_date)
+        end_datetime = _utc_midnight(end_date + timedelta(days=1))
+        return start_date, end_date, start_datetime, end_datetime
+
+    async def _get_user_api_keys(self, user_id: int, package_name: Optional[str] = None) -> List[Any]:
+        """Get a user's (key, package_name) rows, cached briefly per user and filter."""
+        cache_key = (user_id, package_name)
+        api_keys = user_api_keys_cache.get(cache_key)
+        if api_keys is None:
+            async def load() -> List[Any]:
+                if self.session_factory is None:
+                    rows = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+                else:
+                    # Keep the request's session off the pool: holding its
+                    # connection while the queries that follow wait for more
+                    # could exhaust the pool under load
+                    async with self.session_factory() as session:
+                        rows = await APIKeyRepository(session).get_user_api_keys_with_filter(
+                            user_id, package_name
+                        )
+                user_api_keys_cache.set(cache_key, rows)
+                return rows
+
+            api_keys = await _user_api_key_lookups.do(cache_key, load)
+        return api_keys
+
+    async def _gather_event_queries(
+        self, *queries: Callable[[AnalyticsEventRepository], Awaitable[Any]]
+    ) -> List[Any]:
+        """Run independent analytics event queries, concurrently when possible.
+
+        A session cannot run two statements at once, so each query gets its own
+        session from the session factory, with at most
+        DASHBOARD_QUERY_CONCURRENCY open at a time so one request cannot drain
+        the connection pool. Without a factory, they run in turn on the unit of
+        work's session.
+        """
+        if self.session_factory is None:
+            return [await query(self.uow.analytics_events) for query in queries]
+
+        slots = asyncio.Semaphore(settings.DASHBOARD_QUERY_CONCURRENCY)
+
+        async def run(query):
+            async with slots, self.session_factory() as session:
+                return await query(AnalyticsEventRepository(session))
+
+        return list(await asyncio.gather(*(run(query) for query in queries)))
 
     async def get_package_overview(self, user_id: int, package_name: Optional[str] = None) -> List[PackageOverview]:
         """Get overview statistics for user's packages."""
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
         
         if not api_keys:
             return []
 
         api_key_values = [key.key for key in api_keys]
-        logger.info(f"Found {len(api_keys)} API keys for user {user_id} with package filter '{package_name}'")
+        logger.info("Found %s API keys for user %s with package filter '%s'", len(api_keys), user_id, package_name)
 
         # Get date range - last 30 days
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range()
 
-        # Check if we have any events in the current range
-        events_in_range = await self.uow.analytics_events.get_events_in_date_range_count(
-            api_key_values, start_datetime, end_datetime
+        # The default 30-day window is precomputed; otherwise aggregate every
+        # package in one grouped query
+        stats_by_key = await self.uow.analytics_events.get_precomputed_overview_stats(
+            api_key_values, start_date
         )
-        
-        # If no events in current range, extend to 90 days
-        if events_in_range == 0:
+        if stats_by_key is None:
+            stats_by_key = await self.uow.analytics_events.get_overview_stats_by_api_key(
+                api_key_values, start_datetime, end_datetime
+            )
+
+        # If no events in current range, extend to 90 days. The overview query
+        # already tells us, so no separate count is needed up front.
+        if not any(stats["total_events"] for stats in stats_by_key.values()):
             total_events = await self.uow.analytics_events.get_total_events_count(api_key_values)
             if total_events > 0:
                 extended_start_date = end_date - timedelta(days=90)
-                start_datetime = datetime.combine(extended_start_date, datetime.min.time()).replace(tzinfo=tz.utc)
+                start_datetime = _utc_midnight(extended_start_date)
                 start_date = extended_start_date
-                logger.info(f"No events in 30-day range, extending to 90 days: {extended_start_date} to {end_date}")
+                logger.info("No events in 30-day range, extending to 90 days: %s to %s", extended_start_date, end_date)
+                stats_by_key = await self.uow.analytics_events.get_overview_stats_by_api_key(
+                    api_key_values, start_datetime, end_datetime
+                )
+
+        empty_stats = {
+            "total_events": 0,
+            "total_sessions": 0,
+            "active_days": 0,
+            "unique_users": 0,
+            "python_versions_count": 0,
+            "operating_systems_count": 0,
+        }
 
-        # Aggregate stats per package
         overview_data = []
 
         for api_key in api_keys:
-            # Get stats for this API key
-            stats = await self.uow.analytics_events.get_stats_for_api_key(
-                api_key.key, start_datetime, end_datetime
-            )
-
-            # Get unique users count for this API key
-            unique_users = await self.uow.analytics_events.get_unique_users_count(
-                [api_key.key], start_datetime, end_datetime
-            )
-
-            # Get Python version and OS counts
-            python_version_count = await self.uow.analytics_events.get_unique_python_versions_count(
-                api_key.key, start_datetime
-            )
-            os_count = await self.uow.analytics_events.get_unique_os_count(
-                api_key.key, start_datetime
-            )
-
+            stats = stats_by_key.get(api_key.key, empty_stats)
             avg_daily_events = float(stats["total_events"]) / max(1, stats["active_days"])
 
-            overview_data.append(
-                PackageOverview(
-                    package_name=api_key.package_name,
-                    api_key=api_key.key,
-                    total_events=stats["total_events"],
-                    total_sessions=stats["total_sessions"],
-                    total_unique_users=unique_users,
-                    avg_daily_events=round(avg_daily_events, 2),
-                    active_days=stats["active_days"],
-                    python_versions_count=python_version_count,
-                    operating_systems_count=os_count,
-                    date_range_start=start_date,
-                    date_range_end=end_date,
-                )
-            )
+            overview_data.append({
+                "package_name": api_key.package_name,
+                "api_key": api_key.key,
+                "total_events": stats["total_events"],
+                "total_sessions": stats["total_sessions"],
+                "total_unique_users": stats["unique_users"],
+                "avg_daily_events": round(avg_daily_events, 2),
+                "active_days": stats["active_days"],
+                "python_versions_count": stats["python_versions_count"],
+                "operating_systems_count": stats["operating_systems_count"],
+                "date_range_start": start_date,
+                "date_range_end": end_date,
+            })
 
-        return overview_data
+        return PACKAGE_OVERVIEW_LIST.validate_python(overview_data)
 
     async def get_timeseries_data(self, user_id: int, package_name: Optional[str] = None,
                                  start_date: Optional[date] = None,
@@ -116,94 +259,65 @@ class AnalyticsService:
             end_date: End date for the range
             aggregation: Aggregation period - "day", "week", or "month"
         """
-        # Default to last 30 days if no date range provided
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return TimeSeriesData(dates=[], events=[], sessions=[], unique_users=[], packages=[])
 
         api_key_values = [key.key for key in api_keys]
 
-        # Get daily aggregated data
-        daily_stats = await self.uow.analytics_events.get_daily_timeseries(
-            api_key_values, start_datetime, end_datetime
-        )
+        # Organize data by date as rows stream in, one dict lookup per row
+        dates_data = {}
+        package_names = set()
 
-        # Get daily unique users data
-        daily_unique_users = await self.uow.analytics_events.get_daily_active_users_timeseries(
-            api_key_values, start_datetime, end_datetime
+        async def collect_daily_stats(repo):
+            async for stat in repo.stream_daily_timeseries(
+                api_key_values, start_datetime, end_datetime
+            ):
+                # Already an ISO date string
+                date_str = stat["date"]
+                package_names.add(stat["package_name"])
+
+                entry = dates_data.get(date_str)
+                if entry is None:
+                    entry = dates_data[date_str] = {
+                        "events": 0,
+                        "sessions": 0,
+                        "unique_users": 0,
+                        "packages": {}
+                    }
+
+                entry["events"] += stat["total_events"]
+                entry["sessions"] += stat["total_sessions"]
+                entry["packages"][stat["package_name"]] = {
+                    "events": stat["total_events"],
+                    "sessions": stat["total_sessions"],
+                }
+
+        # Get daily aggregated data and daily unique users data
+        _, daily_unique_users = await self._gather_event_queries(
+            collect_daily_stats,
+            lambda repo: repo.get_daily_active_users_timeseries(
+                api_key_values, start_datetime, end_datetime
+            ),
         )
 
-        # Create a map of date -> unique_users for quick lookup
-        unique_users_map = {}
+        # Attach unique users to the dates that have events
         for item in daily_unique_users:
             date_key = item["date"]
             # Handle both date objects (PostgreSQL) and strings (SQLite)
-            if isinstance(date_key, str):
-                unique_users_map[date_key] = item["unique_users"]
-            else:
-                unique_users_map[date_key.isoformat()] = item["unique_users"]
-
-        # Organize data by date
-        dates_data = {}
-        package_names = set()
-
-        for stat in daily_stats:
-            # Handle both date objects (PostgreSQL) and strings (SQLite)
-            date_key = stat["date"]
             date_str = date_key if isinstance(date_key, str) else date_key.isoformat()
-            package_names.add(stat["package_name"])
-
-            if date_str not in dates_data:
-                dates_data[date_str] = {
-                    "events": 0,
-                    "sessions": 0,
-                    "unique_users": unique_users_map.get(date_str, 0),
-                    "packages": {}
-                }
-
-            dates_data[date_str]["events"] += stat["total_events"]
-            dates_data[date_str]["sessions"] += stat["total_sessions"]
-            dates_data[date_str]["packages"][stat["package_name"]] = {
-                "events": stat["total_events"],
-                "sessions": stat["total_sessions"],
-            }
+            entry = dates_data.get(date_str)
+            if entry is not None:
+                entry["unique_users"] = item["unique_users"]
 
         # Apply aggregation based on period
-        if aggregation == "day":
-            # Build complete date range (fill gaps with zeros)
-            date_range = []
-            current_date = start_date
-            while current_date <= end_date:
-                date_range.append(current_date.isoformat())
-                current_date += timedelta(days=1)
-
-            # Fill in missing dates with zeros
-            events_list = []
-            sessions_list = []
-            unique_users_list = []
-
-            for date_str in date_range:
-                if date_str in dates_data:
-                    events_list.append(dates_data[date_str]["events"])
-                    sessions_list.append(dates_data[date_str]["sessions"])
-                    unique_users_list.append(dates_data[date_str]["unique_users"])
-                else:
-                    events_list.append(0)
-                    sessions_list.append(0)
-                    unique_users_list.append(0)
-
-        elif aggregation == "week":
+        if aggregation == "week":
             # Aggregate by week (Monday as start of week)
             date_range, events_list, sessions_list, unique_users_list = self._aggregate_by_week(
                 dates_data, start_date, end_date
@@ -216,26 +330,23 @@ class AnalyticsService:
             )
 
         else:
-            # Default to daily if invalid aggregation
+            # Daily, also the default for an invalid aggregation: walk the
+            # complete date range, filling gaps with zeros
             date_range = []
-            current_date = start_date
-            while current_date <= end_date:
-                date_range.append(current_date.isoformat())
-                current_date += timedelta(days=1)
-
             events_list = []
             sessions_list = []
             unique_users_list = []
+            empty = {"events": 0, "sessions": 0, "unique_users": 0}
 
-            for date_str in date_range:
-                if date_str in dates_data:
-                    events_list.append(dates_data[date_str]["events"])
-                    sessions_list.append(dates_data[date_str]["sessions"])
-                    unique_users_list.append(dates_data[date_str]["unique_users"])
-                else:
-                    events_list.append(0)
-                    sessions_list.append(0)
-                    unique_users_list.append(0)
+            current_date = start_date
+            while current_date <= end_date:
+                date_str = current_date.isoformat()
+                entry = dates_data.get(date_str, empty)
+                date_range.append(date_str)
+                events_list.append(entry["events"])
+                sessions_list.append(entry["sessions"])
+                unique_users_list.append(entry["unique_users"])
+                current_date += timedelta(days=1)
 
         return TimeSeriesData(
             dates=date_range,
@@ -412,20 +523,16 @@ class AnalyticsService:
 
     async def get_python_version_distribution(self, user_id: int, package_name: Optional[str] = None,
                                             start_date: Optional[date] = None,
-                                            end_date: Optional[date] = None) -> List[PythonVersionDistribution]:
+                                            end_date: Optional[date] = None,
+                                            include_sessions: bool = True,
+                                            top_k: Optional[int] = None) -> List[PythonVersionDistribution]:
         """Get Python version distribution for packages."""
-        # Default to last 30 days
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
         
         if not api_keys:
             return []
@@ -434,46 +541,35 @@ class AnalyticsService:
 
         # Get Python version distribution
         python_stats = await self.uow.analytics_events.get_python_version_distribution(
-            api_key_values, start_datetime, end_datetime
+            api_key_values, start_datetime, end_datetime, include_sessions, top_k
         )
 
-        # Calculate percentages
-        total_events = sum(stat["total_events"] for stat in python_stats)
-        total_sessions = sum(stat["total_sessions"] for stat in python_stats)
-
-        result = []
-        for stat in python_stats:
-            event_percentage = (stat["total_events"] / total_events * 100) if total_events > 0 else 0
-            session_percentage = (stat["total_sessions"] / total_sessions * 100) if total_sessions > 0 else 0
-
-            result.append(
-                PythonVersionDistribution(
-                    python_version=stat["python_version"],
-                    event_count=stat["total_events"],
-                    session_count=stat["total_sessions"],
-                    event_percentage=round(event_percentage, 2),
-                    session_percentage=round(session_percentage, 2),
-                )
-            )
+        # Percentages are computed and rounded by the database
+        result = [
+            {
+                "python_version": stat["python_version"],
+                "event_count": stat["total_events"],
+                "session_count": stat["total_sessions"],
+                "event_percentage": stat["event_percentage"],
+                "session_percentage": stat["session_percentage"],
+            }
+            for stat in python_stats
+        ]
 
-        return result
+        return PYTHON_VERSION_DISTRIBUTION_LIST.validate_python(result)
 
     async def get_os_distribution(self, user_id: int, package_name: Optional[str] = None,
                                  start_date: Optional[date] = None,
-                                 end_date: Optional[date] = None) -> List[OSDistribution]:
+                                 end_date: Optional[date] = None,
+                                 include_sessions: bool = True,
+                                 top_k: Optional[int] = None) -> List[OSDistribution]:
         """Get operating system distribution for packages."""
-        # Default to last 30 days
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
         
         if not api_keys:
             return []
@@ -482,76 +578,58 @@ class AnalyticsService:
 
         # Get OS distribution
         os_stats = await self.uow.analytics_events.get_os_distribution(
-            api_key_values, start_datetime, end_datetime
+            api_key_values, start_datetime, end_datetime, include_sessions, top_k
         )
 
-        # Calculate percentages
-        total_events = sum(stat["total_events"] for stat in os_stats)
-        total_sessions = sum(stat["total_sessions"] for stat in os_stats)
-
-        result = []
-        for stat in os_stats:
-            event_percentage = (stat["total_events"] / total_events * 100) if total_events > 0 else 0
-            session_percentage = (stat["total_sessions"] / total_sessions * 100) if total_sessions > 0 else 0
-
-            result.append(
-                OSDistribution(
-                    os_type=stat["os_type"],
-                    event_count=stat["total_events"],
-                    session_count=stat["total_sessions"],
-                    event_percentage=round(event_percentage, 2),
-                    session_percentage=round(session_percentage, 2),
-                )
-            )
+        # Percentages are computed and rounded by the database
+        result = [
+            {
+                "os_type": stat["os_type"],
+                "event_count": stat["total_events"],
+                "session_count": stat["total_sessions"],
+                "event_percentage": stat["event_percentage"],
+                "session_percentage": stat["session_percentage"],
+            }
+            for stat in os_stats
+        ]
 
-        return result
+        return OS_DISTRIBUTION_LIST.validate_python(result)
 
     async def get_package_version_adoption(self, user_id: int, package_name: str,
                                          start_date: Optional[date] = None,
-                                         end_date: Optional[date] = None) -> List[PackageVersionAdoption]:
+                                         end_date: Optional[date] = None,
+                                         include_sessions: bool = True,
+                                         top_k: Optional[int] = None) -> List[PackageVersionAdoption]:
         """Get package version adoption statistics."""
-        # Default to last 30 days
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API key for this package
-        api_key = await self.uow.api_keys.get_by_user_and_package(user_id, package_name)
-        
-        if not api_key:
+        api_keys = await self._get_user_api_keys(user_id, package_name)
+
+        if not api_keys:
             raise HTTPException(status_code=404, detail="Package not found")
 
         # Get package version distribution
         version_stats = await self.uow.analytics_events.get_package_version_distribution(
-            api_key.key, start_datetime, end_datetime
+            api_keys[0].key, start_datetime, end_datetime, include_sessions, top_k
         )
 
-        # Calculate percentages
-        total_events = sum(stat["total_events"] for stat in version_stats)
-        total_sessions = sum(stat["total_sessions"] for stat in version_stats)
-
-        result = []
-        for stat in version_stats:
-            event_percentage = (stat["total_events"] / total_events * 100) if total_events > 0 else 0
-            session_percentage = (stat["total_sessions"] / total_sessions * 100) if total_sessions > 0 else 0
-
-            result.append(
-                PackageVersionAdoption(
-                    package_version=stat["package_version"],
-                    event_count=stat["total_events"],
-                    session_count=stat["total_sessions"],
-                    event_percentage=round(event_percentage, 2),
-                    session_percentage=round(session_percentage, 2),
-                    is_latest_version=None,  # We don't track this in raw data anymore
-                )
-            )
+        # Percentages are computed and rounded by the database
+        result = [
+            {
+                "package_version": stat["package_version"],
+                "event_count": stat["total_events"],
+                "session_count": stat["total_sessions"],
+                "event_percentage": stat["event_percentage"],
+                "session_percentage": stat["session_percentage"],
+                "is_latest_version": None,  # We don't track this in raw data anymore
+            }
+            for stat in version_stats
+        ]
 
-        return result
+        return PACKAGE_VERSION_ADOPTION_LIST.validate_python(result)
 
     async def create_analytics_event(self, api_key: str, session_id: str, 
                                    package_name: str, package_version: str,
@@ -568,7 +646,7 @@ class AnalyticsService:
             event_timestamp=event_timestamp
         )
         await self.uow.commit()
-        logger.debug(f"Analytics event created for package {package_name}")
+        logger.debug("Analytics event created for package %s", package_name)
 
     async def get_analytics_summary_for_user(self, user_id: int) -> Dict[str, Any]:
         """Get a comprehensive analytics summary for a user."""
@@ -587,23 +665,22 @@ class AnalyticsService:
         # Get total events across all packages
         total_events = await self.uow.analytics_events.get_total_events_count(api_key_values)
         
-        # Get package-specific data
+        # Get recent stats for every package in one grouped query
+        end_date = datetime.now(tz.utc)
+        start_date = end_date - timedelta(days=30)
+        stats_by_key = await self.uow.analytics_events.get_overview_stats_by_api_key(
+            api_key_values, start_date, end_date
+        )
+
         packages_data = []
         for api_key in api_keys:
-            # Get recent stats for this package
-            end_date = datetime.now(tz.utc)
-            start_date = end_date - timedelta(days=30)
-            
-            stats = await self.uow.analytics_events.get_stats_for_api_key(
-                api_key.key, start_date, end_date
-            )
-            
+            stats = stats_by_key.get(api_key.key, {})
             packages_data.append({
                 "package_name": api_key.package_name,
                 "api_key": api_key.key,
-                "events": stats["total_events"],
-                "sessions": stats["total_sessions"],
-                "active_days": stats["active_days"]
+                "events": stats.get("total_events", 0),
+                "sessions": stats.get("total_sessions", 0),
+                "active_days": stats.get("active_days", 0)
             })
 
         total_sessions = sum(pkg["sessions"] for pkg in packages_data)
@@ -625,19 +702,13 @@ class AnalyticsService:
         end_date: Optional[date] = None
     ) -> UniqueUsersOverview:
         """Get overview of unique users for user's packages."""
-        # Default date range
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
         now = datetime.now(tz.utc)
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return UniqueUsersOverview(
@@ -658,71 +729,61 @@ class AnalyticsService:
 
         api_key_values = [key.key for key in api_keys]
 
-        # Get total unique users (all time within date range)
-        total_unique = await self.uow.analytics_events.get_unique_users_count(
-            api_key_values, start_datetime, end_datetime
-        )
-
-        # Get DAU (last 24 hours)
+        # DAU / WAU / MAU windows (last 24 hours, 7 days, 30 days)
         dau_start = now - timedelta(days=1)
-        daily_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, dau_start, now
-        )
-
-        # Get WAU (last 7 days)
         wau_start = now - timedelta(days=7)
-        weekly_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, wau_start, now
-        )
-
-        # Get MAU (last 30 days)
         mau_start = now - timedelta(days=30)
-        monthly_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, mau_start, now
-        )
-
-        # Get new users - today
-        today_start = datetime.combine(date.today(), datetime.min.time()).replace(tzinfo=tz.utc)
-        today_end = datetime.combine(date.today(), datetime.max.time()).replace(tzinfo=tz.utc)
-        new_users_today = await self.uow.analytics_events.get_new_users_count(
-            api_key_values, today_start, today_end
-        )
 
-        # Get new users - this week
+        # New user windows
+        today_start = _utc_midnight(self.today)
+        today_end = today_start + timedelta(days=1)
         week_start = today_start - timedelta(days=7)
-        new_users_week = await self.uow.analytics_events.get_new_users_count(
-            api_key_values, week_start, now
-        )
-
-        # Get new users - this month
         month_start = today_start - timedelta(days=30)
-        new_users_month = await self.uow.analytics_events.get_new_users_count(
-            api_key_values, month_start, now
-        )
 
-        # Calculate growth rates (compare to previous period)
-        # Daily growth rate
+        # Previous periods for growth rates
         yesterday_start = dau_start - timedelta(days=1)
-        yesterday_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, yesterday_start, dau_start
-        )
-        daily_growth = ((daily_active - yesterday_active) / yesterday_active * 100) if yesterday_active > 0 else None
-
-        # Weekly growth rate
         prev_week_start = wau_start - timedelta(days=7)
-        prev_week_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, prev_week_start, wau_start
-        )
-        weekly_growth = ((weekly_active - prev_week_active) / prev_week_active * 100) if prev_week_active > 0 else None
-
-        # Monthly growth rate
         prev_month_start = mau_start - timedelta(days=30)
-        prev_month_active = await self.uow.analytics_events.get_active_users_by_period(
-            api_key_values, prev_month_start, mau_start
+
+        def active(start, end):
+            return lambda repo: repo.get_active_users_by_period(api_key_values, start, end)
+
+        def new(start, end):
+            return lambda repo: repo.get_new_users_count(api_key_values, start, end)
+
+        # Every count is independent, so issue them together
+        (
+            total_unique,
+            daily_active,
+            weekly_active,
+            monthly_active,
+            new_users_today,
+            new_users_week,
+            new_users_month,
+            yesterday_active,
+            prev_week_active,
+            prev_month_active,
+        ) = await self._gather_event_queries(
+            lambda repo: repo.get_unique_users_count(
+                api_key_values, start_datetime, end_datetime
+            ),
+            active(dau_start, now),
+            active(wau_start, now),
+            active(mau_start, now),
+            new(today_start, today_end),
+            new(week_start, now),
+            new(month_start, now),
+            active(yesterday_start, dau_start),
+            active(prev_week_start, wau_start),
+            active(prev_month_start, mau_start),
         )
+
+        # Calculate growth rates (compare to previous period)
+        daily_growth = ((daily_active - yesterday_active) / yesterday_active * 100) if yesterday_active > 0 else None
+        weekly_growth = ((weekly_active - prev_week_active) / prev_week_active * 100) if prev_week_active > 0 else None
         monthly_growth = ((monthly_active - prev_month_active) / prev_month_active * 100) if prev_month_active > 0 else None
 
-        logger.info(f"Unique users overview for user {user_id}: {total_unique} total, {daily_active} DAU, {weekly_active} WAU, {monthly_active} MAU")
+        logger.info("Unique users overview for user %s: %s total, %s DAU, %s WAU, %s MAU", user_id, total_unique, daily_active, weekly_active, monthly_active)
 
         return UniqueUsersOverview(
             package_name=package_name or "all_packages",
@@ -748,18 +809,12 @@ class AnalyticsService:
         end_date: Optional[date] = None
     ) -> ActiveUsersTimeSeries:
         """Get time series data for active users."""
-        # Default date range
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return ActiveUsersTimeSeries(
@@ -773,49 +828,25 @@ class AnalyticsService:
 
         api_key_values = [key.key for key in api_keys]
 
-        # Get daily active users
-        daily_data = await self.uow.analytics_events.get_daily_active_users_timeseries(
-            api_key_values, start_datetime, end_datetime
+        # Rolling windows and first-seen days each come from a single grouped query
+        rolling, new_by_day = await self._gather_event_queries(
+            lambda repo: repo.get_rolling_active_users_timeseries(
+                api_key_values, start_datetime, end_datetime
+            ),
+            lambda repo: repo.get_new_users_by_day(
+                api_key_values, start_datetime, end_datetime
+            ),
         )
 
-        # Build date list
-        dates = [item["date"].isoformat() for item in daily_data]
-        daily_active = [item["unique_users"] for item in daily_data]
-
-        # Calculate WAU and MAU for each date (rolling windows)
-        weekly_active = []
-        monthly_active = []
-        new_users = []
-        returning_users = []
-
-        for item in daily_data:
-            current_date = datetime.combine(item["date"], datetime.max.time()).replace(tzinfo=tz.utc)
-
-            # WAU - 7 day window
-            wau_start = current_date - timedelta(days=7)
-            wau_count = await self.uow.analytics_events.get_active_users_by_period(
-                api_key_values, wau_start, current_date
-            )
-            weekly_active.append(wau_count)
-
-            # MAU - 30 day window
-            mau_start = current_date - timedelta(days=30)
-            mau_count = await self.uow.analytics_events.get_active_users_by_period(
-                api_key_values, mau_start, current_date
-            )
-            monthly_active.append(mau_count)
-
-            # New users for this date
-            day_start = datetime.combine(item["date"], datetime.min.time()).replace(tzinfo=tz.utc)
-            day_end = datetime.combine(item["date"], datetime.max.time()).replace(tzinfo=tz.utc)
-            new_count = await self.uow.analytics_events.get_new_users_count(
-                api_key_values, day_start, day_end
-            )
-            new_users.append(new_count)
-
-            # Returning users = DAU - new users
-            returning = max(0, item["unique_users"] - new_count)
-            returning_users.append(returning)
+        dates = [item["date"].isoformat() for item in rolling]
+        daily_active = [item["daily_active_users"] for item in rolling]
+        weekly_active = [item["weekly_active_users"] for item in rolling]
+        monthly_active = [item["monthly_active_users"] for item in rolling]
+        new_users = [new_by_day.get(item["date"], 0) for item in rolling]
+        # Returning users = DAU - new users
+        returning_users = [
+            max(0, dau - new_count) for dau, new_count in zip(daily_active, new_users)
+        ]
 
         return ActiveUsersTimeSeries(
             dates=dates,
@@ -834,18 +865,12 @@ class AnalyticsService:
         end_date: Optional[date] = None
     ) -> UserRetentionMetrics:
         """Get user retention and engagement metrics."""
-        # Default date range
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return UserRetentionMetrics(
@@ -919,18 +944,12 @@ class AnalyticsService:
         end_date: Optional[date] = None
     ) -> List[UniqueUsersByDimension]:
         """Internal method to get unique users by any dimension."""
-        # Default date range
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to timezone-aware datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return []
@@ -942,22 +961,15 @@ class AnalyticsService:
             api_key_values, dimension_field, start_datetime, end_datetime
         )
 
-        # Calculate percentages
-        total_unique_users = sum(stat["unique_users"] for stat in dimension_stats)
-
-        result = []
-        for stat in dimension_stats:
-            percentage = (stat["unique_users"] / total_unique_users * 100) if total_unique_users > 0 else 0
-            result.append(
-                UniqueUsersByDimension(
-                    dimension_name=str(stat["dimension_name"]),
-                    unique_users=stat["unique_users"],
-                    percentage=round(percentage, 2),
-                    avg_sessions_per_user=round(stat["avg_sessions_per_user"], 2)
-                )
+        return [
+            UniqueUsersByDimension(
+                dimension_name=str(stat["dimension_name"]),
+                unique_users=stat["unique_users"],
+                percentage=stat["percentage"],
+                avg_sessions_per_user=round(stat["avg_sessions_per_user"], 2)
             )
-
-        return result
+            for stat in dimension_stats
+        ]
 
     async def get_custom_event_types(self, api_keys: List[str],
                                     start_date: datetime,
@@ -982,7 +994,10 @@ class AnalyticsService:
                                           start_date: datetime,
                                           end_date: datetime,
                                           aggregation: str = "day") -> CustomEventTimeSeries:
-        """Get time series data for selected custom event types with aggregation support."""
+        """Get time series data for selected custom event types with aggregation support.
+
+        end_date is exclusive, as in the repository queries.
+        """
         from src.schemas.dashboard import CustomEventTimeSeries
         from collections import defaultdict
 
@@ -991,6 +1006,8 @@ class AnalyticsService:
             api_keys, event_types, start_date, end_date
         )
 
+        last_day = (end_date - timedelta(microseconds=1)).date()
+
         # Organize data by event type and date
         data_by_type = defaultdict(lambda: defaultdict(int))
         for row in raw_data:
@@ -1012,7 +1029,7 @@ class AnalyticsService:
             # Build complete daily date range with zeros
             daily_dates_data = {}
             current_date = start_date.date()
-            while current_date <= end_date.date():
+            while current_date <= last_day:
                 date_str = current_date.isoformat()
                 if date_str in event_daily_data:
                     daily_dates_data[date_str] = event_daily_data[date_str]["count"]
@@ -1023,11 +1040,11 @@ class AnalyticsService:
             # Apply aggregation
             if aggregation == "week":
                 aggregated_dates, aggregated_counts = self._aggregate_custom_events_by_week(
-                    daily_dates_data, start_date.date(), end_date.date()
+                    daily_dates_data, start_date.date(), last_day
                 )
             elif aggregation == "month":
                 aggregated_dates, aggregated_counts = self._aggregate_custom_events_by_month(
-                    daily_dates_data, start_date.date(), end_date.date()
+                    daily_dates_data, start_date.date(), last_day
                 )
             else:  # Default to daily
                 aggregated_dates = list(daily_dates_data.keys())
@@ -1041,13 +1058,13 @@ class AnalyticsService:
         # If no data, return empty structure with appropriate date range
         if date_range is None:
             if aggregation == "week":
-                date_range = self._build_week_range(start_date.date(), end_date.date())
+                date_range = self._build_week_range(start_date.date(), last_day)
             elif aggregation == "month":
-                date_range = self._build_month_range(start_date.date(), end_date.date())
+                date_range = self._build_month_range(start_date.date(), last_day)
             else:
                 date_range = []
                 current_date = start_date.date()
-                while current_date <= end_date.date():
+                while current_date <= last_day:
                     date_range.append(current_date.isoformat())
                     current_date += timedelta(days=1)
 
@@ -1068,9 +1085,12 @@ class AnalyticsService:
         """Get detailed information about a specific custom event type."""
         from src.schemas.dashboard import CustomEventDetails, CustomEventProperty
 
-        # Get event count
-        event_types_data = await self.uow.analytics_events.get_custom_event_types(
-            api_keys, start_date, end_date
+        # Get event counts and property samples
+        event_types_data, properties_data = await self._gather_event_queries(
+            lambda repo: repo.get_custom_event_types(api_keys, start_date, end_date),
+            lambda repo: repo.get_custom_event_properties(
+                api_keys, event_type, start_date, end_date, limit=10
+            ),
         )
 
         total_count = 0
@@ -1079,11 +1099,6 @@ class AnalyticsService:
                 total_count = event_data["total_count"]
                 break
 
-        # Get property samples
-        properties_data = await self.uow.analytics_events.get_custom_event_properties(
-            api_keys, event_type, start_date, end_date, limit=10
-        )
-
         sample_properties = [
             CustomEventProperty(
                 properties=prop["properties"],
@@ -1103,24 +1118,18 @@ class AnalyticsService:
                                               start_date: Optional[date] = None,
                                               end_date: Optional[date] = None) -> List[CustomEventType]:
         """Get custom event types for a user's packages."""
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
+
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             return []
 
         api_key_values = [key.key for key in api_keys]
 
-        # Use default date range if not provided
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
-
         return await self.get_custom_event_types(api_key_values, start_datetime, end_datetime)
 
     async def get_custom_events_timeseries_for_user(self, user_id: int,
@@ -1130,18 +1139,12 @@ class AnalyticsService:
                                                    end_date: Optional[date] = None,
                                                    aggregation: str = "day") -> CustomEventTimeSeries:
         """Get custom events timeseries for a user's packages."""
-        # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
-
-        # Use default date range if not provided
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
 
-        # Convert to datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
+        # Get user's API keys
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         # If no API keys, pass empty list (will return zeros for date range)
         api_key_values = [key.key for key in api_keys] if api_keys else []
@@ -1154,8 +1157,12 @@ class AnalyticsService:
                                                start_date: Optional[date] = None,
                                                end_date: Optional[date] = None) -> CustomEventDetails:
         """Get custom event details for a user's packages."""
+        start_date, end_date, start_datetime, end_datetime = self._resolve_date_range(
+            start_date, end_date
+        )
+
         # Get user's API keys
-        api_keys = await self.uow.api_keys.get_user_api_keys_with_filter(user_id, package_name)
+        api_keys = await self._get_user_api_keys(user_id, package_name)
 
         if not api_keys:
             # Return empty details
@@ -1163,14 +1170,4 @@ class AnalyticsService:
 
         api_key_values = [key.key for key in api_keys]
 
-        # Use default date range if not provided
-        if not end_date:
-            end_date = date.today()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Convert to datetime
-        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=tz.utc)
-        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=tz.utc)
-
         return await self.get_custom_event_details(api_key_values, event_type, start_datetime, end_datetime)
\ No newline at end of file
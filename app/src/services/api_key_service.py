@@ -4,8 +4,10 @@ from typing import Optional, List
 import logging
 from fastapi import HTTPException
 
+from src.core.api_auth import api_key_cache
 from src.models.api_key import APIKey
 from src.repositories.unit_of_work import AbstractUnitOfWork
+from src.services.analytics_service import invalidate_dashboard_cache
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +81,7 @@ class APIKeyService:
         )
 
         await self.uow.commit()
+        invalidate_dashboard_cache(user_id)
         logger.info(f"Created API key for user {user.email}, package {package_name}")
         return new_api_key
 
@@ -133,6 +136,8 @@ class APIKeyService:
         # Deactivate the key
         deactivated_key = await self.uow.api_keys.deactivate_key(api_key_id)
         await self.uow.commit()
+        api_key_cache.invalidate(api_key.key)
+        invalidate_dashboard_cache(user_id)
         
         logger.info(f"Deactivated API key {api_key.key} for user {user_id}")
         return deactivated_key
@@ -151,6 +156,7 @@ class APIKeyService:
         # Activate the key
         activated_key = await self.uow.api_keys.activate_key(api_key_id)
         await self.uow.commit()
+        invalidate_dashboard_cache(user_id)
         
         logger.info(f"Activated API key {api_key.key} for user {user_id}")
         return activated_key
@@ -169,6 +175,8 @@ class APIKeyService:
         # Delete the key
         deleted = await self.uow.api_keys.delete(api_key_id)
         await self.uow.commit()
+        api_key_cache.invalidate(api_key.key)
+        invalidate_dashboard_cache(user_id)
         
         if deleted:
             logger.info(f"Deleted API key {api_key.key} for user {user_id}")
@@ -222,8 +230,11 @@ class APIKeyService:
                 raise HTTPException(status_code=500, detail="Failed to generate unique API key")
 
         # Update the API key
+        old_key = api_key.key
         updated_key = await self.uow.api_keys.update(api_key_id, {"key": new_key})
         await self.uow.commit()
+        api_key_cache.invalidate(old_key)
+        invalidate_dashboard_cache(user_id)
         
         logger.info(f"Regenerated API key for user {user_id}, package {api_key.package_name}")
         return updated_key
@@ -287,11 +298,18 @@ class APIKeyService:
             else:
                 # If setting to private and no badge exists, nothing to do
                 await self.uow.commit()
-                logger.info(f"No badge to update for API key {api_key.key}, user {user_id}")
+                logger.info(
+                    "No badge to update for API key %s, user %s", api_key.key, user_id
+                )
                 return {"success": True, "badge_public": False}
 
         await self.uow.commit()
-        logger.info(f"Updated badge visibility to {is_public} for API key {api_key.key}, user {user_id}")
+        logger.info(
+            "Updated badge visibility to %s for API key %s, user %s",
+            is_public,
+            api_key.key,
+            user_id,
+        )
 
         return {
             "success": True,
@@ -309,17 +327,8 @@ class APIKeyService:
         except (ValueError, AttributeError):
             return None
 
-        # Get the badge by UUID
-        badge = await self.uow.badges.get_by_uuid(uuid_obj)
-        if not badge:
-            return None
-
-        # Check if badge is public
-        if not badge.is_public:
-            return None
-
-        # Get the API key to get package name
-        api_key = await self.uow.api_keys.get_by_id(badge.api_key_id)
+        # Get the API key of the badge, only if the badge exists and is public
+        api_key = await self.uow.badges.get_public_api_key_by_uuid(uuid_obj)
         if not api_key:
             return None
 
@@ -0,0 +1,306 @@
+"""
+Platform-wide statistics for the backoffice pages.
+
+Shared by the backoffice handlers and the scheduled refresh command.
+"""
+
+import asyncio
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.database import get_read_db_session
+from src.models.user import User
+from src.models.api_key import APIKey
+from src.models.analytics_event import AnalyticsEvent
+from src.models.daily_package_stats import DailyPackageStats
+from src.repositories.daily_stats_repository import DailyStatsRepository
+from src.utils.sql import count_distinct, estimate_row_count
+
+# Platform-wide statistics are identical for every admin and change slowly.
+# A scheduled job keeps them warm; handlers only compute them on a cold cache.
+backoffice_stats_cache: TTLCache[dict] = TTLCache(
+    ttl_seconds=settings.BACKOFFICE_STATS_CACHE_TTL_SECONDS, maxsize=16
+)
+
+
+
+async def _rollup_event_counts(
+    db: AsyncSession, now: datetime, windows: Dict[str, int]
+) -> Optional[Dict[str, int]]:
+    """
+    Count analytics events received in the last N UTC days, today included.
+
+    Today is counted live and the N-1 closed days before it are summed from
+    the daily_stats rollup. Returns None if the rollup is missing any closed
+    day in the longest window, so callers can fall back to counting events
+    directly.
+    """
+    today = now.date()
+    closed_days = max(windows.values()) - 1
+    days = await DailyStatsRepository(db).get_days(today - timedelta(days=closed_days), today)
+    if len(days) < closed_days:
+        return None
+
+    today_start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+    today_count = await db.scalar(
+        select(func.count(AnalyticsEvent.id)).where(
+            AnalyticsEvent.received_at >= today_start
+        )
+    )
+
+    return {
+        name: (today_count or 0)
+        + sum(d.new_events for d in days if d.day > today - timedelta(days=n))
+        for name, n in windows.items()
+    }
+
+
+async def dashboard_stats(db: AsyncSession, exact: bool = False) -> dict:
+    """
+    Compute overview statistics for the admin dashboard.
+
+    Unless exact counts are requested, the analytics event total comes from
+    the Postgres row estimate so the largest table is never fully scanned.
+    """
+
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+
+    # Get basic and week statistics with one aggregate query per table
+    user_stats = (
+        await db.execute(
+            select(
+                func.count(User.id).label("total"),
+                func.count(User.id)
+                .filter(User.is_active, User.is_verified)
+                .label("active"),
+                func.count(User.id)
+                .filter(User.created_at >= week_ago)
+                .label("new_this_week"),
+            )
+        )
+    ).one()
+    api_key_stats = (
+        await db.execute(
+            select(
+                func.count(APIKey.id).label("total"),
+                count_distinct(APIKey.package_name).label("unique_packages"),
+                func.count(APIKey.id)
+                .filter(APIKey.created_at >= week_ago)
+                .label("new_this_week"),
+            )
+        )
+    ).one()
+    total_events = None if exact else await estimate_row_count(db, "analytics_events")
+    total_events_estimated = total_events is not None
+    if not total_events_estimated:
+        event_stats = (
+            await db.execute(
+                select(
+                    func.count(AnalyticsEvent.id).label("total"),
+                    func.count(AnalyticsEvent.id)
+                    .filter(AnalyticsEvent.received_at >= week_ago)
+                    .label("new_this_week"),
+                )
+            )
+        ).one()
+        total_events, new_events_this_week = event_stats.total, event_stats.new_this_week
+    else:
+        windowed = await _rollup_event_counts(db, now, {"this_week": 7})
+        if windowed is not None:
+            new_events_this_week = windowed["this_week"]
+        else:
+            # Rollup not caught up; count the last week as an index range scan
+            new_events_this_week = await db.scalar(
+                select(func.count(AnalyticsEvent.id)).where(
+                    AnalyticsEvent.received_at >= week_ago
+                )
+            )
+
+    return {
+        "total_users": user_stats.total or 0,
+        "active_users": user_stats.active or 0,
+        "total_api_keys": api_key_stats.total or 0,
+        "unique_packages": api_key_stats.unique_packages or 0,
+        "total_events": total_events or 0,
+        "total_events_estimated": total_events_estimated,
+        "new_users_this_week": user_stats.new_this_week or 0,
+        "new_keys_this_week": api_key_stats.new_this_week or 0,
+        "new_events_this_week": new_events_this_week or 0,
+    }
+
+
+async def user_stats(db: AsyncSession) -> dict:
+    """Compute user statistics for the backoffice users page."""
+    # Get user statistics in a single aggregate query
+    user_stats = (
+        await db.execute(
+            select(
+                func.count(User.id).label("total"),
+                func.count(User.id)
+                .filter(User.is_active, User.is_verified)
+                .label("active"),
+                func.count(User.id).filter(User.is_verified).label("verified"),
+                func.count(User.id).filter(User.is_admin).label("admin"),
+            )
+        )
+    ).one()
+
+    return {
+        "total_users": user_stats.total or 0,
+        "active_users": user_stats.active or 0,
+        "verified_users": user_stats.verified or 0,
+        "admin_users": user_stats.admin or 0,
+    }
+
+
+async def api_key_stats(db: AsyncSession) -> dict:
+    """Compute API key statistics for the backoffice API keys page."""
+    now = datetime.now(timezone.utc)
+    month_ago = now - timedelta(days=30)
+    week_ago = now - timedelta(days=7)
+
+    # Get API key and time-based statistics in a single aggregate query
+    key_stats = (
+        await db.execute(
+            select(
+                func.count(APIKey.id).label("total"),
+                count_distinct(APIKey.package_name).label("unique_packages"),
+                func.count(APIKey.id)
+                .filter(APIKey.created_at >= month_ago)
+                .label("this_month"),
+                func.count(APIKey.id)
+                .filter(APIKey.created_at >= week_ago)
+                .label("this_week"),
+            )
+        )
+    ).one()
+
+    return {
+        "total_keys": key_stats.total or 0,
+        "unique_packages": key_stats.unique_packages or 0,
+        "keys_this_month": key_stats.this_month or 0,
+        "keys_this_week": key_stats.this_week or 0,
+    }
+
+
+async def event_stats(db: AsyncSession, exact: bool = False) -> dict:
+    """
+    Compute analytics event statistics for the backoffice events page.
+
+    Unless exact counts are requested, the total comes from the Postgres row
+    estimate, time windows are summed from the daily_stats rollup (or counted
+    over the last month only), and distinct packages are read from the
+    daily_package_stats rollup.
+    """
+    # Analytics events don't have a processed state - they're raw event data
+    processed_events = 0
+    pending_events = 0
+
+    # One reference instant so every window agrees
+    now = datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+
+    total_events = None if exact else await estimate_row_count(db, "analytics_events")
+    total_events_estimated = total_events is not None
+
+    if total_events_estimated:
+        windowed = await _rollup_event_counts(
+            db, now, {"today": 1, "this_week": 7, "this_month": 30}
+        )
+        if windowed is None:
+            # Rollup not caught up; index range scan over the last month
+            windowed = (
+                await db.execute(
+                    select(
+                        func.count(AnalyticsEvent.id)
+                        .filter(AnalyticsEvent.received_at >= today)
+                        .label("today"),
+                        func.count(AnalyticsEvent.id)
+                        .filter(AnalyticsEvent.received_at >= week_ago)
+                        .label("this_week"),
+                        func.count(AnalyticsEvent.id).label("this_month"),
+                    ).where(AnalyticsEvent.received_at >= month_ago)
+                )
+            ).one()._asdict()
+        unique_packages = await db.scalar(
+            select(count_distinct(DailyPackageStats.package_name))
+        )
+    else:
+        # Get event, time-based and package statistics in one table scan
+        event_stats = (
+            await db.execute(
+                select(
+                    func.count(AnalyticsEvent.id).label("total"),
+                    func.count(AnalyticsEvent.id)
+                    .filter(AnalyticsEvent.received_at >= today)
+                    .label("today"),
+                    func.count(AnalyticsEvent.id)
+                    .filter(AnalyticsEvent.received_at >= week_ago)
+                    .label("this_week"),
+                    func.count(AnalyticsEvent.id)
+                    .filter(AnalyticsEvent.received_at >= month_ago)
+                    .label("this_month"),
+                    count_distinct(AnalyticsEvent.package_name).label(
+                        "unique_packages"
+                    ),
+                )
+            )
+        ).one()
+        total_events = event_stats.total
+        unique_packages = event_stats.unique_packages
+        windowed = event_stats._asdict()
+
+    return {
+        "total_events": total_events or 0,
+        "total_events_estimated": total_events_estimated,
+        "processed_events": processed_events or 0,
+        "pending_events": pending_events or 0,
+        "events_today": windowed["today"] or 0,
+        "events_this_week": windowed["this_week"] or 0,
+        "events_this_month": windowed["this_month"] or 0,
+        "unique_packages_from_events": unique_packages or 0,
+    }
+
+
+BACKOFFICE_STATS = {
+    "dashboard": dashboard_stats,
+    "users": user_stats,
+    "api_keys": api_key_stats,
+    "events": event_stats,
+}
+
+
+async def get_backoffice_stats(name: str, db: AsyncSession) -> dict:
+    """Return cached statistics for a backoffice page, computing them on a miss."""
+    stats = backoffice_stats_cache.get(name)
+    if stats is None:
+        stats = await BACKOFFICE_STATS[name](db)
+        backoffice_stats_cache.set(name, stats)
+    return stats
+
+
+async def refresh_backoffice_stats(
+    session_factory: Callable = get_read_db_session,
+) -> None:
+    """
+    Recompute every backoffice statistics block and store it in the cache.
+
+    Each block gets its own session so the queries run concurrently on
+    separate pooled connections instead of queueing on one.
+    """
+
+    async def refresh(name: str, compute) -> None:
+        async with session_factory() as session:
+            backoffice_stats_cache.set(name, await compute(session))
+
+    await asyncio.gather(
+        *(refresh(name, compute) for name, compute in BACKOFFICE_STATS.items())
+    )
@@ -0,0 +1,43 @@
+"""
+SQL expression helpers shared across queries.
+"""
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import ScalarSelect
+
+
+def count_distinct(column: ColumnElement) -> ScalarSelect:
+    """
+    Count distinct non-null values of a column as a scalar subquery.
+
+    Equivalent to COUNT(DISTINCT column), but written as a COUNT over a
+    GROUP BY subquery so Postgres can use a parallel hash aggregate instead
+    of sorting the whole column on a single worker.
+    """
+    distinct_values = (
+        select(column).where(column.isnot(None)).group_by(column).subquery()
+    )
+    return select(func.count()).select_from(distinct_values).scalar_subquery()
+
+
+async def estimate_row_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Return the planner's row count estimate for a table.
+
+    Reads pg_class.reltuples, which autovacuum/ANALYZE keep close to the real
+    count, instead of scanning the table. Returns None on other databases or
+    when the table has never been analyzed.
+    """
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return None
+
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
@@ -8,8 +8,13 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.pool import StaticPool
 
 from src.main import app
+from src.services.backoffice_stats import backoffice_stats_cache
+from src.api.badge import badge_svg_cache
+from src.services.analytics_service import dashboard_cache, user_api_keys_cache
+from src.core.api_auth import api_key_cache
+from src.core.dependencies import subscription_user_cache
 from src.models import Base
-from src.core.database import get_db
+from src.core.database import get_db, get_read_db
 
 # Set testing environment variable
 os.environ["TESTING"] = "1"
@@ -33,6 +38,25 @@ def mock_polar():
         yield
 
 
+# Each test gets a fresh database, so in-process lookup caches must not leak
+@pytest.fixture(autouse=True)
+def clear_lookup_caches():
+    """Clear in-process lookup and response caches between tests."""
+    api_key_cache.clear()
+    subscription_user_cache.clear()
+    backoffice_stats_cache.clear()
+    badge_svg_cache.clear()
+    dashboard_cache.clear()
+    user_api_keys_cache.clear()
+    yield
+    api_key_cache.clear()
+    subscription_user_cache.clear()
+    backoffice_stats_cache.clear()
+    badge_svg_cache.clear()
+    dashboard_cache.clear()
+    user_api_keys_cache.clear()
+
+
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
@@ -81,11 +105,22 @@ async def override_get_db(async_session):
 
 
 @pytest_asyncio.fixture
-async def client(override_get_db):
+async def override_get_read_db_session(async_engine):
+    """Point the dashboard's extra read sessions at the test database."""
+    session_maker = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    with patch("src.core.service_dependencies.get_read_db_session", session_maker):
+        yield session_maker
+
+
+@pytest_asyncio.fixture
+async def client(override_get_db, override_get_read_db_session):
     """Create test client with overridden database."""
     from httpx import ASGITransport
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
@@ -96,11 +131,12 @@ async def client(override_get_db):
 
 
 @pytest_asyncio.fixture
-async def auth_client(override_get_db):
+async def auth_client(override_get_db, override_get_read_db_session):
     """Create test client with mock authentication."""
     from httpx import ASGITransport
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
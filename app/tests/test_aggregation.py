@@ -1,9 +1,16 @@
 """Tests for dashboard aggregation functionality."""
 
+import asyncio
+from unittest.mock import patch
+
+import pytest
 import pytest_asyncio
 from datetime import datetime, date, timedelta, timezone
 from uuid import uuid4
 
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
 from src.models.analytics_event import AnalyticsEvent
 from src.models.api_key import APIKey
 from src.models.user import User
@@ -93,6 +100,37 @@ class TestDashboardAggregation:
         # Daily aggregation should have more data points (30 days)
         assert len(result.dates) == 31  # inclusive range
 
+    async def test_default_range_ends_on_service_today(
+        self, async_session, test_user_with_events
+    ):
+        """Test that default date ranges use the service's snapshot of today."""
+        user, api_key, _ = test_user_with_events
+
+        today = date.today() - timedelta(days=3)
+        service = AnalyticsService(SqlAlchemyUnitOfWork(async_session), today=today)
+
+        result = await service.get_timeseries_data(user.id)
+
+        assert result.dates[0] == (today - timedelta(days=30)).isoformat()
+        assert result.dates[-1] == today.isoformat()
+
+    async def test_reversed_range_is_rejected_without_queries(
+        self, async_session, test_user_with_events
+    ):
+        """Test that a start date after the end date fails before touching the database."""
+        user, _, _ = test_user_with_events
+        uow = SqlAlchemyUnitOfWork(async_session)
+        service = AnalyticsService(uow)
+
+        with patch.object(uow.api_keys, "get_user_api_keys_with_filter") as lookup:
+            with pytest.raises(HTTPException) as exc_info:
+                await service.get_os_distribution(
+                    user.id, start_date=date.today(), end_date=date.today() - timedelta(days=1)
+                )
+
+        assert exc_info.value.status_code == 400
+        lookup.assert_not_called()
+
     async def test_weekly_aggregation(
         self, async_session, test_user_with_events
     ):
@@ -334,6 +372,326 @@ class TestDashboardAggregation:
         assert result.packages == []
 
 
+    async def test_package_overview_matches_per_key_stats(
+        self, async_session, test_user_with_events
+    ):
+        """Test that the grouped overview query matches the per-key helpers."""
+        user, api_key, _ = test_user_with_events
+
+        # A second package without events still gets an overview row
+        empty_key = APIKey(
+            package_name="empty-package",
+            key="klyne_test_aggregation_empty",
+            user_id=user.id,
+        )
+        async_session.add(empty_key)
+        await async_session.commit()
+
+        uow = SqlAlchemyUnitOfWork(async_session)
+        service = AnalyticsService(uow)
+        overview = {o.package_name: o for o in await service.get_package_overview(user.id)}
+
+        start = datetime.combine(
+            date.today() - timedelta(days=30), datetime.min.time()
+        ).replace(tzinfo=timezone.utc)
+        end = datetime.combine(date.today(), datetime.max.time()).replace(
+            tzinfo=timezone.utc
+        )
+        repo = uow.analytics_events
+        stats = await repo.get_stats_for_api_key(api_key.key, start, end)
+
+        package = overview["test-package"]
+        assert package.total_events == stats["total_events"]
+        assert package.total_sessions == stats["total_sessions"]
+        assert package.active_days == stats["active_days"]
+        assert package.total_unique_users == await repo.get_unique_users_count(
+            [api_key.key], start, end
+        )
+        assert package.python_versions_count == 1
+        assert package.operating_systems_count == 1
+
+        empty = overview["empty-package"]
+        assert empty.total_events == 0
+        assert empty.total_unique_users == 0
+
+    async def test_analytics_summary_matches_per_key_stats(
+        self, async_session, test_user_with_events
+    ):
+        """Test that the user summary reports each package's recent stats."""
+        user, api_key, _ = test_user_with_events
+
+        uow = SqlAlchemyUnitOfWork(async_session)
+        summary = await AnalyticsService(uow).get_analytics_summary_for_user(user.id)
+
+        end = datetime.now(timezone.utc)
+        stats = await uow.analytics_events.get_stats_for_api_key(
+            api_key.key, end - timedelta(days=30), end
+        )
+
+        [package] = summary["packages"]
+        assert package["api_key"] == api_key.key
+        assert package["events"] == stats["total_events"]
+        assert package["sessions"] == stats["total_sessions"]
+        assert package["active_days"] == stats["active_days"]
+        assert summary["total_sessions"] == stats["total_sessions"]
+
+
+    async def test_dashboard_queries_with_concurrent_sessions(
+        self, async_engine, async_session, test_user_with_events
+    ):
+        """Test that fanning queries out over extra sessions gives the same results."""
+        user, _, _ = test_user_with_events
+        uow = SqlAlchemyUnitOfWork(async_session)
+
+        sequential = await AnalyticsService(uow).get_unique_users_overview(user.id)
+        concurrent = await AnalyticsService(
+            uow,
+            session_factory=async_sessionmaker(async_engine, expire_on_commit=False),
+        ).get_unique_users_overview(user.id)
+
+        assert concurrent == sequential
+        assert concurrent.total_unique_users == 10
+
+        concurrent_service = AnalyticsService(
+            uow,
+            session_factory=async_sessionmaker(async_engine, expire_on_commit=False),
+        )
+        assert await concurrent_service.get_timeseries_data(
+            user.id
+        ) == await AnalyticsService(uow).get_timeseries_data(user.id)
+
+        active_users = await concurrent_service.get_active_users_timeseries(user.id)
+        assert active_users == await AnalyticsService(
+            uow
+        ).get_active_users_timeseries(user.id)
+        assert len(active_users.weekly_active_users) == len(active_users.dates)
+        assert sum(active_users.new_users) == 10
+
+    async def test_fan_out_leaves_request_session_unused(
+        self, async_engine, test_user_with_events
+    ):
+        """Test that with a session factory the request's own session never checks out a connection."""
+        user, _, _ = test_user_with_events
+        session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async with session_maker() as request_session:
+            service = AnalyticsService(
+                SqlAlchemyUnitOfWork(request_session), session_factory=session_maker
+            )
+            overview = await service.get_unique_users_overview(user.id)
+
+            assert overview.total_unique_users == 10
+            assert not request_session.in_transaction()
+
+    async def test_rolling_active_users_match_per_period_counts(
+        self, async_session, test_user_with_events
+    ):
+        """Test that the single-query rolling windows match per-day period counts."""
+        _, api_key, _ = test_user_with_events
+        repo = SqlAlchemyUnitOfWork(async_session).analytics_events
+        start = datetime.combine(
+            date.today() - timedelta(days=30), datetime.min.time()
+        ).replace(tzinfo=timezone.utc)
+        end = start + timedelta(days=31)
+
+        rolling = await repo.get_rolling_active_users_timeseries([api_key.key], start, end)
+        new_by_day = await repo.get_new_users_by_day([api_key.key], start, end)
+
+        assert len(rolling) == 30
+        for item in rolling:
+            day_start = datetime.combine(item["date"], datetime.min.time()).replace(
+                tzinfo=timezone.utc
+            )
+            day_end = day_start + timedelta(days=1)
+            assert item["daily_active_users"] == await repo.get_active_users_by_period(
+                [api_key.key], day_start, day_end
+            )
+            assert item["weekly_active_users"] == await repo.get_active_users_by_period(
+                [api_key.key], day_end - timedelta(days=7), day_end
+            )
+            assert item["monthly_active_users"] == await repo.get_active_users_by_period(
+                [api_key.key], day_end - timedelta(days=30), day_end
+            )
+            assert new_by_day.get(item["date"], 0) == await repo.get_new_users_count(
+                [api_key.key], day_start, day_end
+            )
+        assert rolling[-1]["weekly_active_users"] == 7
+        assert rolling[-1]["monthly_active_users"] == 10
+
+    async def test_concurrent_api_key_lookups_share_one_query(
+        self, async_session, test_user_with_events
+    ):
+        """Test that panels loading at once fill the API key cache with one query."""
+        user, api_key, _ = test_user_with_events
+        uow = SqlAlchemyUnitOfWork(async_session)
+        service = AnalyticsService(uow)
+
+        with patch.object(
+            uow.api_keys,
+            "get_user_api_keys_with_filter",
+            wraps=uow.api_keys.get_user_api_keys_with_filter,
+        ) as lookup:
+            results = await asyncio.gather(
+                *(service._get_user_api_keys(user.id) for _ in range(3))
+            )
+            assert await service._get_user_api_keys(user.id) == results[0]
+
+        assert lookup.call_count == 1
+        assert all([row.key for row in keys] == [api_key.key] for keys in results)
+
+
+    async def test_package_overview_extends_to_90_days_without_recent_events(
+        self, async_session
+    ):
+        """Test that the overview widens its window when the last 30 days are empty."""
+        user = User(
+            email="overview_extend@example.com",
+            hashed_password=get_password_hash("testpassword123"),
+            is_verified=True,
+            is_active=True,
+        )
+        async_session.add(user)
+        await async_session.commit()
+        await async_session.refresh(user)
+
+        api_key = APIKey(
+            package_name="old-package", key="klyne_test_overview_old", user_id=user.id
+        )
+        async_session.add(api_key)
+        async_session.add(
+            AnalyticsEvent(
+                api_key=api_key.key,
+                session_id=uuid4(),
+                package_name="old-package",
+                package_version="1.0.0",
+                python_version="3.11.5",
+                os_type="Linux",
+                event_timestamp=datetime.now(timezone.utc) - timedelta(days=60),
+                received_at=datetime.now(timezone.utc),
+            )
+        )
+        await async_session.commit()
+
+        service = AnalyticsService(SqlAlchemyUnitOfWork(async_session))
+        [overview] = await service.get_package_overview(user.id)
+
+        assert overview.date_range_start == date.today() - timedelta(days=90)
+        assert overview.total_events == 1
+
+
+    async def test_overview_endpoint_serves_cached_json(
+        self, client, test_user_with_events
+    ):
+        """Test that the overview endpoint returns JSON and reuses the cached body."""
+        from src.core.auth import require_authentication
+        from src.main import app
+
+        user, api_key, _ = test_user_with_events
+        app.dependency_overrides[require_authentication] = lambda: user.id
+
+        first = await client.get("/api/dashboard/overview")
+        second = await client.get("/api/dashboard/overview")
+
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/json"
+        assert first.content == second.content
+        [overview] = first.json()
+        assert overview["api_key"] == api_key.key
+        assert overview["date_range_end"] == date.today().isoformat()
+
+    async def test_stale_overview_is_served_then_refreshed(
+        self, async_engine, async_session, client, test_user_with_events
+    ):
+        """Test that a stale cached response is returned while it is refreshed in the background."""
+        from src.api import dashboard
+        from src.core.auth import require_authentication
+        from src.core.service_dependencies import get_analytics_service
+        from src.main import app
+
+        user, api_key, _ = test_user_with_events
+        app.dependency_overrides[require_authentication] = lambda: user.id
+        app.dependency_overrides[get_analytics_service] = lambda: AnalyticsService(
+            SqlAlchemyUnitOfWork(async_session),
+            session_factory=async_sessionmaker(async_engine, expire_on_commit=False),
+        )
+
+        first = await client.get("/api/dashboard/overview")
+        [key] = list(dashboard.dashboard_cache._storage)
+        _, (_, etag, body) = dashboard.dashboard_cache._storage[key]
+        dashboard.dashboard_cache.set(key, (0, etag, body))
+
+        async_session.add(
+            AnalyticsEvent(
+                api_key=api_key.key,
+                session_id=uuid4(),
+                package_name="test-package",
+                package_version="1.0.0",
+                python_version="3.11.5",
+                os_type="Linux",
+                event_timestamp=datetime.now(timezone.utc),
+            )
+        )
+        await async_session.commit()
+
+        stale = await client.get("/api/dashboard/overview")
+        await asyncio.gather(*dashboard._revalidation_tasks)
+        refreshed = await client.get("/api/dashboard/overview")
+
+        assert stale.content == first.content
+        [before], [after] = first.json(), refreshed.json()
+        assert after["total_events"] == before["total_events"] + 1
+
+    async def test_response_computed_across_invalidation_is_not_cached(
+        self, client, test_user_with_events
+    ):
+        """Test that a body computed while the cache is invalidated is served but not stored."""
+        from src.api import dashboard
+        from src.core.auth import require_authentication
+        from src.main import app
+        from src.services.analytics_service import invalidate_dashboard_cache
+
+        user, _, _ = test_user_with_events
+        app.dependency_overrides[require_authentication] = lambda: user.id
+        get_package_overview = AnalyticsService.get_package_overview
+
+        async def invalidated_midway(self, *args, **kwargs):
+            result = await get_package_overview(self, *args, **kwargs)
+            invalidate_dashboard_cache(user.id)
+            return result
+
+        with patch.object(AnalyticsService, "get_package_overview", invalidated_midway):
+            response = await client.get("/api/dashboard/overview")
+
+        assert response.status_code == 200
+        assert not dashboard.dashboard_cache._storage
+
+    async def test_overview_endpoint_revalidates_with_etag(
+        self, client, test_user_with_events
+    ):
+        """Test that a matching If-None-Match gets an empty 304 response."""
+        from src.core.auth import require_authentication
+        from src.main import app
+
+        user, _, _ = test_user_with_events
+        app.dependency_overrides[require_authentication] = lambda: user.id
+
+        first = await client.get("/api/dashboard/overview")
+        etag = first.headers["etag"]
+
+        not_modified = await client.get(
+            "/api/dashboard/overview", headers={"If-None-Match": etag}
+        )
+        stale = await client.get(
+            "/api/dashboard/overview", headers={"If-None-Match": '"outdated"'}
+        )
+
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+        assert stale.status_code == 200
+        assert stale.content == first.content
+
+
 class TestCustomEventAggregation:
     """Test suite for custom event aggregation by day, week, and month."""
 
@@ -701,3 +1059,27 @@ class TestCustomEventAggregation:
 
         # Verify counts are summed correctly
         assert all(isinstance(count, int) for count in counts_list)
+
+    async def test_custom_events_timeseries_counts_only_non_empty_event_types(
+        self, client, test_user_with_custom_events
+    ):
+        """Test that stray commas don't count towards the event type limit."""
+        from src.core.auth import require_authentication
+        from src.main import app
+
+        user, _, _ = test_user_with_custom_events
+        app.dependency_overrides[require_authentication] = lambda: user.id
+        event_types = [f"event_{i}" for i in range(50)]
+
+        allowed = await client.get(
+            "/api/dashboard/custom-events/timeseries",
+            params={"event_types": ",".join(event_types[:25]) + ",," + ",".join(event_types[25:]) + ","},
+        )
+        too_many = await client.get(
+            "/api/dashboard/custom-events/timeseries",
+            params={"event_types": ",".join(event_types + ["event_50"])},
+        )
+
+        assert allowed.status_code == 200
+        assert allowed.json()["event_types"] == event_types
+        assert too_many.status_code == 422
@@ -104,6 +104,7 @@ class TestAnalyticsAPI:
         assert event.python_version == "3.11.5"
         assert event.os_type == "Linux"
         assert event.api_key == api_key.key
+        assert str(event.id) == data["event_id"]
 
     async def test_create_analytics_event_no_auth(self, client, sample_analytics_data):
         """Test analytics event creation without authentication."""
@@ -148,6 +149,25 @@ class TestAnalyticsAPI:
         data = response.json()
         assert "not authorized for package" in data["detail"]
 
+    async def test_cached_api_key_survives_rejected_request(
+        self, client, test_user_and_api_key, sample_analytics_data
+    ):
+        """Test that a rolled back request doesn't break later requests with the same key."""
+        user, api_key = test_user_and_api_key
+        headers = {"Authorization": f"Bearer {api_key.key}"}
+
+        response = await client.post(
+            "/api/analytics",
+            json={**sample_analytics_data, "package_name": "different-package"},
+            headers=headers,
+        )
+        assert response.status_code == 403
+
+        response = await client.post(
+            "/api/analytics", json=sample_analytics_data, headers=headers
+        )
+        assert response.status_code == 200
+
     async def test_create_analytics_batch_success(
         self, client, test_user_and_api_key, sample_analytics_data, async_session
     ):
@@ -193,6 +213,53 @@ class TestAnalyticsAPI:
         events = result.scalars().all()
         assert len(events) >= 3
 
+        # Event IDs returned in the response match the inserted rows
+        event_ids = {str(event.id) for event in events}
+        for created in data["created_events"]:
+            assert created["event_id"] in event_ids
+
+    async def test_create_analytics_batch_partial_package_mismatch(
+        self, client, test_user_and_api_key, sample_analytics_data, async_session
+    ):
+        """Test batch where some events belong to a different package."""
+        user, api_key = test_user_and_api_key
+
+        batch_data = {
+            "events": [
+                {**sample_analytics_data, "session_id": str(uuid4())},
+                {
+                    **sample_analytics_data,
+                    "session_id": str(uuid4()),
+                    "package_name": "other-package",
+                },
+                {**sample_analytics_data, "session_id": str(uuid4())},
+                {
+                    **sample_analytics_data,
+                    "session_id": str(uuid4()),
+                    "package_name": "other-package",
+                },
+            ]
+        }
+
+        headers = {"Authorization": f"Bearer {api_key.key}"}
+
+        response = await client.post(
+            "/api/analytics/batch", json=batch_data, headers=headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["created_count"] == 2
+        assert data["failed_count"] == 2
+        assert [e["index"] for e in data["created_events"]] == [0, 2]
+        assert [e["index"] for e in data["failed_events"]] == [1, 3]
+
+        result = await async_session.execute(
+            select(AnalyticsEvent).filter(AnalyticsEvent.package_name == "other-package")
+        )
+        assert result.scalars().all() == []
+
     async def test_create_analytics_batch_too_large(
         self, client, test_user_and_api_key, sample_analytics_data
     ):
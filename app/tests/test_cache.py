@@ -0,0 +1,114 @@
+"""Tests for the in-process TTL cache."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.core.cache import SingleFlight, TTLCache
+
+
+class TestTTLCache:
+    def test_get_returns_value_until_expired(self):
+        cache = TTLCache(ttl_seconds=10)
+
+        with patch("src.core.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+            assert cache.get("key") == "value"
+
+        with patch("src.core.cache.time.monotonic", return_value=110.0):
+            assert cache.get("key") is None
+
+    def test_invalidate_and_clear(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+        cache.clear()
+        assert cache.get("b") is None
+
+    def test_evicts_oldest_entry_when_full(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+
+    def test_invalidate_where(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.set((1, "overview"), "a")
+        cache.set((1, "timeseries"), "b")
+        cache.set((2, "overview"), "c")
+
+        cache.invalidate_where(lambda key: key[0] == 1)
+
+        assert cache.get((1, "overview")) is None
+        assert cache.get((1, "timeseries")) is None
+        assert cache.get((2, "overview")) == "c"
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def lookup():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("key", lookup) for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert calls == 1
+
+        # Once finished, the next call runs again
+        assert await flight.do("key", lookup) == "value"
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_waiters_retry_when_leader_is_cancelled(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def lookup():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        leader = asyncio.create_task(flight.do("key", lookup))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flight.do("key", lookup)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == ["value", "value"]
+        assert leader.cancelled()
+        # One waiter took over the call and the other joined it
+        assert calls == 2
@@ -3,6 +3,7 @@ Tests for free plan data cleanup functionality.
 """
 
 import pytest
+from unittest.mock import patch
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from sqlalchemy import select
@@ -121,6 +122,53 @@ class TestFreeplanDataCleanup:
         remaining_session_ids = {event.AnalyticsEvent.session_id for event in events_after}
         assert remaining_session_ids == {new_session_1, new_session_2}
 
+    @pytest.mark.asyncio
+    async def test_cleanup_deletes_in_batches(self, async_session):
+        """Test that cleanup keeps deleting batches until no old events are left."""
+        user = User(
+            email="free_batches@test.com",
+            hashed_password=get_password_hash("password123"),
+            is_verified=True,
+            subscription_tier="free",
+            subscription_status="active"
+        )
+        async_session.add(user)
+        await async_session.commit()
+        await async_session.refresh(user)
+
+        api_key = APIKey(
+            package_name="batched-package",
+            key="klyne_test_key_batches",
+            user_id=user.id
+        )
+        async_session.add(api_key)
+        await async_session.commit()
+
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=settings.FREE_PLAN_DATA_RETENTION_DAYS)
+        async_session.add_all([
+            AnalyticsEvent(
+                api_key=api_key.key,
+                session_id=uuid4(),
+                package_name="batched-package",
+                package_version="1.0.0",
+                python_version="3.9.0",
+                os_type="Linux",
+                event_timestamp=cutoff_date - timedelta(days=day),
+            )
+            for day in range(1, 6)
+        ])
+        await async_session.commit()
+
+        with patch.object(settings, "FREE_PLAN_CLEANUP_BATCH_SIZE", 2):
+            cleanup_result = await cleanup_free_plan_analytics_data(async_session)
+
+        assert cleanup_result["success"] is True
+        assert cleanup_result["total_deleted"] == 5
+        result = await async_session.execute(
+            select(AnalyticsEvent.id).filter(AnalyticsEvent.api_key == api_key.key)
+        )
+        assert result.fetchall() == []
+
     @pytest.mark.asyncio
     async def test_cleanup_preserves_paid_user_data(self, async_session):
         """Test that cleanup preserves data for paid plan users."""
@@ -0,0 +1,122 @@
+"""Tests for the daily_stats and daily_package_stats rollups."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+
+from src.models.analytics_event import AnalyticsEvent
+from src.models.daily_package_stats import DailyPackageStats
+from src.models.daily_stats import DailyStats
+from src.models.user import User
+from src.repositories.analytics_event_repository import AnalyticsEventRepository
+from src.repositories.daily_stats_repository import DailyStatsRepository
+from src.services.backoffice_stats import _rollup_event_counts
+
+
+def _event_row(received_at: datetime) -> dict:
+    return {
+        "id": uuid4(),
+        "api_key": "klyne_rollup_test_key",
+        "session_id": uuid4(),
+        "package_name": "rollup-package",
+        "package_version": "1.0.0",
+        "python_version": "3.11.5",
+        "os_type": "Linux",
+        "event_timestamp": received_at,
+        "received_at": received_at,
+    }
+
+
+class TestDailyStatsRepository:
+    async def test_refresh_since_counts_each_day(self, async_session):
+        """Each day gets its own counts, including quiet days."""
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        two_days_ago = now - timedelta(days=2)
+
+        async_session.add(
+            User(email="rollup@example.com", hashed_password="x", created_at=now)
+        )
+        await async_session.execute(
+            insert(AnalyticsEvent),
+            [_event_row(now), _event_row(now), _event_row(two_days_ago)],
+        )
+
+        repo = DailyStatsRepository(async_session)
+        written = await repo.refresh_since(today - timedelta(days=2))
+
+        assert written == 3
+        days = await repo.get_days(today - timedelta(days=2), today + timedelta(days=1))
+        assert [(d.day, d.new_users, d.new_events) for d in days] == [
+            (today - timedelta(days=2), 0, 1),
+            (today - timedelta(days=1), 0, 0),
+            (today, 1, 2),
+        ]
+
+    async def test_refresh_since_updates_existing_rows(self, async_session):
+        """Refreshing a day again replaces its counts."""
+        today = datetime.now(timezone.utc).date()
+        async_session.add(DailyStats(day=today, new_users=0, new_api_keys=0, new_events=5))
+        await async_session.flush()
+
+        await async_session.execute(
+            insert(AnalyticsEvent), [_event_row(datetime.now(timezone.utc))]
+        )
+        repo = DailyStatsRepository(async_session)
+        await repo.refresh_since(today)
+
+        async_session.expire_all()
+        days = await repo.get_days(today, today + timedelta(days=1))
+        assert [d.new_events for d in days] == [1]
+
+    async def test_rollup_event_counts_span_n_days_including_today(self, async_session):
+        """A window of N days sums today and the N-1 closed days before it."""
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        async_session.add_all(
+            DailyStats(day=today - timedelta(days=n), new_users=0, new_api_keys=0, new_events=10)
+            for n in range(1, 8)
+        )
+        await async_session.execute(insert(AnalyticsEvent), [_event_row(now)])
+
+        counts = await _rollup_event_counts(async_session, now, {"today": 1, "this_week": 7})
+
+        assert counts == {"today": 1, "this_week": 61}
+        assert await _rollup_event_counts(async_session, now, {"this_month": 30}) is None
+
+
+class TestDailyPackageStatsRollup:
+    async def test_refresh_rebuilds_event_days_received_since(self, async_session):
+        """Late events update the UTC day they happened on, replacing its stale row."""
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        three_days_ago = today - timedelta(days=3)
+        async_session.add(
+            DailyPackageStats(
+                api_key="klyne_rollup_test_key", package_name="rollup-package",
+                day=three_days_ago, total_events=9, unique_sessions=9, unique_users=9,
+            )
+        )
+        await async_session.flush()
+
+        late = {**_event_row(now), "event_timestamp": now - timedelta(days=3)}
+        await async_session.execute(
+            insert(AnalyticsEvent),
+            [_event_row(now), {**_event_row(now), "user_identifier": "u1"}, late],
+        )
+        written = await AnalyticsEventRepository(async_session).refresh_daily_package_stats(today)
+
+        assert written == 2
+        async_session.expire_all()
+        rows = (
+            await async_session.execute(
+                select(
+                    DailyPackageStats.day,
+                    DailyPackageStats.total_events,
+                    DailyPackageStats.unique_sessions,
+                    DailyPackageStats.unique_users,
+                ).order_by(DailyPackageStats.day)
+            )
+        ).all()
+        assert [tuple(row) for row in rows] == [(three_days_ago, 1, 1, 0), (today, 2, 2, 1)]
@@ -0,0 +1,55 @@
+"""Tests for the analytics write-behind ingest queue."""
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.ingest_queue import AnalyticsIngestQueue
+from src.models.analytics_event import AnalyticsEvent
+
+
+def _event_row(package_name: str = "queued-package") -> dict:
+    return {
+        "id": uuid4(),
+        "api_key": "klyne_queue_test_key",
+        "session_id": uuid4(),
+        "package_name": package_name,
+        "package_version": "1.0.0",
+        "python_version": "3.11.5",
+        "os_type": "Linux",
+        "event_timestamp": datetime.now(timezone.utc),
+        "received_at": datetime.now(timezone.utc),
+    }
+
+
+class TestAnalyticsIngestQueue:
+    async def test_stop_flushes_queued_events(self, async_engine, async_session):
+        """Rows put on the queue are written in batches and flushed on stop."""
+        queue = AnalyticsIngestQueue(
+            session_factory=async_sessionmaker(async_engine, class_=AsyncSession),
+            max_batch_size=3,
+        )
+        queue.start(workers=1)
+
+        rows = [_event_row() for _ in range(7)]
+        await queue.put(rows[:4])
+        await queue.put(rows[4:])
+        await queue.stop()
+
+        assert not queue.running
+        result = await async_session.execute(
+            select(AnalyticsEvent.id).filter(
+                AnalyticsEvent.package_name == "queued-package"
+            )
+        )
+        assert set(result.scalars().all()) == {row["id"] for row in rows}
+
+    async def test_put_requires_running_queue(self):
+        """Enqueueing before start is rejected instead of silently dropped."""
+        queue = AnalyticsIngestQueue()
+
+        with pytest.raises(RuntimeError, match="not running"):
+            await queue.put([_event_row()])
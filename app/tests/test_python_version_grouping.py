@@ -1,8 +1,12 @@
 import pytest_asyncio
 from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
 from uuid import uuid4
 
+from sqlalchemy import func, select
+
 from src.models.analytics_event import AnalyticsEvent
+from src.models.daily_dimension_stats import DailyDimensionStats
 from src.models.api_key import APIKey
 from src.models.user import User
 from src.repositories.analytics_event_repository import AnalyticsEventRepository
@@ -158,6 +162,137 @@ class TestPythonVersionGrouping:
         assert py_313["total_events"] == 1
         assert py_313["total_sessions"] == 1
 
+        # Percentages of the total are computed in SQL
+        assert py_311["event_percentage"] == 50.0
+        assert py_313["session_percentage"] == 16.67
+
+    async def test_python_version_distribution_top_events_only(
+        self, async_session, sample_events_with_versions
+    ):
+        """Test that skipping sessions and folding the tail keeps shares of the full total."""
+        events, api_key = sample_events_with_versions
+
+        repo = AnalyticsEventRepository(async_session)
+
+        distribution = await repo.get_python_version_distribution(
+            api_keys=[api_key.key],
+            start_date=datetime.now(timezone.utc) - timedelta(days=1),
+            end_date=datetime.now(timezone.utc) + timedelta(days=1),
+            include_sessions=False,
+            top_k=1,
+        )
+
+        assert [row["python_version"] for row in distribution] == ["3.11", "Other"]
+        assert [row["total_events"] for row in distribution] == [3, 3]
+        assert [row["event_percentage"] for row in distribution] == [50.0, 50.0]
+        assert all(row["total_sessions"] is None for row in distribution)
+        assert all(row["session_percentage"] is None for row in distribution)
+
+    async def test_python_version_distribution_folds_tail_into_other(
+        self, async_session, sample_events_with_versions
+    ):
+        """Test that values beyond top_k are summed into a trailing "Other" row."""
+        events, api_key = sample_events_with_versions
+
+        repo = AnalyticsEventRepository(async_session)
+
+        distribution = await repo.get_python_version_distribution(
+            api_keys=[api_key.key],
+            start_date=datetime.now(timezone.utc) - timedelta(days=1),
+            end_date=datetime.now(timezone.utc) + timedelta(days=1),
+            top_k=2,
+        )
+
+        assert [row["python_version"] for row in distribution] == ["3.11", "3.12", "Other"]
+        assert [row["total_sessions"] for row in distribution] == [3, 2, 1]
+        assert distribution[-1]["session_percentage"] == 16.67
+
+    async def test_real_other_value_is_not_merged_into_tail(
+        self, async_session, test_user_and_api_key
+    ):
+        """Test that a reported value spelled "Other" stays separate from the folded tail."""
+        user, api_key = test_user_and_api_key
+        for os_type in ["Other", "Other", "Other", "Linux", "Linux", "Windows", "macOS"]:
+            async_session.add(
+                AnalyticsEvent(
+                    api_key=api_key.key,
+                    session_id=uuid4(),
+                    package_name="test-package",
+                    package_version="1.0.0",
+                    python_version="3.12.0",
+                    os_type=os_type,
+                    event_timestamp=datetime.now(timezone.utc),
+                )
+            )
+        await async_session.commit()
+
+        repo = AnalyticsEventRepository(async_session)
+        distribution = await repo.get_os_distribution(
+            api_keys=[api_key.key],
+            start_date=datetime.now(timezone.utc) - timedelta(days=1),
+            end_date=datetime.now(timezone.utc) + timedelta(days=1),
+            top_k=2,
+        )
+
+        assert [(row["os_type"], row["total_events"]) for row in distribution] == [
+            ("Other", 3), ("Linux", 2), ("Other", 2)
+        ]
+
+    async def test_distributions_from_rollup_match_raw_events(
+        self, async_session, sample_events_with_versions
+    ):
+        """Test that distributions summed from daily_dimension_stats match the raw aggregation."""
+        events, api_key = sample_events_with_versions
+        repo = AnalyticsEventRepository(async_session)
+        start_date = datetime.now(timezone.utc) - timedelta(days=1)
+        end_date = datetime.now(timezone.utc) + timedelta(days=1)
+
+        async def distributions():
+            return (
+                await repo.get_python_version_distribution([api_key.key], start_date, end_date),
+                await repo.get_os_distribution([api_key.key], start_date, end_date, top_k=2),
+                await repo.get_package_version_distribution(api_key.key, start_date, end_date),
+            )
+
+        raw = await distributions()
+        await repo.refresh_daily_dimension_stats(start_date.date())
+        with patch.object(AnalyticsEventRepository, "_reads_dimension_rollup", return_value=True):
+            precomputed = await distributions()
+
+        assert precomputed == raw
+
+    async def test_dimension_rollup_rebuilds_days_with_late_events(
+        self, async_session, sample_events_with_versions
+    ):
+        """Test that a refresh replaces a day's rows, including days only reached by late events."""
+        events, api_key = sample_events_with_versions
+        repo = AnalyticsEventRepository(async_session)
+        today = datetime.now(timezone.utc).date()
+
+        await repo.refresh_daily_dimension_stats(today)
+        # Received now, but recorded by the client three days ago
+        async_session.add(
+            AnalyticsEvent(
+                api_key=api_key.key,
+                session_id=uuid4(),
+                package_name="test-package",
+                package_version="1.0.0",
+                python_version="3.11.4",
+                os_type="Linux",
+                event_timestamp=datetime.now(timezone.utc) - timedelta(days=3),
+            )
+        )
+        await async_session.commit()
+        await repo.refresh_daily_dimension_stats(today)
+
+        totals = dict(
+            (await async_session.execute(
+                select(DailyDimensionStats.day, func.sum(DailyDimensionStats.total_events))
+                .group_by(DailyDimensionStats.day)
+            )).all()
+        )
+        assert totals == {today: 6, today - timedelta(days=3): 1}
+
     async def test_unique_python_versions_count_by_minor(
         self, async_session, sample_events_with_versions
     ):
@@ -259,6 +394,7 @@ class TestPythonVersionGrouping:
         assert py_312_users["dimension_name"] == "3.12"
         assert py_312_users["unique_users"] == 1
         assert py_312_users["total_sessions"] == 1
+        assert py_312_users["percentage"] == 50.0
 
     async def test_python_version_already_minor(
         self, async_session, test_user_and_api_key